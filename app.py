@@ -1,11 +1,17 @@
 import argparse
 from datetime import datetime
 from task import Task, TaskValidationError
-from task_manager import TaskManager, TaskManagerError
+from task_manager import open_task_manager, TaskManagerError
 from task_validator import TaskValidator
 from reminder import print_reminders, print_tasks_by_urgency
+from task_cache import TaskCache
+from metrics import configure_from_env
 import os
 
+# Shared by every TaskManager the menu creates so redraws and the
+# read-then-update flows don't re-query rows that haven't changed
+TASK_CACHE = TaskCache()
+
 # Map IDs to status codes
 STATUS_MAP = {
     "1": "PENDING",
@@ -27,7 +33,7 @@ def clear_screen():
 def show_main_menu():
     """Display the main menu"""
     # Show reminders first
-    print_reminders()
+    print_reminders(cache=TASK_CACHE)
     
     print("\n=== Task Management System ===")
     print("1. Create Task")
@@ -114,7 +120,7 @@ def create_task():
             'due_date': due_date
         }
         
-        task_manager = TaskManager()
+        task_manager = open_task_manager(cache=TASK_CACHE)
         saved_task = task_manager.create_task(task_data)
         
         print("\nTask created successfully!")
@@ -149,6 +155,21 @@ def print_task(task_data):
     if 'updated_at' in task_data:
         print(f"  Updated: {task_data['updated_at']}")
 
+def print_stats(stats):
+    """Print the dashboard counts from get_stats"""
+    print("\n=== TASK STATISTICS ===")
+    print(f"  Total: {stats['total']}")
+    print(f"  Open: {stats['open']}")
+    print(f"  Completed: {stats['completed']}")
+    print(f"  Overdue: {stats['overdue']}")
+    print(f"  Due this week: {stats['due_this_week']}")
+    print("  By status:")
+    for code, count in stats['by_status'].items():
+        print(f"    {code}: {count}")
+    print("  By priority:")
+    for code, count in stats['by_priority'].items():
+        print(f"    {code}: {count}")
+
 def show_tasks():
     """Display tasks based on user selection"""
     print("\n=== Show Tasks ===")
@@ -157,18 +178,20 @@ def show_tasks():
     print("3. Show tasks by status")
     print("4. Show tasks by priority")
     print("5. Show tasks by urgency")
+    print("6. Show task statistics")
+    print("7. Search tasks")
     
     task_manager = None
     try:
-        choice = get_user_input("Enter your choice (1-5): ")
-        task_manager = TaskManager()
+        choice = get_user_input("Enter your choice (1-7): ")
+        task_manager = open_task_manager(cache=TASK_CACHE)
         
         if choice == "1":
-            tasks = task_manager.get_all_tasks()
-            if tasks:
-                for task in tasks:
-                    print_task(task)
-            else:
+            found = False
+            for task in task_manager.iter_all_tasks():
+                found = True
+                print_task(task)
+            if not found:
                 print("\nNo tasks found.")
                 
         elif choice == "2":
@@ -184,11 +207,11 @@ def show_tasks():
             for key, value in STATUS_MAP.items():
                 print(f"{key} - {value}")
             status = get_user_input("Enter status (1-3): ", input_type='status')
-            tasks = task_manager.get_tasks_by_status(status)
-            if tasks:
-                for task in tasks:
-                    print_task(task)
-            else:
+            found = False
+            for task in task_manager.iter_tasks_by_status(status):
+                found = True
+                print_task(task)
+            if not found:
                 print("\nNo tasks found with this status.")
                 
         elif choice == "4":
@@ -196,14 +219,23 @@ def show_tasks():
             for key, value in PRIORITY_MAP.items():
                 print(f"{key} - {value}")
             priority = get_user_input("Enter priority level (1-3): ", input_type='priority')
-            tasks = task_manager.get_tasks_by_priority(priority)
-            if tasks:
-                for task in tasks:
-                    print_task(task)
-            else:
+            found = False
+            for task in task_manager.iter_tasks_by_priority(priority):
+                found = True
+                print_task(task)
+            if not found:
                 print("\nNo tasks found with this priority level.")
         elif choice == "5":
-            print_tasks_by_urgency()
+            print_tasks_by_urgency(cache=TASK_CACHE)
+        elif choice == "6":
+            print_stats(task_manager.get_stats())
+        elif choice == "7":
+            query = get_user_input("Search for: ")
+            tasks = task_manager.search_tasks(query, limit=20)
+            for task in tasks:
+                print_task(task)
+            if not tasks:
+                print("\nNo matching tasks found.")
         else:
             print("\nInvalid choice.")
             
@@ -223,7 +255,7 @@ def update_task():
     
     task_manager = None
     try:
-        task_manager = TaskManager()
+        task_manager = open_task_manager(cache=TASK_CACHE)
         task_id = get_user_input("Enter task ID to update: ")
         task = task_manager.get_task(task_id)
         
@@ -270,7 +302,7 @@ def update_task():
         
         # Update through task manager
         if update_data:
-            updated_task = task_manager.update_task(task_id, update_data)
+            updated_task = task_manager.update_task(task_id, update_data, current=task)
             print("\nTask updated successfully!")
             print_task(updated_task)
         else:
@@ -292,7 +324,7 @@ def delete_task():
     
     task_manager = None
     try:
-        task_manager = TaskManager()
+        task_manager = open_task_manager(cache=TASK_CACHE)
         task_id = get_user_input("Enter task ID to delete: ")
         task = task_manager.get_task(task_id)
         
@@ -327,7 +359,7 @@ def mark_task_completed():
     
     task_manager = None
     try:
-        task_manager = TaskManager()
+        task_manager = open_task_manager(cache=TASK_CACHE)
         task_id = get_user_input("Enter task ID to mark as completed: ")
         task = task_manager.get_task(task_id)
         
@@ -346,7 +378,7 @@ def mark_task_completed():
         
         confirm = input("\nAre you sure you want to mark this task as completed? (y/n): ").lower()
         if confirm == 'y':
-            updated_task = task_manager.mark_as_completed(task_id)
+            updated_task = task_manager.mark_as_completed(task_id, current=task)
             print("\nTask marked as completed successfully!")
             print_task(updated_task)
         else:
@@ -363,6 +395,7 @@ def mark_task_completed():
         clear_screen()
 
 def main():
+    configure_from_env()
     while True:
         show_main_menu()
         choice = get_user_input("Enter your choice (1-6): ")
@@ -0,0 +1,617 @@
+import asyncio
+import os
+from contextlib import asynccontextmanager
+import pymysql
+from task_validator import TaskValidator
+from migrations import LATEST_VERSION
+from database import MySQLBackend
+from task_manager import (TaskManagerError, TaskQuery, TaskRowBuilder, TASK_SELECT,
+                          DUE_BETWEEN_SELECT, UPCOMING_SELECT, ALL_DAYS_LEFT_SELECT,
+                          STATS_SELECT, SUMMARY_SELECT, DUE_SOON_SELECT, fold_stats,
+                          EVENT_INSERT, CHANGES_SELECT, CHANGE_SETTLE_SECONDS,
+                          LATEST_CHANGE_SELECT, backend_sql, date_bound, fold_changes,
+                          _merge_filters)
+from task_cache import TaskCache
+
+try:
+    import aiomysql
+except ImportError:  # optional: only needed by asyncio services
+    aiomysql = None
+
+
+class AsyncMySQLBackend(MySQLBackend):
+    """MySQL dialect over an aiomysql connection pool"""
+
+    def __init__(self, pool):
+        super().__init__(pool=pool)
+        self.streaming_cursor = aiomysql.SSDictCursor
+
+    def open(self):
+        raise NotImplementedError("AsyncMySQLBackend connections are acquired with `async with`")
+
+    def stats(self):
+        return {
+            'size': self.pool.size,
+            'idle': self.pool.freesize,
+            'max_size': self.pool.maxsize,
+        }
+
+    def close(self):
+        self.pool.close()
+
+    async def wait_closed(self):
+        """Close the pool and wait for its connections to finish"""
+        self.pool.close()
+        await self.pool.wait_closed()
+
+
+async def create_async_pool(**overrides):
+    """Create an aiomysql pool configured like database.get_pool()"""
+    if aiomysql is None:
+        raise TaskManagerError("AsyncTaskManager requires aiomysql (pip install aiomysql)")
+    options = dict(
+        minsize=int(os.getenv('DB_POOL_MIN_SIZE', 1)),
+        maxsize=int(os.getenv('DB_POOL_SIZE', 10)),
+        pool_recycle=int(float(os.getenv('DB_POOL_MAX_LIFETIME', 3600))),
+        host=os.getenv('DB_HOST'),
+        user=os.getenv('DB_USER'),
+        password=os.getenv('DB_PASSWORD'),
+        db=os.getenv('DB_NAME'),
+        charset='utf8mb4',
+        cursorclass=aiomysql.DictCursor,
+        # Report matched rather than changed rows for UPDATE
+        client_flag=pymysql.constants.CLIENT.FOUND_ROWS,
+        # Reads need no transaction; multi-statement writes open one
+        autocommit=True,
+    )
+    options.update(overrides)
+    return await aiomysql.create_pool(**options)
+
+
+_backend = None
+_backend_lock = None
+
+
+async def get_async_backend():
+    """Return the process-wide async backend, creating its pool on first use"""
+    global _backend, _backend_lock
+    if _backend_lock is None:
+        _backend_lock = asyncio.Lock()
+    async with _backend_lock:
+        if _backend is None:
+            _backend = AsyncMySQLBackend(await create_async_pool())
+        return _backend
+
+
+async def open_async_task_manager(cache=None, backend=None):
+    """Return an AsyncTaskManager with its schema checked and lookups loaded"""
+    manager = AsyncTaskManager(cache=cache, backend=backend or await get_async_backend())
+    await manager.ensure_ready()
+    return manager
+
+
+class AsyncTaskManager(TaskRowBuilder):
+    """TaskManager for asyncio code, on aiomysql.
+
+    Offers the TaskManager methods as coroutines. Each call borrows a pooled
+    connection only for its own statements, so many calls can be in flight
+    on one event loop without a thread each; the pool size caps how many
+    reach the server at once. Create it with open_async_task_manager(). The
+    schema is not migrated from here: run `python migrations.py` first.
+    """
+
+    def __init__(self, cache=None, backend=None):
+        self.cache = cache
+        self.backend = backend
+
+    @asynccontextmanager
+    async def _cursor(self, cursorclass=None):
+        async with self.backend.pool.acquire() as connection:
+            if cursorclass is None:
+                cursor = await connection.cursor()
+            else:
+                cursor = await connection.cursor(cursorclass)
+            try:
+                yield cursor
+            finally:
+                await cursor.close()
+
+    @asynccontextmanager
+    async def _transaction(self):
+        """Cursor whose statements commit together or roll back together"""
+        async with self.backend.pool.acquire() as connection:
+            await connection.begin()
+            cursor = await connection.cursor()
+            try:
+                yield cursor
+                await connection.commit()
+            except BaseException:
+                await connection.rollback()
+                raise
+            finally:
+                await cursor.close()
+
+    async def ensure_ready(self):
+        """Verify the schema version and load the lookup tables"""
+        if self.backend.schema_version is None or self.backend.schema_version < LATEST_VERSION:
+            try:
+                async with self._cursor() as cursor:
+                    await cursor.execute("SELECT MAX(version) AS version FROM schema_version")
+                    version = (await cursor.fetchone())['version'] or 0
+            except pymysql.Error as e:
+                if not self.backend.is_missing_table_error(e):
+                    raise TaskManagerError(f"Error checking database schema: {str(e)}")
+                version = 0
+            if version < LATEST_VERSION:
+                raise TaskManagerError(
+                    f"Database schema is at version {version}, expected {LATEST_VERSION}. "
+                    "Run 'python migrations.py' to upgrade.")
+            self.backend.schema_version = version
+        if not self.backend.lookups.loaded:
+            await self.refresh_lookups()
+
+    async def _fetch_all(self, query, params=()):
+        """Run a read query, serving it from the cache when one is attached"""
+        generation = None
+        if self.cache is not None:
+            key = TaskCache.query_key(query, params)
+            hit, rows = self.cache.get(key)
+            if hit:
+                return rows
+            generation = self.cache.generation
+        async with self._cursor() as cursor:
+            await cursor.execute(query, params)
+            rows = await cursor.fetchall()
+        if self.cache is not None:
+            self.cache.put(key, rows, generation)
+        return rows
+
+    def _invalidate(self, task_ids=()):
+        """Drop cached entries a write to task_ids may have made stale"""
+        if self.cache is not None:
+            self.cache.invalidate_tasks(task_ids)
+
+    async def refresh_lookups(self):
+        """Reload the shared status and priority level ID cache"""
+        try:
+            async with self._cursor() as cursor:
+                await cursor.execute("SELECT id, status_code FROM statuses")
+                statuses = await cursor.fetchall()
+                await cursor.execute("SELECT id, priority_level_code FROM priority_levels")
+                priorities = await cursor.fetchall()
+        except pymysql.Error as e:
+            raise TaskManagerError(f"Error loading lookup data: {str(e)}")
+        self.backend.lookups.replace(statuses, priorities)
+
+    async def _resolve_codes(self, statuses=(), priorities=()):
+        """Reload the lookups once if any code is not cached yet"""
+        lookups = self.backend.lookups
+        if (not lookups.loaded
+                or any(code and lookups.status_id(code) is None for code in statuses)
+                or any(code and lookups.priority_id(code) is None for code in priorities)):
+            await self.refresh_lookups()
+
+    def get_status_id(self, status_code):
+        """Get status ID from the loaded lookup cache"""
+        status_id = self.backend.lookups.status_id(status_code)
+        if status_id is None:
+            raise TaskManagerError(f"Invalid status code: {status_code}")
+        return status_id
+
+    def get_priority_id(self, priority_code):
+        """Get priority level ID from the loaded lookup cache"""
+        priority_id = self.backend.lookups.priority_id(priority_code)
+        if priority_id is None:
+            raise TaskManagerError(f"Invalid priority level code: {priority_code}")
+        return priority_id
+
+    async def create_task(self, task_data):
+        """Create a new task in database"""
+        await self._resolve_codes([task_data.get('status')], [task_data.get('priority_level')])
+        values = self.build_task_row(task_data)
+        try:
+            async with self._transaction() as cursor:
+                await cursor.execute("""
+                    INSERT INTO tasks (title, description, status_id, priority_level_id, due_date)
+                    VALUES (%s, %s, %s, %s, %s)
+                """, values)
+                task_id = cursor.lastrowid
+                await cursor.execute(EVENT_INSERT, (task_id, 'create'))
+            self._invalidate()
+            return await self.get_task(task_id)
+        except pymysql.Error as e:
+            raise TaskManagerError(f"Error creating task: {str(e)}")
+
+    async def create_tasks(self, tasks_data, chunk_size=1000):
+        """Create many tasks; validated and reported like TaskManager.create_tasks"""
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1")
+
+        await self._resolve_codes()
+        result = {'ids': [], 'errors': []}
+        chunk = []
+        start = 0
+        for task_data in tasks_data:
+            chunk.append(task_data)
+            if len(chunk) >= chunk_size:
+                await self._create_chunk(chunk, start, result)
+                start += len(chunk)
+                chunk = []
+        if chunk:
+            await self._create_chunk(chunk, start, result)
+        return result
+
+    async def _create_chunk(self, chunk, start, result):
+        """Validate one chunk in a batch, insert its valid rows and record the outcome"""
+        rows = self._validated_rows(chunk, start, result)
+        if rows:
+            result['ids'].extend(await self._insert_chunk(rows, len(result['ids'])))
+
+    async def _insert_chunk(self, rows, created_so_far):
+        """Insert validated rows in a single statement and return their IDs"""
+        placeholders = ", ".join(["(%s, %s, %s, %s, %s)"] * len(rows))
+        query = f"""
+            INSERT INTO tasks (title, description, status_id, priority_level_id, due_date)
+            VALUES {placeholders}
+        """
+        try:
+            async with self._transaction() as cursor:
+                await cursor.execute(query, [value for row in rows for value in row])
+                first_id = self.backend.first_insert_id(cursor, len(rows))
+                ids = list(range(first_id, first_id + len(rows)))
+                await cursor.executemany(EVENT_INSERT, [(task_id, 'create') for task_id in ids])
+            self._invalidate()
+        except pymysql.Error as e:
+            raise TaskManagerError(
+                f"Error creating tasks after {created_so_far} were created: {str(e)}")
+        return ids
+
+    async def get_task(self, task_id):
+        """Get task from database by ID"""
+        generation = None
+        if self.cache is not None:
+            hit, task = self.cache.get(TaskCache.task_key(task_id))
+            if hit:
+                return task
+            generation = self.cache.generation
+        try:
+            async with self._cursor() as cursor:
+                await cursor.execute(f"{TASK_SELECT} WHERE t.id = %s", (task_id,))
+                task = await cursor.fetchone()
+        except pymysql.Error as e:
+            raise TaskManagerError(f"Error retrieving task: {str(e)}")
+        if task is not None and self.cache is not None:
+            self.cache.put(TaskCache.task_key(task_id), task, generation)
+        return task
+
+    async def run_query(self, query):
+        """Execute a TaskQuery and return the matching tasks"""
+        await self._resolve_codes(*query.lookup_codes())
+        sql, params = query.build(self)
+        try:
+            return await self._fetch_all(sql, params)
+        except pymysql.Error as e:
+            raise TaskManagerError(f"Error retrieving tasks: {str(e)}")
+
+    async def find_tasks(self, **filters):
+        """Get tasks matching any combination of filters; see TaskManager.find_tasks"""
+        return await self.run_query(TaskQuery.from_filters(**filters))
+
+    async def search_tasks(self, query, filters=None, limit=20, offset=0, columns=None):
+        """Full-text search over titles and descriptions; see TaskManager.search_tasks"""
+        return await self.find_tasks(search=query, limit=limit, offset=offset, columns=columns,
+                                     **(filters or {}))
+
+    async def get_all_tasks(self):
+        """Get all tasks from database"""
+        return await self.find_tasks()
+
+    async def get_tasks_by_status(self, status):
+        """Get tasks by status from database"""
+        return await self.find_tasks(status=status)
+
+    async def get_tasks_by_priority(self, priority):
+        """Get tasks by priority from database"""
+        return await self.find_tasks(priority_level=priority)
+
+    async def iter_task_pages(self, status=None, priority=None, page_size=500, cursor=None,
+                              columns=None, filters=None):
+        """Yield (tasks, next_cursor) pages in ID order; see TaskManager.iter_task_pages"""
+        if page_size < 1:
+            raise ValueError("page_size must be at least 1")
+
+        filters = _merge_filters(filters, status, priority)
+        last_id = int(cursor) if cursor else 0
+        while True:
+            query = TaskQuery.from_filters(columns=columns, **filters
+                                           ).after_id(last_id).order_by('id').limit(page_size)
+            await self._resolve_codes(*query.lookup_codes())
+            sql, params = query.build(self)
+            try:
+                async with self._cursor(self.backend.streaming_cursor) as ss_cursor:
+                    await ss_cursor.execute(sql, params)
+                    page = await ss_cursor.fetchall()
+            except pymysql.Error as e:
+                raise TaskManagerError(f"Error retrieving tasks: {str(e)}")
+
+            if not page:
+                return
+            last_id = page[-1]['id']
+            next_cursor = str(last_id) if len(page) == page_size else None
+            yield page, next_cursor
+            if next_cursor is None:
+                return
+
+    async def iter_tasks(self, status=None, priority=None, page_size=500, cursor=None,
+                         columns=None, filters=None):
+        """Yield tasks one at a time, optionally filtered, in ID order"""
+        async for page, _ in self.iter_task_pages(status, priority, page_size, cursor, columns,
+                                                  filters):
+            for task in page:
+                yield task
+
+    async def get_tasks_due_between(self, start, end):
+        """Get tasks due between start and end (inclusive), soonest first"""
+        try:
+            return await self._fetch_all(backend_sql(DUE_BETWEEN_SELECT, self.backend),
+                                         (date_bound(start), date_bound(end, end_of_day=True)))
+        except pymysql.Error as e:
+            raise TaskManagerError(f"Error retrieving tasks by due date: {str(e)}")
+
+    async def get_upcoming(self, days=30):
+        """Get tasks due from today through `days` days from now, soonest first"""
+        try:
+            return await self._fetch_all(backend_sql(UPCOMING_SELECT, self.backend), (days + 1,))
+        except pymysql.Error as e:
+            raise TaskManagerError(f"Error retrieving upcoming tasks: {str(e)}")
+
+    async def get_tasks_with_days_left(self):
+        """Get all tasks with days_left, soonest due first"""
+        try:
+            return await self._fetch_all(backend_sql(ALL_DAYS_LEFT_SELECT, self.backend))
+        except pymysql.Error as e:
+            raise TaskManagerError(f"Error retrieving tasks: {str(e)}")
+
+    async def _summary_enabled(self):
+        """Whether the optional task_summary table exists, checked once per backend"""
+        if self.backend.summary_enabled is None:
+            try:
+                async with self._cursor() as cursor:
+                    await cursor.execute("SELECT 1 FROM task_summary LIMIT 1")
+                    await cursor.fetchall()
+                self.backend.summary_enabled = True
+            except pymysql.Error as e:
+                if not self.backend.is_missing_table_error(e):
+                    raise
+                self.backend.summary_enabled = False
+        return self.backend.summary_enabled
+
+    async def _with_codes(self, groups):
+        """Add status and priority codes to rows carrying the lookup IDs"""
+        lookups = self.backend.lookups
+        if not lookups.loaded or any(
+                lookups.status_code(g['status_id']) is None
+                or lookups.priority_code(g['priority_level_id']) is None for g in groups):
+            await self.refresh_lookups()
+        return [dict(group,
+                     status_code=lookups.status_code(group['status_id']),
+                     priority_level_code=lookups.priority_code(group['priority_level_id']))
+                for group in groups]
+
+    async def get_stats(self):
+        """Get dashboard counts without fetching any task rows; see TaskManager.get_stats"""
+        try:
+            if await self._summary_enabled():
+                stats = fold_stats(await self._with_codes(await self._fetch_all(SUMMARY_SELECT)))
+                due, = await self._fetch_all(backend_sql(DUE_SOON_SELECT, self.backend), (False, 7))
+                stats['overdue'] = int(due['overdue'] or 0)
+                stats['due_this_week'] = int(due['due_this_week'] or 0)
+                return stats
+            groups = await self._fetch_all(backend_sql(STATS_SELECT, self.backend), (7,))
+            return fold_stats(await self._with_codes(groups))
+        except pymysql.Error as e:
+            if self.backend.is_missing_table_error(e):
+                self.backend.summary_enabled = None
+            raise TaskManagerError(f"Error retrieving task statistics: {str(e)}")
+
+    async def _prepare_update(self, fields):
+        """Validate an update, resolve its lookup IDs and build its SET clauses.
+
+        Returns the same (assignments, values, normalized) as _update_assignments.
+        """
+        normalized = TaskValidator.normalize_update_fields(fields)
+        await self._resolve_codes([normalized.get('status')], [normalized.get('priority_level')])
+        assignments, values = self._assignments(normalized)
+        return assignments, values, normalized
+
+    async def update_task(self, task_id, update_data, current=None, reread=False):
+        """Update only the supplied fields of a task; see TaskManager.update_task"""
+        assignments, values, normalized = await self._prepare_update(update_data)
+        try:
+            async with self._transaction() as cursor:
+                await cursor.execute(
+                    f"UPDATE tasks SET {', '.join(assignments)} WHERE id = %s",
+                    values + [task_id]
+                )
+                found = cursor.rowcount > 0
+                if found:
+                    await cursor.execute(EVENT_INSERT, (task_id, 'update'))
+            self._invalidate([task_id])
+        except pymysql.Error as e:
+            raise TaskManagerError(f"Error updating task: {str(e)}")
+
+        if not found:
+            raise TaskManagerError(f"Task {task_id} not found")
+        if reread:
+            return await self.get_task(task_id)
+
+        return self._updated_state(task_id, current, self._state_changes(normalized))
+
+    async def mark_as_completed(self, task_id, current=None, reread=False):
+        """Mark a task as completed in a single UPDATE; see TaskManager.mark_as_completed"""
+        await self._resolve_codes(["COMPLETED"])
+        try:
+            async with self._transaction() as cursor:
+                await cursor.execute(f"""
+                    UPDATE tasks
+                    SET is_completed = TRUE,
+                        status_id = %s,
+                        updated_at = {self.backend.now_sql}
+                    WHERE id = %s
+                """, (self.get_status_id("COMPLETED"), task_id))
+                found = cursor.rowcount > 0
+                if found:
+                    await cursor.execute(EVENT_INSERT, (task_id, 'complete'))
+            self._invalidate([task_id])
+        except pymysql.Error as e:
+            raise TaskManagerError(f"Error marking task as completed: {str(e)}")
+
+        if not found:
+            raise TaskManagerError(f"Task {task_id} not found")
+        if reread:
+            return await self.get_task(task_id)
+        return self._updated_state(task_id, current, {
+            'is_completed': True,
+            'status_code': "COMPLETED",
+        })
+
+    async def delete_task(self, task_id):
+        """Delete task from database"""
+        try:
+            async with self._transaction() as cursor:
+                await cursor.execute("DELETE FROM tasks WHERE id = %s", (task_id,))
+                deleted = cursor.rowcount > 0
+                if deleted:
+                    await cursor.execute(EVENT_INSERT, (task_id, 'delete'))
+            self._invalidate([task_id])
+            return deleted
+        except pymysql.Error as e:
+            raise TaskManagerError(f"Error deleting task: {str(e)}")
+
+    async def _execute_for_ids(self, statement, values, task_ids, chunk_size, event_type):
+        """Run `statement ... WHERE id IN (...)` over chunks of task IDs in one transaction"""
+        task_ids = list(dict.fromkeys(task_ids))
+        async with self._transaction() as cursor:
+            affected = await self._write_ids(cursor, statement, values, task_ids,
+                                             chunk_size, event_type)
+        self._invalidate(task_ids)
+        return affected
+
+    async def _write_ids(self, cursor, statement, values, task_ids, chunk_size, event_type):
+        """Run the chunked statement and log its change events; see TaskManager._write_ids"""
+        affected = 0
+        written = []
+        for start in range(0, len(task_ids), chunk_size):
+            chunk = task_ids[start:start + chunk_size]
+            placeholders = ", ".join(["%s"] * len(chunk))
+            existing = f"SELECT id FROM tasks WHERE id IN ({placeholders})"
+            if event_type == 'delete':
+                await cursor.execute(existing + self.backend.lock_rows_sql, chunk)
+                chunk = [row['id'] for row in await cursor.fetchall()]
+                if not chunk:
+                    continue
+                placeholders = ", ".join(["%s"] * len(chunk))
+            await cursor.execute(
+                f"{statement} WHERE id IN ({placeholders})",
+                list(values) + chunk
+            )
+            rowcount = cursor.rowcount
+            if 0 < rowcount < len(chunk) and event_type != 'delete':
+                await cursor.execute(existing, chunk)
+                chunk = [row['id'] for row in await cursor.fetchall()]
+            if rowcount > 0:
+                written.extend(chunk)
+            affected += rowcount
+        await cursor.executemany(EVENT_INSERT, [(task_id, event_type) for task_id in written])
+        return affected
+
+    async def complete_tasks(self, task_ids, chunk_size=1000):
+        """Mark many tasks as completed and return how many were found"""
+        await self._resolve_codes(["COMPLETED"])
+        try:
+            return await self._execute_for_ids(
+                f"""
+                UPDATE tasks
+                SET is_completed = TRUE,
+                    status_id = %s,
+                    updated_at = {self.backend.now_sql}
+                """,
+                (self.get_status_id("COMPLETED"),), task_ids, chunk_size, 'complete'
+            )
+        except pymysql.Error as e:
+            raise TaskManagerError(f"Error marking tasks as completed: {str(e)}")
+
+    async def delete_tasks(self, task_ids, chunk_size=1000):
+        """Delete many tasks and return how many were deleted"""
+        try:
+            return await self._execute_for_ids("DELETE FROM tasks", (), task_ids, chunk_size,
+                                               'delete')
+        except pymysql.Error as e:
+            raise TaskManagerError(f"Error deleting tasks: {str(e)}")
+
+    async def update_tasks(self, task_ids, fields, chunk_size=1000):
+        """Apply the same field changes to many tasks and return how many were found"""
+        assignments, values, _ = await self._prepare_update(fields)
+        try:
+            return await self._execute_for_ids(
+                f"UPDATE tasks SET {', '.join(assignments)}",
+                values, task_ids, chunk_size, 'update'
+            )
+        except pymysql.Error as e:
+            raise TaskManagerError(f"Error updating tasks: {str(e)}")
+
+    async def update_where(self, filters, fields, chunk_size=1000):
+        """Apply field changes to every task matching the filters; see TaskManager.update_where"""
+        if not filters:
+            raise TaskManagerError("update_where requires at least one filter")
+        unknown = set(filters) - {'status', 'priority_level', 'due_from', 'due_to', 'is_completed'}
+        if unknown:
+            raise TaskManagerError(f"Unknown filters: {', '.join(sorted(unknown))}")
+        assignments, values, _ = await self._prepare_update(fields)
+        query = TaskQuery.from_filters(**filters)
+        await self._resolve_codes(*query.lookup_codes())
+        select, filter_values = query.select_ids(self, lock=True)
+        try:
+            async with self._transaction() as cursor:
+                await cursor.execute(select, filter_values)
+                task_ids = [row['id'] for row in await cursor.fetchall()]
+                affected = await self._write_ids(
+                    cursor, f"UPDATE tasks SET {', '.join(assignments)}",
+                    values, task_ids, chunk_size, 'update')
+        except pymysql.Error as e:
+            raise TaskManagerError(f"Error updating tasks: {str(e)}")
+        self._invalidate(task_ids)
+        return affected
+
+    async def changes_since(self, seq=0, limit=1000, settle_seconds=CHANGE_SETTLE_SECONDS):
+        """Read the task change log after seq; see TaskManager.changes_since"""
+        sql = backend_sql(CHANGES_SELECT, self.backend)
+        try:
+            async with self._cursor() as cursor:
+                await cursor.execute(sql, (settle_seconds, seq, limit))
+                rows = await cursor.fetchall()
+        except pymysql.Error as e:
+            raise TaskManagerError(f"Error reading task changes: {str(e)}")
+        return fold_changes(rows, seq)
+
+    async def latest_change_seq(self):
+        """Sequence number of the newest change, 0 if there are none"""
+        try:
+            async with self._cursor() as cursor:
+                await cursor.execute(LATEST_CHANGE_SELECT)
+                return (await cursor.fetchone())['seq'] or 0
+        except pymysql.Error as e:
+            raise TaskManagerError(f"Error reading task changes: {str(e)}")
+
+    async def prune_changes(self, before_seq):
+        """Delete change log entries older than before_seq and return how many"""
+        try:
+            async with self._cursor() as cursor:
+                await cursor.execute("DELETE FROM task_events WHERE seq < %s", (before_seq,))
+                return cursor.rowcount
+        except pymysql.Error as e:
+            raise TaskManagerError(f"Error pruning task changes: {str(e)}")
+
+    async def close(self):
+        """Nothing to release: connections are returned after every call"""
+        pass
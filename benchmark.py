@@ -0,0 +1,291 @@
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+STATUS_WEIGHTS = {"PENDING": 50, "IN_PROGRESS": 30, "COMPLETED": 20}
+PRIORITY_WEIGHTS = {"LOW": 30, "MEDIUM": 50, "HIGH": 20}
+
+# (max days ahead, share of tasks): a third due within the reminder window,
+# most within a year, a tail further out
+DUE_DATE_BUCKETS = ((30, 35), (365, 50), (3 * 365, 15))
+
+WORDS = (
+    "review", "draft", "update", "report", "budget", "client", "deploy", "audit",
+    "invoice", "meeting", "schedule", "design", "release", "backlog", "plan",
+    "migrate", "test", "document", "onboard", "sync",
+)
+
+# Project codenames ("kalomine", ...): 10,000 of them, so at 1M rows each
+# one is in about 100 descriptions, a selective search term unlike WORDS
+SYLLABLES = ("ka", "lo", "mi", "ne", "ru", "sa", "ti", "vo", "ze", "pu")
+
+
+def codename(rng):
+    return "".join(rng.choice(SYLLABLES) for _ in range(4))
+
+
+def generate_tasks(count, seed=42):
+    """Yield `count` realistic task_data dicts for TaskManager.create_tasks"""
+    rng = random.Random(seed)
+    statuses = list(STATUS_WEIGHTS)
+    status_weights = list(STATUS_WEIGHTS.values())
+    priorities = list(PRIORITY_WEIGHTS)
+    priority_weights = list(PRIORITY_WEIGHTS.values())
+    buckets = [days for days, _ in DUE_DATE_BUCKETS]
+    bucket_weights = [share for _, share in DUE_DATE_BUCKETS]
+    today = datetime.now()
+    # A separate stream, so the other fields match earlier baselines
+    codenames = random.Random(seed + 7)
+
+    for _ in range(count):
+        max_days = rng.choices(buckets, bucket_weights)[0]
+        due_date = today + timedelta(days=rng.randint(0, max_days))
+        yield {
+            'title': " ".join(rng.choice(WORDS) for _ in range(rng.randint(2, 6))).capitalize(),
+            'description': " ".join(rng.choice(WORDS) for _ in range(rng.randint(5, 60)))
+                           + f" project {codename(codenames)}",
+            'status': rng.choices(statuses, status_weights)[0],
+            'priority_level': rng.choices(priorities, priority_weights)[0],
+            'due_date': due_date.strftime("%m/%d/%Y"),
+        }
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, int(round(fraction * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+def summarize(timings):
+    """Throughput and latency percentiles (milliseconds) for a list of seconds"""
+    ordered = sorted(timings)
+    total = sum(ordered)
+    return {
+        'operations': len(ordered),
+        'ops_per_sec': len(ordered) / total if total else 0.0,
+        'p50_ms': percentile(ordered, 0.50) * 1000,
+        'p95_ms': percentile(ordered, 0.95) * 1000,
+        'p99_ms': percentile(ordered, 0.99) * 1000,
+    }
+
+
+class BenchmarkContext:
+    """State shared by the benchmark cases"""
+
+    def __init__(self, task_manager, task_ids, seed):
+        self.task_manager = task_manager
+        self.task_ids = task_ids
+        self.rng = random.Random(seed)
+        self.seed = seed
+        self._validation_rows = None
+        self.new_tasks = generate_tasks(10 ** 9, seed + 1)
+
+    def random_id(self):
+        return self.rng.choice(self.task_ids)
+
+    @property
+    def validation_rows(self):
+        if self._validation_rows is None:
+            self._validation_rows = list(generate_tasks(VALIDATION_BATCH, self.seed))
+        return self._validation_rows
+
+
+def _create_task(context):
+    task = context.task_manager.create_task(next(context.new_tasks))
+    context.task_ids.append(task['id'])
+
+
+def _update_task(context):
+    context.task_manager.update_task(
+        context.random_id(),
+        {'priority_level': context.rng.choice(list(PRIORITY_WEIGHTS))}
+    )
+
+
+def _validate_per_row(context):
+    from task import Task
+    for task_data in context.validation_rows:
+        Task(task_data['title'], task_data['description'], task_data['status'],
+             task_data['priority_level'], task_data['due_date']).to_dict()
+
+
+def _validate_batch(context):
+    from task_validator import TaskValidator
+    TaskValidator.validate_batch(context.validation_rows)
+
+
+def _search_common(context):
+    # Two of the 20 WORDS: matches a large share of the table, ranked top 20
+    first, second = context.rng.sample(WORDS, 2)
+    context.task_manager.search_tasks(f"{first} {second}", limit=20)
+
+
+def _search_rare(context):
+    context.task_manager.search_tasks(codename(context.rng), limit=20)
+
+
+def _upcoming_tasks(context):
+    # Imported late so DB_BACKEND is set before reminder opens a manager
+    from reminder import get_upcoming_tasks
+    get_upcoming_tasks()
+
+
+# Rows validated per operation by the validate_* cases
+VALIDATION_BATCH = 1000
+
+# name -> (operation, scans the whole table). Full-scan cases run fewer
+# iterations so large row counts finish in reasonable time.
+BENCHMARKS = {
+    'create_task': (_create_task, False),
+    'get_task': (lambda c: c.task_manager.get_task(c.random_id()), False),
+    'get_all_tasks': (lambda c: c.task_manager.get_all_tasks(), True),
+    'get_tasks_by_status': (
+        lambda c: c.task_manager.get_tasks_by_status(c.rng.choice(list(STATUS_WEIGHTS))), True),
+    'get_tasks_by_priority': (
+        lambda c: c.task_manager.get_tasks_by_priority(c.rng.choice(list(PRIORITY_WEIGHTS))), True),
+    'find_tasks': (
+        lambda c: c.task_manager.find_tasks(status="PENDING", priority_level="HIGH",
+                                            is_completed=False, order_by='due_date', limit=50),
+        False),
+    'iter_all_tasks': (lambda c: sum(1 for _ in c.task_manager.iter_all_tasks()), True),
+    'update_task': (_update_task, False),
+    'mark_as_completed': (lambda c: c.task_manager.mark_as_completed(c.random_id()), False),
+    'reminder.get_upcoming_tasks': (_upcoming_tasks, False),
+    'get_stats': (lambda c: c.task_manager.get_stats(), True),
+    'search_tasks_common': (_search_common, True),
+    'search_tasks_rare': (_search_rare, False),
+    'validate_per_row': (_validate_per_row, False),
+    'validate_batch': (_validate_batch, False),
+}
+
+
+def run_benchmarks(task_manager, rows, iterations, scan_iterations, seed=42, only=None,
+                   chunk_size=1000):
+    """Load `rows` synthetic tasks, then time each benchmark case"""
+    started = time.perf_counter()
+    loaded = task_manager.create_tasks(generate_tasks(rows, seed), chunk_size=chunk_size)
+    load_seconds = time.perf_counter() - started
+
+    context = BenchmarkContext(task_manager, loaded['ids'], seed)
+    results = {
+        'load': {
+            'rows': len(loaded['ids']),
+            'seconds': load_seconds,
+            'rows_per_sec': len(loaded['ids']) / load_seconds if load_seconds else 0.0,
+        },
+        'cases': {},
+    }
+
+    for name, (operation, full_scan) in BENCHMARKS.items():
+        if only and name not in only:
+            continue
+        timings = []
+        for _ in range(scan_iterations if full_scan else iterations):
+            started = time.perf_counter()
+            operation(context)
+            timings.append(time.perf_counter() - started)
+        results['cases'][name] = summarize(timings)
+    return results
+
+
+def compare_to_baseline(results, baseline, threshold):
+    """Return (case, metric, baseline, current) for every regression past threshold.
+
+    Timings depend on the backend and the table size, so a baseline taken
+    with another backend or row count raises ValueError instead.
+    """
+    for key in ('backend', 'rows'):
+        if baseline.get(key) != results.get(key):
+            raise ValueError(f"baseline {key} is {baseline.get(key)!r}, "
+                             f"this run's is {results.get(key)!r}")
+    regressions = []
+    for name, current in results['cases'].items():
+        previous = baseline.get('cases', {}).get(name)
+        if not previous:
+            continue
+        for metric in ('p50_ms', 'p95_ms'):
+            if previous[metric] and current[metric] > previous[metric] * (1 + threshold):
+                regressions.append((name, metric, previous[metric], current[metric]))
+    return regressions
+
+
+def print_results(results):
+    load = results['load']
+    print(f"\nLoaded {load['rows']} rows in {load['seconds']:.2f}s "
+          f"({load['rows_per_sec']:.0f} rows/s)\n")
+    print(f"{'case':<28} {'ops':>6} {'ops/s':>10} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for name, case in results['cases'].items():
+        print(f"{name:<28} {case['operations']:>6} {case['ops_per_sec']:>10.1f} "
+              f"{case['p50_ms']:>9.3f} {case['p95_ms']:>9.3f} {case['p99_ms']:>9.3f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Benchmark TaskManager and reminder hot paths on synthetic data")
+    parser.add_argument('--backend', choices=['sqlite', 'memory', 'mysql'], default='sqlite',
+                        help="storage backend; mysql writes to the database configured in .env")
+    parser.add_argument('--sqlite-path', help="SQLite file (default: a fresh temporary file)")
+    parser.add_argument('--rows', type=int, default=1000, help="rows to load, e.g. 1000 to 1000000")
+    parser.add_argument('--iterations', type=int, default=200, help="iterations per case")
+    parser.add_argument('--scan-iterations', type=int, default=5,
+                        help="iterations for cases that read the whole table")
+    parser.add_argument('--case', action='append', dest='cases', choices=sorted(BENCHMARKS),
+                        help="run only this case (repeatable)")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--save-baseline', metavar='PATH', help="write results as JSON")
+    parser.add_argument('--compare', metavar='PATH', help="compare against a saved baseline")
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help="allowed p50/p95 slowdown before flagging a regression")
+    args = parser.parse_args(argv)
+
+    # Select the backend before anything opens a task manager
+    os.environ['DB_BACKEND'] = args.backend
+    if args.backend == 'sqlite':
+        os.environ['SQLITE_PATH'] = args.sqlite_path or os.path.join(
+            tempfile.mkdtemp(prefix="task-bench-"), "tasks.db")
+    elif args.backend == 'memory':
+        os.environ.pop('MEMORY_SNAPSHOT_PATH', None)
+
+    from task_manager import open_task_manager
+    task_manager = open_task_manager()
+    try:
+        results = run_benchmarks(task_manager, args.rows, args.iterations,
+                                 args.scan_iterations, args.seed, args.cases)
+    finally:
+        task_manager.close()
+
+    results['backend'] = args.backend
+    results['rows'] = args.rows
+    print_results(results)
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w', encoding='utf-8') as baseline_file:
+            json.dump(results, baseline_file, indent=2)
+        print(f"\nBaseline written to {args.save_baseline}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as baseline_file:
+            baseline = json.load(baseline_file)
+        try:
+            regressions = compare_to_baseline(results, baseline, args.threshold)
+        except ValueError as e:
+            print(f"\nCannot compare against {args.compare}: {e}")
+            return 2
+        if regressions:
+            print(f"\nRegressions beyond {args.threshold:.0%}:")
+            for name, metric, previous, current in regressions:
+                print(f"  {name} {metric}: {previous:.3f} -> {current:.3f}")
+            return 1
+        print(f"\nNo regressions beyond {args.threshold:.0%} against {args.compare}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
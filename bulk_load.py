@@ -0,0 +1,238 @@
+import argparse
+import csv
+import json
+import os
+import sys
+import tempfile
+import time
+import pymysql
+from task_validator import TaskValidator
+from task_manager import open_task_manager, TaskManagerError, EVENT_INSERT
+
+FIELDS = ('title', 'description', 'status', 'priority_level', 'due_date')
+
+# Server or client refusing LOAD DATA LOCAL INFILE
+LOAD_DATA_DISABLED = (1148, 2068, 3948)
+
+# innodb_autoinc_lock_mode under which a bulk insert's IDs can interleave
+# with other sessions' inserts
+AUTOINC_INTERLEAVED = 2
+
+
+def read_records(path, file_format):
+    """Yield (line_number, record, error) from a CSV or JSONL file.
+
+    CSV files need a header row naming the task fields. Records that cannot
+    be parsed are yielded with record None and the parse error.
+    """
+    with open(path, newline='', encoding='utf-8') as source:
+        if file_format == 'csv':
+            reader = csv.DictReader(source)
+            for record in reader:
+                yield reader.line_num, record, None
+        else:
+            for line_number, line in enumerate(source, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError as e:
+                    yield line_number, None, f"Invalid JSON: {e}"
+                    continue
+                if not isinstance(record, dict):
+                    yield line_number, None, "Each line must be a JSON object"
+                    continue
+                yield line_number, record, None
+
+
+def _escape_field(value):
+    """Escape a value for LOAD DATA's default tab-separated format"""
+    return (str(value).replace('\\', '\\\\').replace('\t', '\\t')
+            .replace('\n', '\\n').replace('\r', '\\r'))
+
+
+class BulkLoader:
+    """Stream task records into the database in validated batches.
+
+    On MySQL each batch is written to a temporary tab-separated file and
+    loaded with LOAD DATA LOCAL INFILE; if the server or client refuses
+    local infile, or innodb_autoinc_lock_mode is 2 (interleaved, so a load's
+    IDs may not be consecutive), the loader falls back to create_tasks'
+    chunked multi-row INSERT for the rest of the run. Other backends always use create_tasks.
+    Invalid records are written to the reject file as JSON lines.
+    """
+
+    def __init__(self, task_manager, batch_size=5000, use_load_data=True,
+                 rejects=None, progress_every=50000):
+        self.task_manager = task_manager
+        self.batch_size = batch_size
+        self.use_load_data = use_load_data and task_manager.backend.name == 'mysql'
+        self.rejects = rejects
+        self.progress_every = progress_every
+        self._infile_connection = None
+        self.stats = {'read': 0, 'loaded': 0, 'rejected': 0, 'seconds': 0.0,
+                      'method': 'load_data' if self.use_load_data else 'insert'}
+
+    def _reject(self, line_number, record, error):
+        self.stats['rejected'] += 1
+        if self.rejects:
+            self.rejects.write(json.dumps(
+                {'line': line_number, 'error': error, 'record': record}, default=str) + "\n")
+
+    def load(self, records):
+        """Load (line_number, record, error) tuples and return the run statistics"""
+        started = time.perf_counter()
+        next_report = self.progress_every
+        batch = []
+        try:
+            for line_number, record, error in records:
+                self.stats['read'] += 1
+                if error:
+                    self._reject(line_number, record, error)
+                    continue
+                batch.append((line_number, record))
+                if len(batch) >= self.batch_size:
+                    self._load_batch(batch)
+                    batch = []
+                if self.progress_every and self.stats['read'] >= next_report:
+                    self._report(started)
+                    next_report += self.progress_every
+            if batch:
+                self._load_batch(batch)
+        finally:
+            if self._infile_connection is not None:
+                self._infile_connection.close()
+        self.stats['seconds'] = time.perf_counter() - started
+        return self.stats
+
+    def _report(self, started):
+        elapsed = time.perf_counter() - started
+        rate = self.stats['loaded'] / elapsed if elapsed else 0.0
+        print(f"{self.stats['read']} read, {self.stats['loaded']} loaded, "
+              f"{self.stats['rejected']} rejected ({rate:.0f} rows/s)")
+
+    def _load_batch(self, batch):
+        if self.use_load_data:
+            records, errors = TaskValidator.validate_batch([record for _, record in batch])
+            rejected = [batch[index] + (message,) for index, message in errors]
+            rows = []
+            for index, record in records:
+                try:
+                    rows.append(self.task_manager.row_from_record(record))
+                except TaskManagerError as e:
+                    rejected.append(batch[index] + (str(e),))
+            loaded = self._load_data_infile(rows) if rows else 0
+            if loaded is not None:
+                # LOAD DATA skips rows it cannot convert, so count what it wrote
+                self.stats['loaded'] += loaded
+                for reject in rejected:
+                    self._reject(*reject)
+                return
+            # LOAD DATA was refused; create_tasks validates and reports this
+            # batch itself
+
+        result = self.task_manager.create_tasks(
+            [record for _, record in batch], chunk_size=min(self.batch_size, 1000))
+        self.stats['loaded'] += len(result['ids'])
+        for index, error in result['errors']:
+            line_number, record = batch[index]
+            self._reject(line_number, record, error)
+
+    def _load_data_infile(self, rows):
+        """Load validated rows with LOAD DATA LOCAL INFILE.
+
+        Returns the number of rows loaded, or None if LOAD DATA was refused
+        or the server may give the loaded rows non-consecutive IDs.
+        """
+        if self._infile_connection is None:
+            self._infile_connection = pymysql.connect(
+                **dict(self.task_manager.backend.pool.connect_kwargs, local_infile=True))
+            with self._infile_connection.cursor() as cursor:
+                cursor.execute("SELECT @@innodb_autoinc_lock_mode AS mode")
+                mode = cursor.fetchone()['mode']
+            if mode == AUTOINC_INTERLEAVED:
+                # The loaded rows' IDs need not be consecutive, so the change
+                # log could not be written from LAST_INSERT_ID() and ROW_COUNT()
+                return self._fall_back("innodb_autoinc_lock_mode is 2")
+
+        with tempfile.NamedTemporaryFile('w', suffix='.tsv', encoding='utf-8',
+                                         newline='\n', delete=False) as infile:
+            for row in rows:
+                infile.write("\t".join(_escape_field(value) for value in row) + "\n")
+        try:
+            self._infile_connection.begin()
+            with self._infile_connection.cursor() as cursor:
+                cursor.execute("""
+                    LOAD DATA LOCAL INFILE %s INTO TABLE tasks
+                    CHARACTER SET utf8mb4
+                    FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\'
+                    LINES TERMINATED BY '\\n'
+                    (title, description, status_id, priority_level_id, due_date)
+                """, (infile.name,))
+                # LAST_INSERT_ID() and ROW_COUNT() of the statement give the
+                # loaded ID range, as for create_tasks' multi-row INSERT
+                loaded = cursor.rowcount
+                first_id = self.task_manager.backend.first_insert_id(cursor, loaded)
+                cursor.executemany(EVENT_INSERT, [(task_id, 'create') for task_id
+                                                  in range(first_id, first_id + loaded)])
+            self._infile_connection.commit()
+            return loaded
+        except pymysql.err.OperationalError as e:
+            self._infile_connection.rollback()
+            if e.args and e.args[0] in LOAD_DATA_DISABLED:
+                return self._fall_back(e)
+            raise
+        finally:
+            os.unlink(infile.name)
+
+    def _fall_back(self, reason):
+        """Use multi-row INSERT for the rest of the run; returns None for _load_data_infile"""
+        print(f"LOAD DATA LOCAL INFILE unavailable ({reason}); using multi-row INSERT")
+        self.use_load_data = False
+        self.stats['method'] = 'insert'
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk load tasks from CSV or JSONL")
+    parser.add_argument('path', help="input file with title, description, status, "
+                                     "priority_level and due_date (MM/DD/YYYY) fields")
+    parser.add_argument('--format', choices=['csv', 'jsonl'],
+                        help="input format (default: from the file extension)")
+    parser.add_argument('--batch-size', type=int, default=5000)
+    parser.add_argument('--rejects', help="file for rejected rows (default: <path>.rejects.jsonl)")
+    parser.add_argument('--no-load-data', action='store_true',
+                        help="use multi-row INSERT even on MySQL")
+    parser.add_argument('--progress-every', type=int, default=50000,
+                        help="print progress every N rows read (0 disables)")
+    args = parser.parse_args(argv)
+
+    file_format = args.format or ('csv' if args.path.lower().endswith('.csv') else 'jsonl')
+    rejects_path = args.rejects or f"{args.path}.rejects.jsonl"
+
+    task_manager = None
+    try:
+        task_manager = open_task_manager()
+        with open(rejects_path, 'w', encoding='utf-8') as rejects:
+            loader = BulkLoader(task_manager, args.batch_size, not args.no_load_data,
+                                rejects, args.progress_every)
+            stats = loader.load(read_records(args.path, file_format))
+    except (TaskManagerError, pymysql.Error, OSError) as e:
+        print(f"Error loading tasks: {e}")
+        return 2
+    finally:
+        if task_manager:
+            task_manager.close()
+
+    rate = stats['loaded'] / stats['seconds'] if stats['seconds'] else 0.0
+    print(f"\nLoaded {stats['loaded']} of {stats['read']} rows in {stats['seconds']:.2f}s "
+          f"({rate:.0f} rows/s, {stats['method']})")
+    if stats['rejected']:
+        print(f"{stats['rejected']} rejected rows written to {rejects_path}")
+    else:
+        os.unlink(rejects_path)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
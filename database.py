@@ -1,108 +1,335 @@
 import os
+import threading
+import time
 import pymysql
+import pymysql.constants.CLIENT
+from pymysql.constants import SERVER_STATUS
 from dotenv import load_dotenv
-from status import Status
-from priority_level import PriorityLevel
+from migrations import migrate
+from storage import StorageBackend
+from metrics import metrics, QueryTimingMixin
 
 load_dotenv()
 
-class Database:
-    def __init__(self):
-        self.connection = None
+
+class InstrumentedDictCursor(QueryTimingMixin, pymysql.cursors.DictCursor):
+    """DictCursor recording statement timings"""
+
+
+class InstrumentedSSDictCursor(QueryTimingMixin, pymysql.cursors.SSDictCursor):
+    """Unbuffered SSDictCursor recording statement timings"""
+
+
+class PoolTimeoutError(pymysql.err.OperationalError):
+    """Raised when no pooled connection becomes available in time"""
+    pass
+
+
+class ConnectionPool:
+    """Bounded pool of reusable MySQL connections.
+
+    Connections are handed out LIFO so the warmest one is reused first.
+    Idle connections older than max_idle_time and connections older than
+    max_lifetime are closed instead of being reused, and a connection that
+    has sat idle for at least ping_interval seconds is pinged before it is
+    handed out.
+    """
+
+    def __init__(self, max_size=10, max_idle_time=300, max_lifetime=3600,
+                 timeout=10, ping_interval=5, **connect_kwargs):
+        self.max_size = max_size
+        self.max_idle_time = max_idle_time
+        self.max_lifetime = max_lifetime
+        self.timeout = timeout
+        self.ping_interval = ping_interval
+        self.connect_kwargs = connect_kwargs
+
+        self._lock = threading.Condition(threading.Lock())
+        self._idle = []          # [(connection, last_used)], most recent last
+        self._created_at = {}    # id(connection) -> creation time
+        self._size = 0           # open connections, idle + in use + connecting
+        self._closed = False
+        self._stats = {
+            'created': 0,
+            'reused': 0,
+            'checkouts': 0,
+            'waits': 0,
+            'wait_time': 0.0,
+            'timeouts': 0,
+            'pings': 0,
+            'failed_pings': 0,
+            'evicted_idle': 0,
+            'evicted_lifetime': 0,
+            'discarded': 0,
+        }
+
+    def _connect(self):
+        """Open a new physical connection"""
+        connection = pymysql.connect(**self.connect_kwargs)
+        print("Successfully connected to MySQL database")
+        return connection
+
+    def _expired(self, connection, now):
+        return now - self._created_at.get(id(connection), now) >= self.max_lifetime
+
+    def _discard(self, connection):
+        """Free a connection's slot (lock must be held); close it with _close after unlocking"""
+        self._created_at.pop(id(connection), None)
+        self._size -= 1
+        self._lock.notify()
+
+    @staticmethod
+    def _close(connections):
+        """Close discarded connections; called without the lock held, as closing does I/O"""
+        for connection in connections:
+            try:
+                connection.close()
+            except pymysql.Error:
+                pass
+
+    def _evict_idle(self, now):
+        """Discard idle connections past their idle time or lifetime and return them"""
+        kept = []
+        evicted = []
+        for connection, last_used in self._idle:
+            if now - last_used >= self.max_idle_time:
+                self._stats['evicted_idle'] += 1
+            elif self._expired(connection, now):
+                self._stats['evicted_lifetime'] += 1
+            else:
+                kept.append((connection, last_used))
+                continue
+            self._discard(connection)
+            evicted.append(connection)
+        self._idle = kept
+        return evicted
+
+    def acquire(self):
+        """Check a connection out of the pool, opening one if there is room"""
+        deadline = time.monotonic() + self.timeout
+        waited = False
+        started = time.monotonic()
+
+        while True:
+            with self._lock:
+                evicted = self._evict_idle(time.monotonic())
+            self._close(evicted)
+
+            with self._lock:
+                if self._closed:
+                    raise pymysql.err.OperationalError("Connection pool is closed")
+
+                if self._idle:
+                    connection, last_used = self._idle.pop()
+                    idle_for = time.monotonic() - last_used
+                elif self._size < self.max_size:
+                    # Reserve the slot, then connect outside the lock
+                    self._size += 1
+                    connection = None
+                else:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._stats['timeouts'] += 1
+                        raise PoolTimeoutError(
+                            f"No database connection available after {self.timeout}s "
+                            f"(pool size {self.max_size})")
+                    waited = True
+                    self._lock.wait(remaining)
+                    continue
+
+            if connection is None:
+                try:
+                    connection = self._connect()
+                except pymysql.Error:
+                    with self._lock:
+                        self._size -= 1
+                        self._lock.notify()
+                    raise
+                with self._lock:
+                    self._created_at[id(connection)] = time.monotonic()
+                    self._stats['created'] += 1
+                    break
+
+            if idle_for >= self.ping_interval:
+                with self._lock:
+                    self._stats['pings'] += 1
+                try:
+                    connection.ping(reconnect=False)
+                except pymysql.Error:
+                    with self._lock:
+                        self._stats['failed_pings'] += 1
+                        self._discard(connection)
+                    self._close([connection])
+                    continue
+
+            with self._lock:
+                self._stats['reused'] += 1
+            break
+
+        with self._lock:
+            self._stats['checkouts'] += 1
+            if waited:
+                self._stats['waits'] += 1
+                self._stats['wait_time'] += time.monotonic() - started
+        metrics.record_acquire('mysql', time.monotonic() - started)
+        return connection
+
+    def release(self, connection):
+        """Return a connection to the pool"""
+        # Never hand the next borrower an open transaction or a stale snapshot.
+        # The server status of the last reply tells whether one is open, so an
+        # autocommit connection that never called begin() skips the round trip.
         try:
-            self.connection = pymysql.connect(
+            if (not connection.get_autocommit()
+                    or connection.server_status & SERVER_STATUS.SERVER_STATUS_IN_TRANS):
+                connection.rollback()
+            healthy = connection.open
+        except pymysql.Error:
+            healthy = False
+
+        with self._lock:
+            now = time.monotonic()
+            if self._closed or not healthy:
+                self._stats['discarded'] += 1
+            elif self._expired(connection, now):
+                self._stats['evicted_lifetime'] += 1
+            else:
+                self._idle.append((connection, now))
+                self._lock.notify()
+                return
+            self._discard(connection)
+        self._close([connection])
+
+    def stats(self):
+        """Return a snapshot of pool usage counters for sizing the pool"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['max_size'] = self.max_size
+            stats['size'] = self._size
+            stats['idle'] = len(self._idle)
+            stats['in_use'] = self._size - len(self._idle)
+            return stats
+
+    def close_all(self):
+        """Close every idle connection and refuse further checkouts"""
+        with self._lock:
+            self._closed = True
+            idle = [connection for connection, _ in self._idle]
+            for connection in idle:
+                self._discard(connection)
+            self._idle = []
+            self._lock.notify_all()
+        self._close(idle)
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """Return the process-wide connection pool, creating it on first use"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ConnectionPool(
+                max_size=int(os.getenv('DB_POOL_SIZE', 10)),
+                max_idle_time=float(os.getenv('DB_POOL_MAX_IDLE', 300)),
+                max_lifetime=float(os.getenv('DB_POOL_MAX_LIFETIME', 3600)),
+                timeout=float(os.getenv('DB_POOL_TIMEOUT', 10)),
+                ping_interval=float(os.getenv('DB_POOL_PING_INTERVAL', 5)),
                 host=os.getenv('DB_HOST'),
                 user=os.getenv('DB_USER'),
                 password=os.getenv('DB_PASSWORD'),
                 database=os.getenv('DB_NAME'),
                 charset='utf8mb4',
-                cursorclass=pymysql.cursors.DictCursor
+                cursorclass=InstrumentedDictCursor,
+                # Report matched rather than changed rows for UPDATE
+                client_flag=pymysql.constants.CLIENT.FOUND_ROWS,
+                # Each statement commits on its own, so reads never hold a
+                # stale snapshot; multi-statement writes call begin()
+                autocommit=True
             )
-            print("Successfully connected to MySQL database")
-            
-            # Initialize Status and PriorityLevel to get their values
-            self.status_manager = Status("")
-            self.priority_manager = PriorityLevel("")
-            
+        return _pool
+
+
+def pool_stats():
+    """Return usage statistics for the process-wide connection pool"""
+    return get_pool().stats()
+
+
+class MySQLBackend(StorageBackend):
+    """MySQL storage over the process-wide connection pool"""
+
+    name = 'mysql'
+    streaming_cursor = InstrumentedSSDictCursor
+
+    def __init__(self, pool=None):
+        super().__init__()
+        self.pool = pool or get_pool()
+
+    def open(self):
+        return Database(pool=self.pool, backend=self)
+
+    def days_left_sql(self, column):
+        return f"DATEDIFF({column}, CURDATE())"
+
+    def days_from_today_sql(self, placeholder):
+        return f"CURDATE() + INTERVAL {placeholder} DAY"
+
+    def seconds_ago_sql(self, placeholder):
+        return f"NOW() - INTERVAL {placeholder} SECOND"
+
+    def fulltext_sql(self, terms):
+        # Boolean mode with every term required; MySQL runs identical MATCH()
+        # expressions in the select list and WHERE clause only once
+        match = "MATCH(t.title, t.description) AGAINST (%s IN BOOLEAN MODE)"
+        text = " ".join(f"+{term}" for term in terms)
+        return "", match, match, [text, text]
+
+    def first_insert_id(self, cursor, row_count):
+        # MySQL reports the ID of the first row of a multi-row INSERT
+        return cursor.lastrowid
+
+    def is_missing_table_error(self, error):
+        # 1146: table doesn't exist
+        return (isinstance(error, pymysql.err.ProgrammingError)
+                and bool(error.args) and error.args[0] == 1146)
+
+    def stats(self):
+        return self.pool.stats()
+
+    def close(self):
+        self.pool.close_all()
+
+
+class Database:
+    def __init__(self, pool=None, backend=None):
+        self.connection = None
+        self.pool = pool or get_pool()
+        self.backend = backend or MySQLBackend(self.pool)
+        try:
+            self.connection = self.pool.acquire()
         except pymysql.Error as e:
             print(f"Error connecting to MySQL: {e}")
 
     def create_tables(self):
+        """Bring the schema up to date by applying pending migrations"""
         if self.connection is None:
             print("No database connection")
             return
 
         try:
-            with self.connection.cursor() as cursor:
-                # Create status table
-                cursor.execute("""
-                    CREATE TABLE IF NOT EXISTS statuses (
-                        id INT AUTO_INCREMENT PRIMARY KEY,
-                        status_code VARCHAR(20) UNIQUE NOT NULL
-                    )
-                """)
-
-                # Create priority levels table
-                cursor.execute("""
-                    CREATE TABLE IF NOT EXISTS priority_levels (
-                        id INT AUTO_INCREMENT PRIMARY KEY,
-                        priority_level_code VARCHAR(20) UNIQUE NOT NULL
-                    )
-                """)
-
-                # Create tasks table with foreign keys
-                cursor.execute("""
-                    CREATE TABLE IF NOT EXISTS tasks (
-                        id INT AUTO_INCREMENT PRIMARY KEY,
-                        title VARCHAR(100) NOT NULL,
-                        description TEXT NOT NULL,
-                        status_id INT NOT NULL,
-                        priority_level_id INT NOT NULL,
-                        due_date DATETIME NOT NULL,
-                        is_completed BOOLEAN DEFAULT FALSE,
-                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP 
-                        ON UPDATE CURRENT_TIMESTAMP,
-                        FOREIGN KEY (status_id) REFERENCES statuses(id),
-                        FOREIGN KEY (priority_level_id) REFERENCES 
-                        priority_levels(id)
-                    )
-                """)
-
-                # Insert default statuses from Status class
-                cursor.execute("SELECT COUNT(*) as count FROM statuses")
-                result = cursor.fetchone()
-                if result['count'] == 0:
-                    status_values = [(code,) for code in self.status_manager.stored_statuses.keys()]
-                    cursor.executemany(
-                        "INSERT INTO statuses (status_code) VALUES (%s)",
-                        status_values
-                    )
-
-                # Insert default priority levels from PriorityLevel class
-                cursor.execute("SELECT COUNT(*) as count FROM priority_levels")
-                result = cursor.fetchone()
-                if result['count'] == 0:
-                    priority_values = [(code,) for code in self.priority_manager.stored_priority_levels.keys()]
-                    cursor.executemany(
-                        "INSERT INTO priority_levels (priority_level_code) VALUES (%s)",
-                        priority_values
-                    )
-
-                self.connection.commit()
-
+            migrate(self.connection, self.backend)
         except pymysql.Error as e:
             print(f"Error creating tables: {e}")
 
     def close(self):
-        """Explicitly close the database connection"""
-        try:
-            if self.connection:
-                self.connection.close()
-                self.connection = None
-        except pymysql.Error:
-            pass  # Ignore errors during closing
+        """Return the connection to the pool"""
+        if self.connection:
+            connection = self.connection
+            self.connection = None
+            self.pool.release(connection)
 
     def __del__(self):
-        """Ensure connection is closed when object is destroyed"""
+        """Ensure connection is returned when object is destroyed"""
         self.close() 
\ No newline at end of file
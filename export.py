@@ -0,0 +1,303 @@
+import argparse
+import csv
+import gzip
+import io
+import json
+import struct
+import sys
+from array import array
+from datetime import datetime, timedelta
+import pymysql
+from priority_level import PriorityLevel
+from status import Status
+from task_manager import open_task_manager, TaskManagerError, TaskQuery
+
+FORMATS = ('csv', 'jsonl', 'columnar')
+
+EPOCH = datetime(1970, 1, 1)
+
+COLUMNAR_MAGIC = b"TASKCOL1"
+
+# Columnar layout, all integers little-endian:
+#   magic, uint32 header length, JSON header (columns and dictionaries),
+#   then row groups of uint32 row count followed by every column in order,
+#   and finally a row group with count 0. Kinds:
+#     int64    - 8-byte signed integers
+#     datetime - int64 seconds since 1970-01-01, naive as stored
+#     bool     - one byte per row
+#     dict     - one-byte index into the header's dictionary for the column
+#     text     - uint32 byte lengths, then the concatenated UTF-8 bytes
+COLUMNAR_COLUMNS = (
+    ('id', 'int64'),
+    ('title', 'text'),
+    ('description', 'text'),
+    ('due_date', 'datetime'),
+    ('is_completed', 'bool'),
+    ('created_at', 'datetime'),
+    ('updated_at', 'datetime'),
+    ('status_code', 'dict'),
+    ('priority_level_code', 'dict'),
+)
+
+ARRAY_TYPES = {'int64': 'q', 'datetime': 'q', 'bool': 'B', 'dict': 'B'}
+
+
+def _pack(typecode, values):
+    packed = array(typecode, values)
+    if sys.byteorder != 'little':
+        packed.byteswap()
+    return packed.tobytes()
+
+
+def _unpack(typecode, data):
+    values = array(typecode)
+    values.frombytes(data)
+    if sys.byteorder != 'little':
+        values.byteswap()
+    return values
+
+
+def _json_value(value):
+    return value.isoformat(sep=' ') if isinstance(value, datetime) else value
+
+
+class CsvWriter:
+    """Writes tasks as CSV with a header row"""
+
+    binary = False
+
+    def __init__(self, output, columns):
+        self.writer = csv.DictWriter(output, fieldnames=columns, extrasaction='ignore')
+        self.writer.writeheader()
+
+    def write_page(self, tasks):
+        self.writer.writerows(tasks)
+
+    def close(self):
+        pass
+
+
+class JsonlWriter:
+    """Writes one JSON object per line"""
+
+    binary = False
+
+    def __init__(self, output, columns):
+        self.output = output
+        self.columns = columns
+
+    def write_page(self, tasks):
+        self.output.write("".join(
+            json.dumps({column: _json_value(task[column]) for column in self.columns}) + "\n"
+            for task in tasks
+        ))
+
+    def close(self):
+        pass
+
+
+class ColumnarWriter:
+    """Writes tasks in the compact columnar layout, one row group per page.
+
+    Status and priority codes are dictionary-encoded against the codes
+    known to Status and PriorityLevel, so the header can be written up front
+    and each page streamed out as soon as it is read.
+    """
+
+    binary = True
+
+    def __init__(self, output, columns=None):
+        self.output = output
+        self.dictionaries = {
+            'status_code': list(Status.statuses),
+            'priority_level_code': list(PriorityLevel.priority_levels),
+        }
+        self._codes = {name: {code: index for index, code in enumerate(codes)}
+                       for name, codes in self.dictionaries.items()}
+        header = json.dumps({
+            'columns': [list(column) for column in COLUMNAR_COLUMNS],
+            'dictionaries': self.dictionaries,
+        }).encode('utf-8')
+        output.write(COLUMNAR_MAGIC + struct.pack('<I', len(header)) + header)
+
+    def _encode(self, name, value):
+        try:
+            return self._codes[name][value]
+        except KeyError:
+            raise TaskManagerError(f"Cannot export unknown {name} {value!r}")
+
+    def write_page(self, tasks):
+        if not tasks:
+            return
+        block = [struct.pack('<I', len(tasks))]
+        for name, kind in COLUMNAR_COLUMNS:
+            values = [task[name] for task in tasks]
+            if kind == 'text':
+                encoded = [value.encode('utf-8') for value in values]
+                block.append(_pack('I', [len(value) for value in encoded]))
+                block.extend(encoded)
+            elif kind == 'datetime':
+                block.append(_pack('q', [int((value - EPOCH).total_seconds())
+                                         for value in values]))
+            elif kind == 'dict':
+                block.append(_pack('B', [self._encode(name, value) for value in values]))
+            else:
+                block.append(_pack(ARRAY_TYPES[kind], [int(value) for value in values]))
+        self.output.write(b"".join(block))
+
+    def close(self):
+        self.output.write(struct.pack('<I', 0))
+
+
+WRITERS = {'csv': CsvWriter, 'jsonl': JsonlWriter, 'columnar': ColumnarWriter}
+
+
+def _read_exact(source, size):
+    data = source.read(size)
+    if len(data) != size:
+        raise ValueError("Truncated columnar export")
+    return data
+
+
+def read_columnar(source):
+    """Yield task dicts from a columnar export opened in binary mode"""
+    if _read_exact(source, len(COLUMNAR_MAGIC)) != COLUMNAR_MAGIC:
+        raise ValueError("Not a columnar task export")
+    header_size, = struct.unpack('<I', _read_exact(source, 4))
+    header = json.loads(_read_exact(source, header_size))
+    dictionaries = header['dictionaries']
+
+    while True:
+        count, = struct.unpack('<I', _read_exact(source, 4))
+        if not count:
+            return
+        columns = {}
+        for name, kind in header['columns']:
+            if kind == 'text':
+                lengths = _unpack('I', _read_exact(source, 4 * count))
+                data = _read_exact(source, sum(lengths))
+                values, offset = [], 0
+                for length in lengths:
+                    values.append(data[offset:offset + length].decode('utf-8'))
+                    offset += length
+            else:
+                typecode = ARRAY_TYPES[kind]
+                size = array(typecode).itemsize * count
+                values = _unpack(typecode, _read_exact(source, size))
+                if kind == 'datetime':
+                    values = [EPOCH + timedelta(seconds=value) for value in values]
+                elif kind == 'bool':
+                    values = [bool(value) for value in values]
+                elif kind == 'dict':
+                    values = [dictionaries[name][value] for value in values]
+                else:
+                    values = list(values)
+            columns[name] = values
+        names = list(columns)
+        for row in zip(*columns.values()):
+            yield dict(zip(names, row))
+
+
+def open_output(path, file_format, compress=False):
+    """Open an export destination for writing; '-' means stdout"""
+    binary = WRITERS[file_format].binary
+    if path == '-':
+        if not (binary or compress):
+            return sys.stdout
+        stream = sys.stdout.buffer
+        if compress:
+            stream = gzip.GzipFile(fileobj=stream, mode='wb')
+        if binary:
+            return stream
+        return io.TextIOWrapper(stream, encoding='utf-8', newline='')
+    if compress:
+        if binary:
+            return gzip.open(path, 'wb')
+        return gzip.open(path, 'wt', encoding='utf-8', newline='')
+    if binary:
+        return open(path, 'wb')
+    return open(path, 'w', encoding='utf-8', newline='')
+
+
+def export_tasks(task_manager, output, file_format='csv', filters=None, page_size=1000):
+    """Stream tasks matching filters to output; return the number of rows written.
+
+    Rows come from iter_task_pages, so only one page is held in memory at a
+    time. filters takes the find_tasks filters status, priority_level,
+    due_from, due_to and is_completed.
+    """
+    columns = list(TaskQuery.DEFAULT_COLUMNS)
+    writer = WRITERS[file_format](output, columns)
+    rows = 0
+    for page, _ in task_manager.iter_task_pages(page_size=page_size, filters=filters):
+        writer.write_page(page)
+        rows += len(page)
+    writer.close()
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Export tasks to CSV, JSONL or the compact columnar format")
+    parser.add_argument('path', help="output file, or - for stdout")
+    parser.add_argument('--format', choices=FORMATS,
+                        help="output format (default: from the file extension, else csv)")
+    parser.add_argument('--gzip', action='store_true', help="gzip-compress the output")
+    parser.add_argument('--status', action='append', help="status code (repeatable)")
+    parser.add_argument('--priority', action='append', help="priority level code (repeatable)")
+    parser.add_argument('--due-from', help="earliest due date, YYYY-MM-DD [HH:MM:SS]")
+    parser.add_argument('--due-to', help="latest due date, YYYY-MM-DD [HH:MM:SS]")
+    completed = parser.add_mutually_exclusive_group()
+    completed.add_argument('--completed', dest='is_completed', action='store_true', default=None,
+                           help="only completed tasks")
+    completed.add_argument('--open', dest='is_completed', action='store_false',
+                           help="only tasks not yet completed")
+    parser.add_argument('--page-size', type=int, default=1000,
+                        help="rows fetched per round trip")
+    args = parser.parse_args(argv)
+
+    name = args.path.lower()
+    if name.endswith('.gz'):
+        name = name[:-3]
+    file_format = args.format or next(
+        (f for f in FORMATS if name.endswith('.' + f)),
+        'columnar' if name.endswith('.bin') else 'csv')
+    compress = args.gzip or args.path.lower().endswith('.gz')
+
+    filters = {
+        'status': args.status,
+        'priority_level': args.priority,
+        'due_from': args.due_from,
+        'due_to': args.due_to,
+        'is_completed': args.is_completed,
+    }
+    filters = {key: value for key, value in filters.items() if value is not None}
+
+    task_manager = None
+    try:
+        task_manager = open_task_manager()
+        output = open_output(args.path, file_format, compress)
+        try:
+            rows = export_tasks(task_manager, output, file_format, filters, args.page_size)
+        finally:
+            if args.path == '-':
+                output.flush()
+                if compress:
+                    output.close()
+            else:
+                output.close()
+    except (TaskManagerError, pymysql.Error, OSError) as e:
+        print(f"Error exporting tasks: {e}", file=sys.stderr)
+        return 2
+    finally:
+        if task_manager:
+            task_manager.close()
+
+    if args.path != '-':
+        print(f"Exported {rows} tasks to {args.path} ({file_format}"
+              f"{', gzip' if compress else ''})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,67 @@
+import threading
+
+
+class LookupCache:
+    """Code <-> id map for the statuses and priority_levels tables.
+
+    The lookup tables are tiny and almost never change, so each storage
+    backend loads them once and shares the map with every TaskManager using
+    it. Call invalidate() (or TaskManager.refresh_lookups()) after changing
+    either table.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._status_ids = {}
+        self._status_codes = {}
+        self._priority_ids = {}
+        self._priority_codes = {}
+
+    @property
+    def loaded(self):
+        return self._loaded
+
+    def load(self, connection):
+        """(Re)load both lookup tables from the database"""
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT id, status_code FROM statuses")
+            statuses = cursor.fetchall()
+            cursor.execute("SELECT id, priority_level_code FROM priority_levels")
+            priorities = cursor.fetchall()
+        self.replace(statuses, priorities)
+
+    def replace(self, statuses, priorities):
+        """Install lookup rows fetched by the caller (e.g. over an async driver)"""
+        status_ids = {row['status_code']: row['id'] for row in statuses}
+        priority_ids = {row['priority_level_code']: row['id'] for row in priorities}
+
+        # Swap in complete maps so readers never see a half-built cache
+        with self._lock:
+            self._status_ids = status_ids
+            self._status_codes = {v: k for k, v in status_ids.items()}
+            self._priority_ids = priority_ids
+            self._priority_codes = {v: k for k, v in priority_ids.items()}
+            self._loaded = True
+
+    def ensure_loaded(self, connection):
+        """Load the lookup tables if they have not been loaded yet"""
+        if not self._loaded:
+            self.load(connection)
+
+    def invalidate(self):
+        """Forget the cached maps; the next lookup reloads them"""
+        with self._lock:
+            self._loaded = False
+
+    def status_id(self, status_code):
+        return self._status_ids.get(status_code)
+
+    def status_code(self, status_id):
+        return self._status_codes.get(status_id)
+
+    def priority_id(self, priority_code):
+        return self._priority_ids.get(priority_code)
+
+    def priority_code(self, priority_id):
+        return self._priority_codes.get(priority_id)
@@ -0,0 +1,624 @@
+import bisect
+import json
+import os
+import threading
+from datetime import date, datetime, timedelta
+from status import Status
+from priority_level import PriorityLevel
+from task import Task
+from task_validator import TaskValidator
+from task_manager import TaskManagerError, TaskQuery, _merge_filters, date_bound, fold_stats
+from search_index import InvertedIndex, search_terms
+
+# Lookup IDs follow the seeding order used by the SQL migrations
+STATUS_IDS = {code: i for i, code in enumerate(Status.statuses, start=1)}
+PRIORITY_IDS = {code: i for i, code in enumerate(PriorityLevel.priority_levels, start=1)}
+
+DATETIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+def _as_datetime(value):
+    """Accept a datetime, date or database-format string"""
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, date):
+        return datetime(value.year, value.month, value.day)
+    value = str(value)
+    if len(value) == 10:
+        return datetime.strptime(value, '%Y-%m-%d')
+    return datetime.strptime(value, DATETIME_FORMAT)
+
+
+class TaskRecord:
+    """One stored task; slots keep large in-memory tables compact"""
+
+    __slots__ = ('id', 'title', 'description', 'status_code', 'priority_level_code',
+                 'due_date', 'is_completed', 'created_at', 'updated_at')
+
+    def __init__(self, id, title, description, status_code, priority_level_code,
+                 due_date, is_completed=0, created_at=None, updated_at=None):
+        now = datetime.now().replace(microsecond=0)
+        self.id = id
+        self.title = title
+        self.description = description
+        self.status_code = status_code
+        self.priority_level_code = priority_level_code
+        self.due_date = due_date
+        self.is_completed = is_completed
+        self.created_at = created_at or now
+        self.updated_at = updated_at or now
+
+    def to_row(self, columns=TaskQuery.DEFAULT_COLUMNS, today=None):
+        """Return the record shaped like a TaskManager result row"""
+        row = {}
+        for column in columns:
+            if column == 'days_left':
+                row['days_left'] = (self.due_date.date() - (today or date.today())).days
+            else:
+                row[column] = getattr(self, column)
+        return row
+
+
+class MemoryTaskStore:
+    """Tasks held in memory with secondary indexes.
+
+    Status and priority lookups go through per-code ID sets and due date
+    ranges through a sorted (due_date, id) list searched with bisect, so
+    neither scans the whole table. Task counts per status, priority and
+    completion are kept up to date on every write for get_stats, and titles
+    and descriptions in an inverted index for search. Writes append to a
+    change log of (seq, task_id, event_type, created_at) tuples for
+    changes_since. All access is serialised by one lock.
+    """
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self._reset()
+
+    def _reset(self):
+        self.records = {}
+        self.by_status = {code: set() for code in STATUS_IDS}
+        self.by_priority = {code: set() for code in PRIORITY_IDS}
+        self.by_due_date = []
+        self.counts = {}  # (status_code, priority_level_code, is_completed) -> tasks
+        self.text_index = InvertedIndex()
+        self.next_id = 1
+        self.events = []
+        self.next_seq = 1
+
+    def _count(self, record, delta):
+        key = (record.status_code, record.priority_level_code, bool(record.is_completed))
+        self.counts[key] = self.counts.get(key, 0) + delta
+
+    def add(self, record):
+        with self.lock:
+            if record.id is None:
+                record.id = self.next_id
+            self.next_id = max(self.next_id, record.id + 1)
+            self.records[record.id] = record
+            self.by_status[record.status_code].add(record.id)
+            self.by_priority[record.priority_level_code].add(record.id)
+            bisect.insort(self.by_due_date, (record.due_date, record.id))
+            self._count(record, 1)
+            self.text_index.add(record.id, record.title, record.description)
+            return record
+
+    def remove(self, task_id):
+        with self.lock:
+            record = self.records.pop(task_id, None)
+            if record is None:
+                return None
+            self.by_status[record.status_code].discard(task_id)
+            self.by_priority[record.priority_level_code].discard(task_id)
+            self._unindex_due_date(record)
+            self._count(record, -1)
+            self.text_index.remove(task_id, record.title, record.description)
+            return record
+
+    def _unindex_due_date(self, record):
+        position = bisect.bisect_left(self.by_due_date, (record.due_date, record.id))
+        del self.by_due_date[position]
+
+    def change(self, record, **values):
+        """Update fields of a stored record, keeping the indexes in step"""
+        with self.lock:
+            if 'status_code' in values:
+                self.by_status[record.status_code].discard(record.id)
+                self.by_status[values['status_code']].add(record.id)
+            if 'priority_level_code' in values:
+                self.by_priority[record.priority_level_code].discard(record.id)
+                self.by_priority[values['priority_level_code']].add(record.id)
+            if 'due_date' in values:
+                self._unindex_due_date(record)
+                bisect.insort(self.by_due_date, (values['due_date'], record.id))
+            self._count(record, -1)
+            text_changed = 'title' in values or 'description' in values
+            if text_changed:
+                self.text_index.remove(record.id, record.title, record.description)
+            for name, value in values.items():
+                setattr(record, name, value)
+            self._count(record, 1)
+            if text_changed:
+                self.text_index.add(record.id, record.title, record.description)
+            record.updated_at = datetime.now().replace(microsecond=0)
+
+    def log_change(self, task_id, event_type):
+        """Append a change log entry; call with the lock held by the writer"""
+        with self.lock:
+            self.events.append((self.next_seq, task_id, event_type,
+                                datetime.now().replace(microsecond=0)))
+            self.next_seq += 1
+
+    def events_after(self, seq, limit):
+        """Up to limit change log entries with a sequence number above seq"""
+        with self.lock:
+            # (seq, inf) sorts after the entry numbered seq
+            start = bisect.bisect_right(self.events, (seq, float('inf')))
+            return self.events[start:start + limit]
+
+    def due_between(self, start=None, end=None):
+        """IDs due from start through end (inclusive), in due date order"""
+        with self.lock:
+            low = 0
+            if start is not None:
+                low = bisect.bisect_left(self.by_due_date, (start,))
+            high = len(self.by_due_date)
+            if end is not None:
+                # (end, inf) sorts after every (end, id) entry
+                high = bisect.bisect_right(self.by_due_date, (end, float('inf')))
+            return [task_id for _, task_id in self.by_due_date[low:high]]
+
+    def snapshot(self, path):
+        """Write every record to path as JSON, replacing the file atomically"""
+        with self.lock:
+            rows = [
+                [record.id, record.title, record.description, record.status_code,
+                 record.priority_level_code, record.due_date.strftime(DATETIME_FORMAT),
+                 record.is_completed, record.created_at.strftime(DATETIME_FORMAT),
+                 record.updated_at.strftime(DATETIME_FORMAT)]
+                for record in self.records.values()
+            ]
+            next_id = self.next_id
+            events = [[seq, task_id, event_type, created_at.strftime(DATETIME_FORMAT)]
+                      for seq, task_id, event_type, created_at in self.events]
+            next_seq = self.next_seq
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as snapshot_file:
+            json.dump({'next_id': next_id, 'tasks': rows, 'next_seq': next_seq,
+                       'events': events}, snapshot_file)
+        os.replace(temp_path, path)
+
+    def load(self, path):
+        """Replace the store's contents with a snapshot written by snapshot()"""
+        with open(path, encoding='utf-8') as snapshot_file:
+            data = json.load(snapshot_file)
+        with self.lock:
+            self._reset()
+            for row in data['tasks']:
+                self.add(TaskRecord(
+                    row[0], row[1], row[2], row[3], row[4],
+                    datetime.strptime(row[5], DATETIME_FORMAT), row[6],
+                    datetime.strptime(row[7], DATETIME_FORMAT),
+                    datetime.strptime(row[8], DATETIME_FORMAT)
+                ))
+            self.next_id = max(self.next_id, data['next_id'])
+            # Snapshots written before the change log have neither key
+            self.events = [(seq, task_id, event_type,
+                            datetime.strptime(created_at, DATETIME_FORMAT))
+                           for seq, task_id, event_type, created_at in data.get('events', [])]
+            self.next_seq = data.get('next_seq', 1)
+
+
+class MemoryBackend:
+    """Storage backend keeping every task in process memory.
+
+    Selected with DB_BACKEND=memory. When snapshot_path (MEMORY_SNAPSHOT_PATH)
+    is set, an existing snapshot is loaded on start and closing the backend
+    or a MemoryTaskManager on it writes a new one; otherwise the data lives
+    only as long as the process.
+    """
+
+    name = 'memory'
+
+    def __init__(self, snapshot_path=None):
+        self.store = MemoryTaskStore()
+        self.snapshot_path = snapshot_path
+        if snapshot_path and os.path.exists(snapshot_path):
+            self.store.load(snapshot_path)
+
+    def snapshot(self, path=None):
+        """Write the current tasks to path (default snapshot_path)"""
+        path = path or self.snapshot_path
+        if not path:
+            raise TaskManagerError("No snapshot path configured")
+        self.store.snapshot(path)
+
+    def stats(self):
+        with self.store.lock:
+            return {'tasks': len(self.store.records)}
+
+    def close(self):
+        if self.snapshot_path:
+            self.snapshot()
+
+
+class MemoryTaskManager:
+    """TaskManager operations served from a MemoryBackend.
+
+    Methods, arguments and result rows match TaskManager, so callers can
+    switch engines through open_task_manager() without code changes.
+    """
+
+    def __init__(self, cache=None, backend=None):
+        # cache is accepted for signature compatibility; reads are already in memory
+        self.cache = cache
+        self.backend = backend or MemoryBackend()
+        self.store = self.backend.store
+
+    def _record(self, task_id):
+        try:
+            return self.store.records.get(int(task_id))
+        except (TypeError, ValueError):
+            return None
+
+    def refresh_lookups(self):
+        """Lookup IDs are fixed for the in-memory engine"""
+        pass
+
+    def get_status_id(self, status_code):
+        """Get status ID from status code"""
+        if status_code not in STATUS_IDS:
+            raise TaskManagerError(f"Invalid status code: {status_code}")
+        return STATUS_IDS[status_code]
+
+    def get_priority_id(self, priority_code):
+        """Get priority level ID from priority code"""
+        if priority_code not in PRIORITY_IDS:
+            raise TaskManagerError(f"Invalid priority level code: {priority_code}")
+        return PRIORITY_IDS[priority_code]
+
+    def _build_record(self, task_data):
+        """Validate task data through Task and return an unsaved record"""
+        task = Task(
+            title=task_data['title'],
+            description=task_data['description'],
+            status=task_data['status'],
+            priority_level=task_data['priority_level'],
+            due_date=task_data['due_date']
+        )
+        task_dict = task.to_dict()
+        return TaskRecord(
+            None, task_dict['title'], task_dict['description'],
+            task_dict['status_code'], task_dict['priority_level_code'],
+            _as_datetime(task_dict['due_date'])
+        )
+
+    def create_task(self, task_data):
+        """Create a new task"""
+        record = self._build_record(task_data)
+        with self.store.lock:
+            self.store.add(record)
+            self.store.log_change(record.id, 'create')
+            return record.to_row()
+
+    def create_tasks(self, tasks_data, chunk_size=1000):
+        """Create many tasks; same result shape as TaskManager.create_tasks"""
+        records, errors = TaskValidator.validate_batch(list(tasks_data))
+        result = {'ids': [], 'errors': errors}
+        with self.store.lock:
+            for _, record in records:
+                task_id = self.store.add(TaskRecord(
+                    None, record['title'], record['description'], record['status'],
+                    record['priority_level'], _as_datetime(record['due_date'])
+                )).id
+                self.store.log_change(task_id, 'create')
+                result['ids'].append(task_id)
+        return result
+
+    def get_task(self, task_id):
+        """Get task by ID"""
+        record = self._record(task_id)
+        return record.to_row() if record else None
+
+    def _matching_ids(self, status=None, priority_level=None, due_from=None, due_to=None,
+                      is_completed=None, updated_since=None):
+        """IDs matching the filters, starting from the most selective index"""
+        candidates = []
+        if status is not None:
+            codes = [status] if isinstance(status, str) else status
+            for code in codes:
+                self.get_status_id(code)
+            candidates.append(set().union(*(self.store.by_status[code] for code in codes)))
+        if priority_level is not None:
+            codes = [priority_level] if isinstance(priority_level, str) else priority_level
+            for code in codes:
+                self.get_priority_id(code)
+            candidates.append(set().union(*(self.store.by_priority[code] for code in codes)))
+        if due_from is not None or due_to is not None:
+            candidates.append(set(self.store.due_between(
+                date_bound(due_from) if due_from is not None else None,
+                date_bound(due_to, end_of_day=True) if due_to is not None else None
+            )))
+
+        if candidates:
+            candidates.sort(key=len)
+            ids = candidates[0].intersection(*candidates[1:])
+        else:
+            ids = self.store.records.keys()
+
+        if is_completed is not None:
+            ids = [task_id for task_id in ids
+                   if bool(self.store.records[task_id].is_completed) == bool(is_completed)]
+        if updated_since is not None:
+            updated_since = date_bound(updated_since)
+            ids = [task_id for task_id in ids
+                   if self.store.records[task_id].updated_at >= updated_since]
+        return ids
+
+    def find_tasks(self, status=None, priority_level=None, due_from=None, due_to=None,
+                   is_completed=None, updated_since=None, search=None, order_by=None,
+                   limit=None, offset=None, columns=None):
+        """Get tasks matching any combination of filters; see TaskManager.find_tasks"""
+        query = TaskQuery(columns=columns)
+        sort_keys = [order_by] if isinstance(order_by, str) else list(order_by or ['id'])
+        for key in sort_keys:
+            if key.lstrip('-') not in TaskQuery.SORT_KEYS:
+                raise TaskManagerError(f"Unknown sort key: {key.lstrip('-')}")
+        filters = (status, priority_level, due_from, due_to, is_completed, updated_since)
+
+        with self.store.lock:
+            today = date.today()
+            start = offset or 0
+            scores = None
+            if search is not None:
+                candidates = (set(self._matching_ids(*filters))
+                              if any(value is not None for value in filters) else None)
+                scores = self.store.text_index.search(search_terms(search), candidates)
+                if not order_by:
+                    ranked = InvertedIndex.top(scores, len(scores) if limit is None else limit,
+                                               start)
+                    return [dict(self.store.records[task_id].to_row(query.columns, today),
+                                 score=score)
+                            for task_id, score in ranked]
+                ids = scores
+            else:
+                ids = self._matching_ids(*filters)
+            records = [self.store.records[task_id] for task_id in ids]
+            # Stable sorts applied last key first give a multi-key ordering
+            for key in reversed(sort_keys):
+                name = key.lstrip('-')
+                if name == 'status':
+                    sort_value = lambda record: STATUS_IDS[record.status_code]
+                elif name == 'priority_level':
+                    sort_value = lambda record: PRIORITY_IDS[record.priority_level_code]
+                else:
+                    sort_value = lambda record, name=name: getattr(record, name)
+                records.sort(key=sort_value, reverse=key.startswith('-'))
+            if limit is not None:
+                records = records[start:start + limit]
+            elif start:
+                records = records[start:]
+            rows = [record.to_row(query.columns, today) for record in records]
+            if scores is not None:
+                for row in rows:
+                    row['score'] = scores[row['id']]
+            return rows
+
+    def search_tasks(self, query, filters=None, limit=20, offset=0, columns=None):
+        """Full-text search over titles and descriptions; see TaskManager.search_tasks"""
+        return self.find_tasks(search=query, limit=limit, offset=offset, columns=columns,
+                               **(filters or {}))
+
+    def get_all_tasks(self):
+        """Get all tasks"""
+        return self.find_tasks()
+
+    def get_tasks_by_status(self, status):
+        """Get tasks by status"""
+        return self.find_tasks(status=status)
+
+    def get_tasks_by_priority(self, priority):
+        """Get tasks by priority"""
+        return self.find_tasks(priority_level=priority)
+
+    def iter_task_pages(self, status=None, priority=None, page_size=500, cursor=None,
+                        columns=None, filters=None):
+        """Yield (tasks, next_cursor) pages in ID order; see TaskManager.iter_task_pages"""
+        if page_size < 1:
+            raise ValueError("page_size must be at least 1")
+        with self.store.lock:
+            last_id = int(cursor) if cursor else 0
+            filters = _merge_filters(filters, status, priority)
+            ids = sorted(task_id for task_id in self._matching_ids(**filters)
+                         if task_id > last_id)
+        query = TaskQuery(columns=columns)
+        for start in range(0, len(ids), page_size):
+            with self.store.lock:
+                page = [self.store.records[task_id].to_row(query.columns)
+                        for task_id in ids[start:start + page_size]
+                        if task_id in self.store.records]
+            next_cursor = str(ids[start + page_size - 1]) if start + page_size < len(ids) else None
+            yield page, next_cursor
+
+    def iter_tasks(self, status=None, priority=None, page_size=500, cursor=None,
+                   columns=None, filters=None):
+        """Yield tasks one at a time, optionally filtered, in ID order"""
+        for page, _ in self.iter_task_pages(status, priority, page_size, cursor, columns,
+                                            filters):
+            yield from page
+
+    def iter_all_tasks(self, page_size=500):
+        """Stream all tasks"""
+        return self.iter_tasks(page_size=page_size)
+
+    def iter_tasks_by_status(self, status, page_size=500):
+        """Stream tasks by status"""
+        return self.iter_tasks(status=status, page_size=page_size)
+
+    def iter_tasks_by_priority(self, priority, page_size=500):
+        """Stream tasks by priority"""
+        return self.iter_tasks(priority=priority, page_size=page_size)
+
+    def _rows_with_days_left(self, ids):
+        today = date.today()
+        columns = TaskQuery.DEFAULT_COLUMNS + ('days_left',)
+        with self.store.lock:
+            return [self.store.records[task_id].to_row(columns, today) for task_id in ids]
+
+    def get_tasks_due_between(self, start, end):
+        """Get tasks due between start and end (inclusive), soonest first"""
+        return self._rows_with_days_left(
+            self.store.due_between(date_bound(start), date_bound(end, end_of_day=True)))
+
+    def get_upcoming(self, days=30):
+        """Get tasks due from today through `days` days from now, soonest first"""
+        today = datetime.combine(date.today(), datetime.min.time())
+        end = today + timedelta(days=days + 1) - timedelta(microseconds=1)
+        return self._rows_with_days_left(self.store.due_between(today, end))
+
+    def get_tasks_with_days_left(self):
+        """Get all tasks with days_left, soonest due first"""
+        return self._rows_with_days_left(self.store.due_between())
+
+    def get_stats(self):
+        """Get dashboard counts; see TaskManager.get_stats"""
+        today = datetime.combine(date.today(), datetime.min.time())
+        with self.store.lock:
+            groups = [
+                {'status_code': status_code, 'priority_level_code': priority_code,
+                 'is_completed': is_completed, 'task_count': count}
+                for (status_code, priority_code, is_completed), count in self.store.counts.items()
+            ]
+            due_soon = [self.store.records[task_id] for task_id in self.store.due_between(
+                None, today + timedelta(days=7) - timedelta(microseconds=1))]
+        stats = fold_stats(groups)
+        open_due = [record.due_date for record in due_soon if not record.is_completed]
+        stats['overdue'] = sum(1 for due_date in open_due if due_date < today)
+        stats['due_this_week'] = len(open_due) - stats['overdue']
+        return stats
+
+    def _record_changes(self, fields):
+        """Validate update fields and map them onto record attributes"""
+        normalized = TaskValidator.normalize_update_fields(fields)
+        names = {'status': 'status_code', 'priority_level': 'priority_level_code'}
+        changes = {names.get(name, name): value for name, value in normalized.items()}
+        if 'due_date' in changes:
+            changes['due_date'] = _as_datetime(changes['due_date'])
+        return changes
+
+    def update_task(self, task_id, update_data, current=None, reread=False):
+        """Update only the supplied fields of a task"""
+        changes = self._record_changes(update_data)
+        with self.store.lock:
+            record = self._record(task_id)
+            if record is None:
+                raise TaskManagerError(f"Task {task_id} not found")
+            self.store.change(record, **changes)
+            self.store.log_change(record.id, 'update')
+            return record.to_row()
+
+    def mark_as_completed(self, task_id, current=None, reread=False):
+        """Mark a task as completed"""
+        with self.store.lock:
+            record = self._record(task_id)
+            if record is None:
+                raise TaskManagerError(f"Task {task_id} not found")
+            self.store.change(record, is_completed=1, status_code="COMPLETED")
+            self.store.log_change(record.id, 'complete')
+            return record.to_row()
+
+    def delete_task(self, task_id):
+        """Delete task"""
+        with self.store.lock:
+            record = self._record(task_id)
+            if record is None or self.store.remove(record.id) is None:
+                return False
+            self.store.log_change(record.id, 'delete')
+            return True
+
+    def _apply_to_ids(self, task_ids, apply, event_type):
+        count = 0
+        with self.store.lock:
+            for task_id in dict.fromkeys(task_ids):
+                record = self._record(task_id)
+                if record is not None:
+                    apply(record)
+                    self.store.log_change(record.id, event_type)
+                    count += 1
+        return count
+
+    def complete_tasks(self, task_ids, chunk_size=1000):
+        """Mark many tasks as completed and return how many were found"""
+        return self._apply_to_ids(task_ids, lambda record: self.store.change(
+            record, is_completed=1, status_code="COMPLETED"), 'complete')
+
+    def delete_tasks(self, task_ids, chunk_size=1000):
+        """Delete many tasks and return how many were deleted"""
+        return self._apply_to_ids(task_ids, lambda record: self.store.remove(record.id), 'delete')
+
+    def update_tasks(self, task_ids, fields, chunk_size=1000):
+        """Apply the same field changes to many tasks and return how many were found"""
+        changes = self._record_changes(fields)
+        return self._apply_to_ids(task_ids, lambda record: self.store.change(record, **changes),
+                                  'update')
+
+    def update_where(self, filters, fields, chunk_size=1000):
+        """Apply field changes to every task matching the filters"""
+        if not filters:
+            raise TaskManagerError("update_where requires at least one filter")
+        unknown = set(filters) - {'status', 'priority_level', 'due_from', 'due_to', 'is_completed'}
+        if unknown:
+            raise TaskManagerError(f"Unknown filters: {', '.join(sorted(unknown))}")
+        changes = self._record_changes(fields)
+        with self.store.lock:
+            ids = list(self._matching_ids(**filters))
+            return self._apply_to_ids(ids, lambda record: self.store.change(record, **changes),
+                                      'update')
+
+    def changes_since(self, seq=0, limit=1000, settle_seconds=0):
+        """Read the task change log after seq; see TaskManager.changes_since.
+
+        Sequence numbers are assigned under the store lock, so there are no
+        gaps to wait on and settle_seconds is ignored.
+        """
+        with self.store.lock:
+            changes = []
+            for event_seq, task_id, event_type, created_at in self.store.events_after(seq, limit):
+                record = self.store.records.get(task_id)
+                changes.append({
+                    'seq': event_seq,
+                    'task_id': task_id,
+                    'event_type': event_type,
+                    'changed_at': created_at,
+                    'task': record.to_row() if record else None,
+                })
+        return {'changes': changes, 'next_seq': changes[-1]['seq'] if changes else seq}
+
+    def latest_change_seq(self):
+        """Sequence number of the newest change, 0 if there are none"""
+        with self.store.lock:
+            return self.store.next_seq - 1
+
+    def prune_changes(self, before_seq):
+        """Delete change log entries older than before_seq and return how many"""
+        with self.store.lock:
+            start = bisect.bisect_left(self.store.events, (before_seq,))
+            del self.store.events[:start]
+            return start
+
+    def release_finished_threads(self):
+        """Nothing to release; threads share the store under its lock"""
+        pass
+
+    def release_connection(self):
+        """Nothing to release; threads share the store under its lock"""
+        pass
+
+    def close(self):
+        """Write the snapshot if the backend has a snapshot path.
+
+        The store itself outlives the manager; entry points only close the
+        manager, so this is where a configured snapshot gets saved.
+        """
+        if self.backend.snapshot_path:
+            self.backend.snapshot()
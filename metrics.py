@@ -0,0 +1,330 @@
+import atexit
+import bisect
+import functools
+import json
+import logging
+import os
+import re
+import threading
+import time
+
+# Upper bounds in seconds, Prometheus style; the last bucket is +Inf
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+# SQL and parameters of statements slower than DB_SLOW_QUERY_MS go here
+slow_query_log = logging.getLogger('task_manager.slow_query')
+
+_VERB = re.compile(r"\s*(\w+)")
+_TABLE = re.compile(
+    r"\b(?:FROM|INTO\s+TABLE|INTO|UPDATE|TABLE(?:\s+IF\s+NOT\s+EXISTS)?)\s+`?(\w+)",
+    re.IGNORECASE)
+
+# Longer SQL and parameter lists are cut off in the slow-query log
+MAX_LOGGED_SQL = 1000
+MAX_LOGGED_PARAMS = 500
+
+
+# The verb and first table are looked for this far into a statement, so a
+# long multi-row INSERT or IN list costs no more to label than a short one
+LABEL_SCAN_CHARS = 1000
+
+
+def statement_label(sql):
+    """Low-cardinality label for a statement: its verb and first table.
+
+    Only the first LABEL_SCAN_CHARS characters are searched, so a statement
+    whose first table comes later (a very long select list, say) is
+    labelled with its verb alone.
+    """
+    verb = _VERB.match(sql, 0, LABEL_SCAN_CHARS)
+    if not verb:
+        return "other"
+    table = _TABLE.search(sql, 0, LABEL_SCAN_CHARS)
+    return f"{verb.group(1).upper()} {table.group(1)}" if table else verb.group(1).upper()
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram with count and sum"""
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+
+    def cumulative(self):
+        """(upper bound, observations <= bound) pairs ending with +Inf"""
+        total = 0
+        pairs = []
+        for bound, count in zip(BUCKETS + (float('inf'),), self.counts):
+            total += count
+            pairs.append((bound, total))
+        return pairs
+
+    def to_dict(self):
+        return {
+            'count': self.count,
+            'sum': self.sum,
+            'buckets': {('+Inf' if bound == float('inf') else str(bound)): count
+                        for bound, count in self.cumulative()},
+        }
+
+
+class Metrics:
+    """Process-wide timings for task operations, SQL statements and connection checkouts.
+
+    All recording methods are thread-safe. Set DB_METRICS=0 to turn
+    recording off and DB_SLOW_QUERY_MS to change the slow-query threshold
+    (default 200; 0 logs every statement).
+    """
+
+    def __init__(self, enabled=True, slow_query_ms=200):
+        self.enabled = enabled
+        self.slow_query_seconds = slow_query_ms / 1000
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.operations = {}       # name -> Histogram
+            self.operation_rows = {}   # name -> rows returned or affected
+            self.operation_errors = {}
+            self.queries = {}          # statement label -> Histogram
+            self.query_rows = {}
+            self.slow_queries = {}
+            self.acquire = {}          # backend name -> Histogram
+
+    def _observe(self, histograms, key, seconds):
+        histogram = histograms.get(key)
+        if histogram is None:
+            histogram = histograms[key] = Histogram()
+        histogram.observe(seconds)
+
+    def record_operation(self, name, seconds, rows=0, failed=False):
+        with self._lock:
+            self._observe(self.operations, name, seconds)
+            self.operation_rows[name] = self.operation_rows.get(name, 0) + rows
+            if failed:
+                self.operation_errors[name] = self.operation_errors.get(name, 0) + 1
+
+    def record_query(self, sql, params, seconds, rows=None):
+        label = statement_label(sql)
+        slow = seconds >= self.slow_query_seconds
+        with self._lock:
+            self._observe(self.queries, label, seconds)
+            if rows is not None and rows >= 0:
+                self.query_rows[label] = self.query_rows.get(label, 0) + rows
+            if slow:
+                self.slow_queries[label] = self.slow_queries.get(label, 0) + 1
+        if slow:
+            slow_query_log.warning("Slow query (%.1f ms): %s; params: %s", seconds * 1000,
+                                   _truncate(" ".join(sql.split()), MAX_LOGGED_SQL),
+                                   _truncate(repr(params), MAX_LOGGED_PARAMS))
+
+    def record_acquire(self, backend, seconds):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._observe(self.acquire, backend, seconds)
+
+    def snapshot(self):
+        """All metrics as plain dicts, for JSON export"""
+        with self._lock:
+            return {
+                'operations': {
+                    name: dict(histogram.to_dict(),
+                               rows=self.operation_rows.get(name, 0),
+                               errors=self.operation_errors.get(name, 0))
+                    for name, histogram in self.operations.items()
+                },
+                'queries': {
+                    label: dict(histogram.to_dict(),
+                                rows=self.query_rows.get(label, 0),
+                                slow=self.slow_queries.get(label, 0))
+                    for label, histogram in self.queries.items()
+                },
+                'connection_acquire': {
+                    backend: histogram.to_dict() for backend, histogram in self.acquire.items()
+                },
+            }
+
+    def to_prometheus(self):
+        """Metrics in the Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            _histogram_lines(lines, 'task_manager_operation_seconds',
+                             "Wall time of TaskManager operations", 'operation', self.operations)
+            _counter_lines(lines, 'task_manager_operation_rows_total',
+                           "Rows returned or affected by TaskManager operations",
+                           'operation', self.operation_rows)
+            _counter_lines(lines, 'task_manager_operation_errors_total',
+                           "TaskManager operations that raised", 'operation',
+                           self.operation_errors)
+            _histogram_lines(lines, 'task_manager_query_seconds',
+                             "Execution time of SQL statements", 'statement', self.queries)
+            _counter_lines(lines, 'task_manager_query_rows_total',
+                           "Rows returned or affected by SQL statements", 'statement',
+                           self.query_rows)
+            _counter_lines(lines, 'task_manager_slow_queries_total',
+                           "Statements slower than the slow-query threshold", 'statement',
+                           self.slow_queries)
+            _histogram_lines(lines, 'task_manager_connection_acquire_seconds',
+                             "Time to check a connection out of the backend", 'backend',
+                             self.acquire)
+        return "\n".join(lines) + "\n"
+
+    def write(self, path, fmt=None):
+        """Atomically write the metrics to path as 'prometheus' or 'json'.
+
+        The format defaults to JSON for .json paths and Prometheus text
+        otherwise (e.g. a node_exporter textfile collector .prom file).
+        """
+        fmt = fmt or ('json' if path.endswith('.json') else 'prometheus')
+        content = (json.dumps(self.snapshot(), indent=2) if fmt == 'json'
+                   else self.to_prometheus())
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, 'w', encoding='utf-8') as output:
+            output.write(content)
+        os.replace(temporary, path)
+
+
+def _truncate(text, limit):
+    return text if len(text) <= limit else text[:limit] + "..."
+
+
+def _escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _histogram_lines(lines, name, help_text, label, histograms):
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} histogram")
+    for key, histogram in sorted(histograms.items()):
+        value = _escape_label(key)
+        for bound, count in histogram.cumulative():
+            le = '+Inf' if bound == float('inf') else repr(bound)
+            lines.append(f'{name}_bucket{{{label}="{value}",le="{le}"}} {count}')
+        lines.append(f'{name}_sum{{{label}="{value}"}} {histogram.sum}')
+        lines.append(f'{name}_count{{{label}="{value}"}} {histogram.count}')
+
+
+def _counter_lines(lines, name, help_text, label, counters):
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} counter")
+    for key, count in sorted(counters.items()):
+        lines.append(f'{name}{{{label}="{_escape_label(key)}"}} {count}')
+
+
+metrics = Metrics(
+    enabled=os.getenv('DB_METRICS', '1') != '0',
+    slow_query_ms=float(os.getenv('DB_SLOW_QUERY_MS', 200)),
+)
+
+
+def _row_count(result):
+    """Rows an operation returned or affected, from its result"""
+    if result is None:
+        return 0
+    if isinstance(result, (list, tuple)):
+        return len(result)
+    if isinstance(result, bool):
+        return int(result)
+    if isinstance(result, int):
+        return result
+    if isinstance(result, dict) and isinstance(result.get('ids'), list):
+        return len(result['ids'])
+    return 1
+
+
+_depth = threading.local()
+
+
+def instrumented(method):
+    """Time a TaskManager method as one operation.
+
+    Only the outermost instrumented call on a thread is recorded, so e.g.
+    get_tasks_by_status is not also counted as find_tasks and run_query.
+    """
+    name = method.__name__
+
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        if not metrics.enabled or getattr(_depth, 'value', 0):
+            return method(*args, **kwargs)
+        _depth.value = 1
+        started = time.perf_counter()
+        try:
+            result = method(*args, **kwargs)
+        except Exception:
+            metrics.record_operation(name, time.perf_counter() - started, failed=True)
+            raise
+        finally:
+            _depth.value = 0
+        metrics.record_operation(name, time.perf_counter() - started, _row_count(result))
+        return result
+
+    return wrapper
+
+
+class QueryTimingMixin:
+    """Cursor mixin recording every execute() in the process metrics"""
+
+    def execute(self, query, args=None):
+        if not metrics.enabled:
+            return super().execute(query, args)
+        started = time.perf_counter()
+        result = super().execute(query, args)
+        metrics.record_query(query, args, time.perf_counter() - started, _cursor_rows(self))
+        return result
+
+
+def _cursor_rows(cursor):
+    # Unbuffered cursors report an unknown (or huge unsigned) rowcount
+    rowcount = cursor.rowcount
+    return rowcount if rowcount is not None and 0 <= rowcount < 2 ** 63 else None
+
+
+_exporter = None
+
+
+def start_exporter(path, interval=15, fmt=None):
+    """Write the metrics to path every `interval` seconds and at exit"""
+    global _exporter
+    if _exporter is not None:
+        return _exporter
+
+    def export_forever():
+        while True:
+            time.sleep(interval)
+            try:
+                metrics.write(path, fmt)
+            except OSError as e:
+                print(f"Error writing metrics to {path}: {e}")
+
+    _exporter = threading.Thread(target=export_forever, name="metrics-exporter", daemon=True)
+    _exporter.start()
+    atexit.register(metrics.write, path, fmt)
+    return _exporter
+
+
+def configure_from_env():
+    """Apply the optional METRICS_EXPORT_* and DB_SLOW_QUERY_LOG settings.
+
+    METRICS_EXPORT_PATH starts the periodic exporter; DB_SLOW_QUERY_LOG
+    sends the slow-query log to that file instead of stderr.
+    """
+    log_path = os.getenv('DB_SLOW_QUERY_LOG')
+    if log_path and not slow_query_log.handlers:
+        handler = logging.FileHandler(log_path, encoding='utf-8')
+        handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+        slow_query_log.addHandler(handler)
+        slow_query_log.propagate = False
+
+    path = os.getenv('METRICS_EXPORT_PATH')
+    if path:
+        start_exporter(path, float(os.getenv('METRICS_EXPORT_INTERVAL', 15)),
+                       os.getenv('METRICS_EXPORT_FORMAT'))
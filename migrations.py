@@ -0,0 +1,272 @@
+import os
+from status import Status
+from priority_level import PriorityLevel
+from storage import DB_ERRORS, get_backend
+
+
+class SchemaVersionError(Exception):
+    """Raised when the database schema is older than the code expects"""
+    pass
+
+
+def _initial_schema(cursor, backend):
+    """Create lookup and task tables and seed the lookup values"""
+    if backend.name == 'sqlite':
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS statuses (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                status_code VARCHAR(20) UNIQUE NOT NULL
+            )
+        """)
+
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS priority_levels (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                priority_level_code VARCHAR(20) UNIQUE NOT NULL
+            )
+        """)
+
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS tasks (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                title VARCHAR(100) NOT NULL,
+                description TEXT NOT NULL,
+                status_id INTEGER NOT NULL REFERENCES statuses(id),
+                priority_level_id INTEGER NOT NULL REFERENCES priority_levels(id),
+                due_date DATETIME NOT NULL,
+                is_completed BOOLEAN DEFAULT FALSE,
+                created_at TIMESTAMP DEFAULT (datetime('now', 'localtime')),
+                updated_at TIMESTAMP DEFAULT (datetime('now', 'localtime'))
+            )
+        """)
+    else:
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS statuses (
+                id INT AUTO_INCREMENT PRIMARY KEY,
+                status_code VARCHAR(20) UNIQUE NOT NULL
+            )
+        """)
+
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS priority_levels (
+                id INT AUTO_INCREMENT PRIMARY KEY,
+                priority_level_code VARCHAR(20) UNIQUE NOT NULL
+            )
+        """)
+
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS tasks (
+                id INT AUTO_INCREMENT PRIMARY KEY,
+                title VARCHAR(100) NOT NULL,
+                description TEXT NOT NULL,
+                status_id INT NOT NULL,
+                priority_level_id INT NOT NULL,
+                due_date DATETIME NOT NULL,
+                is_completed BOOLEAN DEFAULT FALSE,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP 
+                ON UPDATE CURRENT_TIMESTAMP,
+                FOREIGN KEY (status_id) REFERENCES statuses(id),
+                FOREIGN KEY (priority_level_id) REFERENCES 
+                priority_levels(id)
+            )
+        """)
+
+    cursor.executemany(
+        f"{backend.insert_ignore_sql} INTO statuses (status_code) VALUES (%s)",
+        [(code,) for code in Status.statuses]
+    )
+    cursor.executemany(
+        f"{backend.insert_ignore_sql} INTO priority_levels (priority_level_code) VALUES (%s)",
+        [(code,) for code in PriorityLevel.priority_levels]
+    )
+
+
+def _task_filter_indexes(cursor, backend):
+    """Index the columns the list, filter and reminder queries use"""
+    cursor.execute("CREATE INDEX idx_tasks_status_due ON tasks (status_id, due_date)")
+    cursor.execute("CREATE INDEX idx_tasks_priority_due ON tasks (priority_level_id, due_date)")
+    cursor.execute("CREATE INDEX idx_tasks_completed_due ON tasks (is_completed, due_date)")
+    cursor.execute("CREATE INDEX idx_tasks_due ON tasks (due_date)")
+
+
+def _task_updated_index(cursor, backend):
+    """Index updated_at for the reminder service's change polling"""
+    cursor.execute("CREATE INDEX idx_tasks_updated ON tasks (updated_at)")
+
+
+def _task_fulltext(cursor, backend):
+    """Full-text index over title and description for search_tasks"""
+    if backend.name == 'sqlite':
+        # External-content FTS5 table kept in step with tasks by triggers
+        cursor.execute("""
+            CREATE VIRTUAL TABLE tasks_fts USING fts5(
+                title, description, content='tasks', content_rowid='id'
+            )
+        """)
+        cursor.execute("""
+            CREATE TRIGGER tasks_fts_insert AFTER INSERT ON tasks BEGIN
+                INSERT INTO tasks_fts (rowid, title, description)
+                VALUES (NEW.id, NEW.title, NEW.description);
+            END
+        """)
+        cursor.execute("""
+            CREATE TRIGGER tasks_fts_delete AFTER DELETE ON tasks BEGIN
+                INSERT INTO tasks_fts (tasks_fts, rowid, title, description)
+                VALUES ('delete', OLD.id, OLD.title, OLD.description);
+            END
+        """)
+        cursor.execute("""
+            CREATE TRIGGER tasks_fts_update AFTER UPDATE OF title, description ON tasks BEGIN
+                INSERT INTO tasks_fts (tasks_fts, rowid, title, description)
+                VALUES ('delete', OLD.id, OLD.title, OLD.description);
+                INSERT INTO tasks_fts (rowid, title, description)
+                VALUES (NEW.id, NEW.title, NEW.description);
+            END
+        """)
+        cursor.execute("INSERT INTO tasks_fts (tasks_fts) VALUES ('rebuild')")
+    else:
+        cursor.execute(
+            "ALTER TABLE tasks ADD FULLTEXT INDEX ft_tasks_text (title, description)")
+
+
+def _task_events(cursor, backend):
+    """Change log written with every task write, read by changes_since"""
+    if backend.name == 'sqlite':
+        # AUTOINCREMENT so sequence numbers are never reused after a prune
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS task_events (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                task_id INTEGER NOT NULL,
+                event_type VARCHAR(10) NOT NULL,
+                created_at TIMESTAMP DEFAULT (datetime('now', 'localtime'))
+            )
+        """)
+    else:
+        # No foreign key: events outlive the tasks they describe
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS task_events (
+                seq BIGINT AUTO_INCREMENT PRIMARY KEY,
+                task_id INT NOT NULL,
+                event_type VARCHAR(10) NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+
+
+# Ordered (version, description, apply) entries; apply(cursor, backend) may
+# branch on backend.name for engine-specific DDL. Never edit an applied
+# migration; append a new one instead.
+MIGRATIONS = [
+    (1, "Create statuses, priority_levels and tasks tables", _initial_schema),
+    (2, "Add status, priority, completion and due date indexes on tasks", _task_filter_indexes),
+    (3, "Add updated_at index on tasks", _task_updated_index),
+    (4, "Add full-text index on task title and description", _task_fulltext),
+    (5, "Create task_events change log", _task_events),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def get_schema_version(connection, backend):
+    """Return the highest applied migration version, 0 for a fresh database"""
+    with connection.cursor() as cursor:
+        try:
+            cursor.execute("SELECT MAX(version) AS version FROM schema_version")
+        except DB_ERRORS as e:
+            if backend.is_missing_table_error(e):
+                return 0
+            raise
+        result = cursor.fetchone()
+        return result['version'] or 0
+
+
+def migrate(connection, backend):
+    """Apply every pending migration in order and return the versions applied.
+
+    Runs under the backend's schema lock and re-reads the version first, so
+    threads racing on a fresh database apply each migration once.
+    """
+    with backend.schema_lock:
+        with connection.cursor() as cursor:
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS schema_version (
+                    version INT PRIMARY KEY,
+                    description VARCHAR(255) NOT NULL,
+                    applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+        connection.commit()
+
+        current = get_schema_version(connection, backend)
+        applied = []
+        for version, description, apply in MIGRATIONS:
+            if version <= current:
+                continue
+            # MySQL commits DDL implicitly, so each migration is recorded as soon
+            # as it finishes and a failed run resumes from the failed step.
+            with connection.cursor() as cursor:
+                apply(cursor, backend)
+                cursor.execute(
+                    "INSERT INTO schema_version (version, description) VALUES (%s, %s)",
+                    (version, description)
+                )
+            connection.commit()
+            applied.append(version)
+
+        if applied:
+            # Migrations may seed or renumber lookup rows
+            backend.lookups.invalidate()
+        backend.schema_version = LATEST_VERSION
+    return applied
+
+
+def ensure_schema(connection, backend):
+    """Make sure the schema is current, checking at most once per backend.
+
+    Pending migrations are applied automatically unless DB_AUTO_MIGRATE is
+    set to 0, in which case an outdated schema raises SchemaVersionError and
+    `python migrations.py` has to be run first.
+    """
+    if backend.schema_version is not None and backend.schema_version >= LATEST_VERSION:
+        return
+
+    with backend.schema_lock:
+        if backend.schema_version is not None and backend.schema_version >= LATEST_VERSION:
+            return
+        version = get_schema_version(connection, backend)
+        if version >= LATEST_VERSION:
+            backend.schema_version = version
+            return
+
+    if os.getenv('DB_AUTO_MIGRATE', '1') == '0':
+        raise SchemaVersionError(
+            f"Database schema is at version {version}, expected {LATEST_VERSION}. "
+            "Run 'python migrations.py' to upgrade.")
+    migrate(connection, backend)
+
+
+def main():
+    """Apply pending migrations to the configured database"""
+    backend = get_backend()
+    db = backend.open()
+    if db.connection is None:
+        return
+    try:
+        current = get_schema_version(db.connection, backend)
+        print(f"Current schema version: {current}")
+        applied = migrate(db.connection, backend)
+        if applied:
+            for version, description, _ in MIGRATIONS:
+                if version in applied:
+                    print(f"Applied migration {version}: {description}")
+        else:
+            print("Schema is up to date.")
+    except DB_ERRORS as e:
+        print(f"Error applying migrations: {e}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
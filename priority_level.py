@@ -1,19 +1,56 @@
+from types import MappingProxyType
+
+
 class PriorityLevel:
-    def __init__(self, priority_level):
-        self.priority_level = priority_level
-        
-        self.priority_levels = {
-            "LOW": "Low",
-            "MEDIUM": "Medium",
-            "HIGH": "High",
-        }
-        
-        self.stored_priority_levels = {}
-        for code, priority_level in self.priority_levels.items():
-            self.stored_priority_levels[code] = priority_level
-            
-    def get_priority_level(self, priority_level):
-        return self.stored_priority_levels.get(priority_level, "Unknown")
-    
-    def get_priority_level_code(self, priority_level):
-        return list(self.stored_priority_levels.keys())[list(self.stored_priority_levels.values()).index(priority_level)]
\ No newline at end of file
+    """Immutable task priority level, interned per code.
+
+    PriorityLevel("HIGH") always returns the same shared instance; the
+    code <-> name maps are built once for the class.
+    """
+
+    __slots__ = ('priority_level',)
+
+    priority_levels = MappingProxyType({
+        "LOW": "Low",
+        "MEDIUM": "Medium",
+        "HIGH": "High",
+    })
+    stored_priority_levels = priority_levels
+    _codes_by_priority_level = MappingProxyType(
+        {priority_level: code for code, priority_level in priority_levels.items()})
+    _instances = {}
+
+    def __new__(cls, priority_level):
+        instance = cls._instances.get(priority_level)
+        if instance is None:
+            instance = super().__new__(cls)
+            object.__setattr__(instance, 'priority_level', priority_level)
+            if priority_level in cls.priority_levels:
+                instance = cls._instances.setdefault(priority_level, instance)
+        return instance
+
+    def __setattr__(self, name, value):
+        raise AttributeError("PriorityLevel is immutable")
+
+    def __eq__(self, other):
+        return isinstance(other, PriorityLevel) and other.priority_level == self.priority_level
+
+    def __hash__(self):
+        return hash(self.priority_level)
+
+    def __repr__(self):
+        return f"PriorityLevel({self.priority_level!r})"
+
+    def __reduce__(self):
+        return (PriorityLevel, (self.priority_level,))
+
+    @classmethod
+    def get_priority_level(cls, priority_level):
+        return cls.priority_levels.get(priority_level, "Unknown")
+
+    @classmethod
+    def get_priority_level_code(cls, priority_level):
+        try:
+            return cls._codes_by_priority_level[priority_level]
+        except KeyError:
+            raise ValueError(f"{priority_level!r} is not a known priority level")
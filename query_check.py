@@ -0,0 +1,106 @@
+import sys
+import pymysql
+from task_manager import (TaskManager, TaskManagerError, TaskQuery, TASK_SELECT,
+                          DUE_BETWEEN_SELECT, UPCOMING_SELECT, ALL_DAYS_LEFT_SELECT,
+                          STATS_SELECT, DUE_SOON_SELECT, CHANGES_SELECT,
+                          LATEST_CHANGE_SELECT, CHANGE_SETTLE_SECONDS, backend_sql)
+
+# (name, query, parameters, full scan expected). A query is one of the
+# TaskManager statements (its backend slots are filled in), a TaskQuery, or
+# a callable taking the TaskManager and returning (sql, params), so the
+# checked SQL is what the manager runs. Parameters only need to be
+# plausible; EXPLAIN does not run the statement.
+CHECKED_QUERIES = [
+    ("get_task", f"{TASK_SELECT} WHERE t.id = %s", (1,), False),
+    ("iter_all_tasks", TaskQuery().after_id(0).order_by('id').limit(500), (), False),
+    ("iter_tasks_by_status",
+     TaskQuery().status("PENDING").after_id(0).order_by('id').limit(500), (), False),
+    ("iter_tasks_by_priority",
+     TaskQuery().priority("HIGH").after_id(0).order_by('id').limit(500), (), False),
+    ("get_all_tasks", TaskQuery(), (), True),
+    ("get_tasks_by_status", TaskQuery().status("PENDING"), (), False),
+    ("get_tasks_by_priority", TaskQuery().priority("HIGH"), (), False),
+    ("find_tasks(status, due range, open)",
+     TaskQuery(columns=TaskQuery.LIST_COLUMNS).status("PENDING")
+     .due_between("2000-01-01", "2000-01-31").completed(False)
+     .order_by('due_date').limit(50), (), False),
+    ("get_upcoming", UPCOMING_SELECT, (31,), False),
+    ("get_tasks_due_between", DUE_BETWEEN_SELECT, ("2000-01-01", "2000-01-31"), False),
+    ("get_tasks_with_days_left", ALL_DAYS_LEFT_SELECT, (), True),
+    ("get_stats", STATS_SELECT, (7,), True),
+    ("get_stats (task_summary installed)", DUE_SOON_SELECT, (False, 7), False),
+    ("update_where(status)",
+     lambda tm: TaskQuery().status("PENDING").select_ids(tm, lock=True), (), False),
+    ("update_where(is_completed, due_to)",
+     lambda tm: TaskQuery().due_between(None, "2000-01-01").completed(False)
+     .select_ids(tm, lock=True), (), False),
+    ("update_where chunk", "UPDATE tasks SET updated_at = CURRENT_TIMESTAMP WHERE id IN (%s, %s)",
+     (1, 2), False),
+    ("delete_tasks", "DELETE FROM tasks WHERE id IN (%s, %s)", (1, 2), False),
+    ("search_tasks", TaskQuery().search("budget review").limit(20), (), False),
+    ("changes_since", CHANGES_SELECT, (CHANGE_SETTLE_SECONDS, 0, 1000), False),
+    ("latest_change_seq", LATEST_CHANGE_SELECT, (), False),
+]
+
+
+def render_query(task_manager, query, params):
+    """Return the (sql, params) a CHECKED_QUERIES entry runs as on the manager's backend"""
+    if isinstance(query, TaskQuery):
+        return query.build(task_manager)
+    if callable(query):
+        return query(task_manager)
+    return backend_sql(query, task_manager.backend), params
+
+
+def explain_queries(task_manager, queries=CHECKED_QUERIES):
+    """EXPLAIN each query and return (name, plan rows, flagged) tuples.
+
+    A query is flagged when MySQL plans a full scan (type ALL) of the tasks
+    table and the query is not expected to read the whole table. On a
+    nearly empty table the optimizer may prefer a scan anyway, so run this
+    against realistic data volumes.
+    """
+    results = []
+    with task_manager.db.connection.cursor() as cursor:
+        for name, query, params, scan_expected in queries:
+            query, params = render_query(task_manager, query, params)
+            cursor.execute(f"EXPLAIN {query}", params)
+            plan = cursor.fetchall()
+            full_scan = any(
+                row.get('type') == 'ALL' and row.get('table') in ('t', 'tasks')
+                for row in plan
+            )
+            results.append((name, plan, full_scan and not scan_expected))
+    return results
+
+
+def main():
+    """Print the plan of every checked query and exit 1 on a full scan"""
+    task_manager = None
+    try:
+        task_manager = TaskManager()
+        if task_manager.backend.name != 'mysql':
+            print("query_check reads MySQL EXPLAIN output; set DB_BACKEND=mysql")
+            return 2
+        results = explain_queries(task_manager)
+    except (TaskManagerError, pymysql.Error) as e:
+        print(f"Error checking queries: {e}")
+        return 2
+    finally:
+        if task_manager:
+            task_manager.close()
+
+    flagged = 0
+    for name, plan, is_flagged in results:
+        print(f"\n{'FULL SCAN' if is_flagged else 'ok':<9} {name}")
+        for row in plan:
+            print(f"    table={row.get('table')} type={row.get('type')} "
+                  f"key={row.get('key')} rows={row.get('rows')} extra={row.get('Extra')}")
+        flagged += is_flagged
+
+    print(f"\n{flagged} of {len(results)} queries do a full scan of tasks")
+    return 1 if flagged else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,57 +1,40 @@
-from datetime import datetime, timedelta
-from task_manager import TaskManager
+from task_manager import open_task_manager
 
 
-def get_tasks_with_days_left():
-    """Get all tasks with their days left calculation"""
+def reminder_entry(task):
+    """Shape a task row with days_left for the reminder views"""
+    return {
+        'id': task['id'],
+        'title': task['title'],
+        'description': task['description'],
+        'due_date': task['due_date'].strftime('%m/%d/%Y'),
+        'days_left': task['days_left'],
+        'status': task['status_code'],
+        'priority': task['priority_level_code']
+    }
+
+
+def get_tasks_with_days_left(cache=None):
+    """Get all tasks with their days left, soonest due first"""
+    task_manager = open_task_manager(cache=cache)
     try:
-        task_manager = TaskManager()
-        tasks = task_manager.get_all_tasks()
-        
-        if not tasks:
-            return []
-            
-        # Get current date
-        current_date = datetime.now()
-        
-        # Calculate days left for all tasks
-        tasks_with_days = []
-        for task in tasks:
-            due_date = datetime.strptime(str(task['due_date']), '%Y-%m-%d %H:%M:%S')
-            days_left = (due_date - current_date).days
-            tasks_with_days.append({
-                'id': task['id'],
-                'title': task['title'],
-                'description': task['description'],
-                'due_date': due_date.strftime('%m/%d/%Y'),
-                'days_left': days_left,
-                'status': task['status_code'],
-                'priority': task['priority_level_code']
-            })
-        
-        # Sort by days left
-        tasks_with_days.sort(key=lambda x: x['days_left'])
-        return tasks_with_days
-        
+        return [reminder_entry(task) for task in task_manager.get_tasks_with_days_left()]
     finally:
-        if 'task_manager' in locals():
-            task_manager.close()
+        task_manager.close()
 
 
-def get_upcoming_tasks():
+def get_upcoming_tasks(days=30, cache=None):
     """Get tasks that are due within a month"""
-    tasks = get_tasks_with_days_left()
-    
-    # Filter tasks due within 30 days
-    current_date = datetime.now()
-    one_month_later = current_date + timedelta(days=30)
-    
-    return [task for task in tasks if task['days_left'] >= 0 and task['days_left'] <= 30]
+    task_manager = open_task_manager(cache=cache)
+    try:
+        return [reminder_entry(task) for task in task_manager.get_upcoming(days)]
+    finally:
+        task_manager.close()
 
 
-def print_reminders():
+def print_reminders(cache=None):
     """Print reminders for tasks due within a month"""
-    upcoming_tasks = get_upcoming_tasks()
+    upcoming_tasks = get_upcoming_tasks(cache=cache)
     
     if not upcoming_tasks:
         return
@@ -70,9 +53,9 @@ def print_reminders():
         print("--------------------------------------------")
 
 
-def print_tasks_by_urgency():
+def print_tasks_by_urgency(cache=None):
     """Print all tasks sorted by urgency"""
-    tasks = get_tasks_with_days_left()
+    tasks = get_tasks_with_days_left(cache=cache)
     
     if not tasks:
         print("\nNo tasks found.")
@@ -0,0 +1,385 @@
+import argparse
+import heapq
+import itertools
+import json
+import signal
+import smtplib
+import sys
+import threading
+from datetime import datetime, timedelta
+from email.message import EmailMessage
+from reminder import reminder_entry
+from storage import DB_ERRORS
+from task_manager import open_task_manager, TaskManagerError
+
+# A task enters each stage at local midnight `days` days before its due
+# date, so a task due on the 31st is "due in 30 days" from the 1st, "due
+# tomorrow" from the 30th, "due today" on the 31st and overdue afterwards.
+STAGES = (
+    (30, 'due_soon'),
+    (1, 'due_tomorrow'),
+    (0, 'due_today'),
+    (-1, 'overdue'),
+)
+
+HORIZON_DAYS = STAGES[0][0]
+
+COLUMNS = ('id', 'title', 'description', 'due_date', 'is_completed',
+           'status_code', 'priority_level_code')
+
+# Change log entries read per query while polling
+POLL_PAGE_SIZE = 1000
+
+
+def _midnight(day):
+    return datetime(day.year, day.month, day.day)
+
+
+def current_stage(due_date, now):
+    """The stage a task due on due_date is in at `now`, or None before the horizon"""
+    stage = None
+    for days, name in STAGES:
+        if _midnight(due_date.date() - timedelta(days=days)) <= now:
+            stage = name
+    return stage
+
+
+def next_crossing(due_date, now):
+    """(time, stage) of the first stage change after `now`, or None once overdue"""
+    for days, name in STAGES:
+        at = _midnight(due_date.date() - timedelta(days=days))
+        if at > now:
+            return at, name
+    return None
+
+
+def reminder_message(entry, stage):
+    """One-line reminder text for a reminder_entry in the given stage"""
+    if stage == 'due_today':
+        when = "is due TODAY!"
+    elif stage == 'due_tomorrow':
+        when = "is due TOMORROW!"
+    elif stage == 'overdue':
+        days = -entry['days_left']
+        when = f"is overdue by {days} day{'s' if days != 1 else ''} ({entry['due_date']})"
+    else:
+        when = f"is due in {entry['days_left']} days ({entry['due_date']})"
+    return f"Task {entry['id']}: {entry['title']} {when}"
+
+
+class StdoutSink:
+    """Prints each reminder as one line"""
+
+    def __init__(self, stream=None):
+        self.stream = stream
+
+    def send(self, notification):
+        print(notification['message'], file=self.stream or sys.stdout, flush=True)
+
+    def close(self):
+        pass
+
+
+class FileSink:
+    """Appends each reminder to a file as one JSON object per line"""
+
+    def __init__(self, path):
+        self.output = open(path, 'a', encoding='utf-8')
+
+    def send(self, notification):
+        self.output.write(json.dumps(notification) + "\n")
+        self.output.flush()
+
+    def close(self):
+        self.output.close()
+
+
+class SmtpSink:
+    """Mails each reminder through an SMTP server, by default a local one.
+
+    Meant for a development mail catcher such as
+    `python -m aiosmtpd -n -l localhost:1025`; no TLS or login is attempted.
+    """
+
+    def __init__(self, host='localhost', port=1025, sender='reminders@localhost',
+                 recipients=('tasks@localhost',)):
+        self.host = host
+        self.port = port
+        self.sender = sender
+        self.recipients = list(recipients)
+
+    def send(self, notification):
+        message = EmailMessage()
+        message['Subject'] = notification['message']
+        message['From'] = self.sender
+        message['To'] = ", ".join(self.recipients)
+        task = notification['task']
+        message.set_content(
+            f"{notification['message']}\n\n"
+            f"Description: {task['description']}\n"
+            f"Status: {task['status']}\n"
+            f"Priority: {task['priority']}\n"
+        )
+        with smtplib.SMTP(self.host, self.port, timeout=10) as smtp:
+            smtp.send_message(message)
+
+    def close(self):
+        pass
+
+
+class ReminderScheduler:
+    """Emits a reminder whenever an open task crosses a due-date threshold.
+
+    Open tasks due within HORIZON_DAYS are loaded once and each is kept in a
+    min-heap under the time of its next stage change (see STAGES), so the
+    service sleeps until the earliest crossing instead of re-querying. At
+    every midnight the tasks that just came within the horizon are loaded.
+    Task writes, deletes included, are picked up incrementally by reading the
+    change log (see TaskManager.changes_since) every poll_interval seconds;
+    writers in the same process can call task_changed()/task_deleted() to
+    apply a change immediately. Every task is still re-read just before its
+    reminder is sent and dropped if it is gone or completed since the poll.
+
+    Reminders go to every sink's send(notification); notification holds the
+    stage, the message and the task as shaped for the reminder views.
+    """
+
+    def __init__(self, task_manager, sinks, poll_interval=60, clock=datetime.now):
+        self.task_manager = task_manager
+        self.sinks = list(sinks)
+        self.poll_interval = poll_interval
+        self.clock = clock
+        self._heap = []             # (time, seq, task_id or None for the horizon refresh, stage)
+        self._tasks = {}            # task_id -> (due_date, announced stage, seq of its heap entry)
+        self._seq = itertools.count()
+        self._lock = threading.RLock()
+        self._wakeup = threading.Event()
+        self._stopped = False
+        self._horizon = None        # last due day loaded
+        self._change_seq = 0        # last change log entry applied
+        self._next_poll = None
+
+    def load(self, catch_up=False):
+        """Load the open tasks due within the horizon.
+
+        With catch_up, each task's current stage is announced right away;
+        otherwise only later crossings are.
+        """
+        now = self.clock()
+        # Read the log position first so writes racing the load are polled again
+        change_seq = self.task_manager.latest_change_seq()
+        with self._lock:
+            self._change_seq = change_seq
+            self._heap.clear()
+            self._tasks.clear()
+            self._horizon = now.date() - timedelta(days=1)
+            self._load_window(now, catch_up)
+            self._next_poll = now + timedelta(seconds=self.poll_interval)
+
+    def _load_window(self, now, announce):
+        """Track open tasks due after self._horizon through HORIZON_DAYS from now"""
+        start = self._horizon + timedelta(days=1)
+        end = now.date() + timedelta(days=HORIZON_DAYS)
+        if start <= end:
+            filters = {
+                'due_from': _midnight(start),
+                'due_to': _midnight(end) + timedelta(days=1, seconds=-1),
+                'is_completed': False,
+            }
+            for task in self.task_manager.iter_tasks(columns=COLUMNS, filters=filters):
+                self._track(task, now, announce)
+            self._horizon = end
+        self._push(_midnight(now.date() + timedelta(days=1)), None, 'refresh')
+
+    def _push(self, at, task_id, stage):
+        seq = next(self._seq)
+        heapq.heappush(self._heap, (at, seq, task_id, stage))
+        return seq
+
+    def _track(self, task, now, announce):
+        """Start or update tracking of a task row and announce a new stage"""
+        task_id = task['id']
+        known = self._tasks.get(task_id)
+        stage = current_stage(task['due_date'], now)
+        if task['is_completed'] or stage is None:
+            # Outside the horizon for now; the midnight refresh brings it back
+            self._tasks.pop(task_id, None)
+            return
+        if known is None and stage == 'overdue' and announce:
+            # Due dates cannot be set in the past, so this is an old task
+            # touched by some other change; it was never scheduled here
+            return
+        announced = known[1] if known else None
+        if announce and stage != announced:
+            self._notify(task, stage, now)
+            announced = stage
+        elif known is None:
+            announced = stage
+        seq = known[2] if known and known[0] == task['due_date'] else None
+        if seq is None:
+            # The due date is new or changed, so the pending crossing is too
+            crossing = next_crossing(task['due_date'], now)
+            if crossing:
+                seq = self._push(crossing[0], task_id, crossing[1])
+        self._tasks[task_id] = (task['due_date'], announced, seq)
+
+    def task_changed(self, task):
+        """Apply a created or updated task row (as returned by get_task) now"""
+        with self._lock:
+            self._track(task, self.clock(), announce=True)
+        self._wakeup.set()
+
+    def task_deleted(self, task_id):
+        """Stop reminding about a deleted task"""
+        with self._lock:
+            self._tasks.pop(task_id, None)
+
+    def poll(self, now=None):
+        """Apply tasks created, updated or deleted since the last poll"""
+        now = now or self.clock()
+        horizon_end = _midnight(now.date()) + timedelta(days=HORIZON_DAYS + 1)
+        while True:
+            # A task written several times appears once per change with its
+            # current row each time; re-tracking it is a no-op
+            feed = self.task_manager.changes_since(self._change_seq, limit=POLL_PAGE_SIZE)
+            with self._lock:
+                for change in feed['changes']:
+                    task = change['task']
+                    if task is None:
+                        self._tasks.pop(change['task_id'], None)
+                    elif task['id'] in self._tasks or task['due_date'] < horizon_end:
+                        self._track(task, now, announce=True)
+                self._change_seq = feed['next_seq']
+            if len(feed['changes']) < POLL_PAGE_SIZE:
+                break
+        with self._lock:
+            self._next_poll = now + timedelta(seconds=self.poll_interval)
+
+    def run_pending(self, now=None):
+        """Poll if due and send the reminders for every crossing up to `now`"""
+        now = now or self.clock()
+        if self._next_poll is None or now >= self._next_poll:
+            self.poll(now)
+        with self._lock:
+            while self._heap and self._heap[0][0] <= now:
+                at, seq, task_id, stage = self._heap[0]
+                if task_id is None:
+                    heapq.heappop(self._heap)
+                    try:
+                        self._load_window(now, announce=True)
+                    except Exception:
+                        heapq.heappush(self._heap, (at, seq, task_id, stage))
+                        raise
+                    continue
+                known = self._tasks.get(task_id)
+                if known is None or known[2] != seq:
+                    heapq.heappop(self._heap)  # superseded by a later change
+                    continue
+                task = self.task_manager.get_task(task_id)
+                heapq.heappop(self._heap)
+                if task is None:
+                    del self._tasks[task_id]
+                    continue
+                # Schedule the following crossing; a late wake-up that skipped
+                # stages announces only the current one
+                self._tasks[task_id] = (known[0], known[1], None)
+                self._track(task, now, announce=True)
+
+    def seconds_until_next(self, now=None):
+        """Seconds until the next crossing or poll, whichever comes first"""
+        now = now or self.clock()
+        with self._lock:
+            times = [self._next_poll] if self._next_poll else []
+            if self._heap:
+                times.append(self._heap[0][0])
+        if not times:
+            return self.poll_interval
+        return max(0.0, (min(times) - now).total_seconds())
+
+    def _notify(self, task, stage, now):
+        row = dict(task, days_left=(task['due_date'].date() - now.date()).days)
+        entry = reminder_entry(row)
+        notification = {
+            'stage': stage,
+            'message': reminder_message(entry, stage),
+            'sent_at': now.strftime('%Y-%m-%d %H:%M:%S'),
+            'task': entry,
+        }
+        for sink in self.sinks:
+            try:
+                sink.send(notification)
+            except (OSError, smtplib.SMTPException) as e:
+                print(f"Error sending reminder for task {task['id']} "
+                      f"via {type(sink).__name__}: {e}")
+
+    def run(self, catch_up=False):
+        """Load the tasks and send reminders until stop() is called"""
+        self.load(catch_up)
+        while not self._stopped:
+            self._wakeup.clear()
+            try:
+                self.run_pending()
+                timeout = self.seconds_until_next()
+            except (TaskManagerError, *DB_ERRORS) as e:
+                print(f"Error checking reminders: {e}")
+                timeout = self.poll_interval
+            # Capped so clock changes and DST shifts are noticed within a poll
+            self._wakeup.wait(min(timeout, self.poll_interval))
+
+    def stop(self):
+        self._stopped = True
+        self._wakeup.set()
+
+    def close(self):
+        for sink in self.sinks:
+            sink.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Send reminders as tasks come due (30 days, tomorrow, today, overdue)")
+    parser.add_argument('--stdout', action='store_true',
+                        help="print reminders (the default when no other sink is given)")
+    parser.add_argument('--file', help="append reminders to this file as JSON lines")
+    parser.add_argument('--smtp', metavar='HOST:PORT',
+                        help="mail reminders through this SMTP server, e.g. localhost:1025")
+    parser.add_argument('--mail-from', default='reminders@localhost')
+    parser.add_argument('--mail-to', action='append', help="recipient (repeatable)")
+    parser.add_argument('--poll-interval', type=float, default=60,
+                        help="seconds between checks for changed tasks")
+    parser.add_argument('--catch-up', action='store_true',
+                        help="announce every loaded task's current stage at start-up")
+    args = parser.parse_args(argv)
+
+    sinks = []
+    if args.file:
+        sinks.append(FileSink(args.file))
+    if args.smtp:
+        host, _, port = args.smtp.rpartition(':')
+        sinks.append(SmtpSink(host or 'localhost', int(port), args.mail_from,
+                              args.mail_to or ['tasks@localhost']))
+    if args.stdout or not sinks:
+        sinks.append(StdoutSink())
+
+    task_manager = None
+    scheduler = None
+    try:
+        task_manager = open_task_manager()
+        scheduler = ReminderScheduler(task_manager, sinks, args.poll_interval)
+        signal.signal(signal.SIGTERM, lambda *_: scheduler.stop())
+        scheduler.run(args.catch_up)
+    except KeyboardInterrupt:
+        pass
+    except (TaskManagerError, *DB_ERRORS) as e:
+        print(f"Error starting reminder service: {e}", file=sys.stderr)
+        return 2
+    finally:
+        if scheduler:
+            scheduler.close()
+        if task_manager:
+            task_manager.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+import heapq
+import math
+import re
+
+_WORD = re.compile(r"\w+")
+
+# Terms shorter than this are not indexed, matching InnoDB's default
+# innodb_ft_min_token_size, so every backend finds the same tasks
+MIN_TERM_LENGTH = 3
+
+# InnoDB's default full-text stopword list; dropped on every backend
+STOPWORDS = frozenset((
+    "a", "about", "an", "are", "as", "at", "be", "by", "com", "de", "en", "for",
+    "from", "how", "i", "in", "is", "it", "la", "of", "on", "or", "that", "the",
+    "this", "to", "was", "what", "when", "where", "who", "will", "with", "und", "www",
+))
+
+# Okapi BM25 parameters
+K1 = 1.2
+B = 0.75
+
+
+def tokenize(text):
+    """Lower-cased searchable terms of text, in order and with repeats"""
+    return [term for term in _WORD.findall(text.lower())
+            if len(term) >= MIN_TERM_LENGTH and term not in STOPWORDS]
+
+
+def search_terms(query):
+    """Distinct terms of a search query; a task must contain all of them"""
+    return list(dict.fromkeys(tokenize(query)))
+
+
+class InvertedIndex:
+    """Term -> {task id: term frequency} postings over title and description.
+
+    Searches intersect the postings of every query term, rarest first, and
+    rank the matches by BM25, like SQLite FTS5's bm25(). Not thread-safe;
+    the memory store calls it under its own lock.
+    """
+
+    def __init__(self):
+        self.postings = {}
+        self.lengths = {}
+        self.total_length = 0
+
+    def add(self, task_id, title, description):
+        terms = tokenize(title) + tokenize(description)
+        frequencies = {}
+        for term in terms:
+            frequencies[term] = frequencies.get(term, 0) + 1
+        for term, frequency in frequencies.items():
+            self.postings.setdefault(term, {})[task_id] = frequency
+        self.lengths[task_id] = len(terms)
+        self.total_length += len(terms)
+
+    def remove(self, task_id, title, description):
+        if task_id not in self.lengths:
+            return
+        for term in set(tokenize(title) + tokenize(description)):
+            posting = self.postings.get(term)
+            if posting is not None:
+                posting.pop(task_id, None)
+                if not posting:
+                    del self.postings[term]
+        self.total_length -= self.lengths.pop(task_id)
+
+    def search(self, terms, candidates=None):
+        """{task id: BM25 score} for tasks containing every term.
+
+        candidates, if given, is a set of task IDs the result is limited to.
+        """
+        if not terms:
+            return {}
+        postings = [self.postings.get(term) for term in terms]
+        if not all(postings):
+            return {}
+        postings.sort(key=len)
+        ids = set(postings[0])
+        for posting in postings[1:]:
+            ids.intersection_update(posting)
+        if candidates is not None:
+            ids.intersection_update(candidates)
+
+        count = len(self.lengths)
+        average_length = self.total_length / count if count else 0
+        weights = [(posting, math.log(1 + (count - len(posting) + 0.5) / (len(posting) + 0.5)))
+                   for posting in postings]
+        scores = {}
+        for task_id in ids:
+            norm = K1 * (1 - B + B * self.lengths[task_id] / average_length) if average_length else K1
+            score = 0.0
+            for posting, idf in weights:
+                frequency = posting[task_id]
+                score += idf * frequency * (K1 + 1) / (frequency + norm)
+            scores[task_id] = score
+        return scores
+
+    @staticmethod
+    def top(scores, limit, offset=0):
+        """(task id, score) pairs ranked by score then ID, for one page"""
+        ranked = heapq.nsmallest(offset + limit, scores.items(),
+                                 key=lambda item: (-item[1], item[0]))
+        return ranked[offset:]
@@ -0,0 +1,246 @@
+import sqlite3
+import threading
+import time
+from datetime import date, datetime
+from storage import StorageBackend
+from migrations import migrate
+from metrics import metrics
+
+# Store dates as the same text MySQL prints and read DATETIME/TIMESTAMP
+# columns back as datetime objects, like pymysql does
+sqlite3.register_adapter(datetime, lambda value: value.strftime('%Y-%m-%d %H:%M:%S'))
+sqlite3.register_adapter(date, lambda value: value.strftime('%Y-%m-%d'))
+sqlite3.register_converter("DATETIME", lambda value: datetime.fromisoformat(value.decode()))
+sqlite3.register_converter("TIMESTAMP", lambda value: datetime.fromisoformat(value.decode()))
+
+PRAGMAS = (
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA foreign_keys = ON",
+    "PRAGMA busy_timeout = 5000",
+    "PRAGMA cache_size = -20000",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA mmap_size = 268435456",
+)
+
+
+def _dict_row(cursor, row):
+    return {column[0]: value for column, value in zip(cursor.description, row)}
+
+
+class SQLiteCursor:
+    """Cursor taking pymysql-style %s placeholders"""
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def execute(self, query, params=()):
+        started = time.perf_counter()
+        self._cursor.execute(query.replace('%s', '?'), tuple(params))
+        if metrics.enabled:
+            # rowcount is -1 for SELECT, which record_query ignores
+            metrics.record_query(query, params, time.perf_counter() - started,
+                                 self._cursor.rowcount)
+        return self._cursor.rowcount
+
+    def executemany(self, query, seq_of_params):
+        started = time.perf_counter()
+        self._cursor.executemany(query.replace('%s', '?'), seq_of_params)
+        if metrics.enabled:
+            metrics.record_query(query, None, time.perf_counter() - started,
+                                 self._cursor.rowcount)
+        return self._cursor.rowcount
+
+    def fetchone(self):
+        return self._cursor.fetchone()
+
+    def fetchmany(self, size):
+        return self._cursor.fetchmany(size)
+
+    def fetchall(self):
+        return self._cursor.fetchall()
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    @property
+    def rowcount(self):
+        return self._cursor.rowcount
+
+    @property
+    def lastrowid(self):
+        return self._cursor.lastrowid
+
+    def close(self):
+        self._cursor.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class SQLiteConnection:
+    """sqlite3 connection exposing the subset of the pymysql API TaskManager uses"""
+
+    def __init__(self, connection):
+        self._connection = connection
+
+    def cursor(self, cursorclass=None):
+        # sqlite3 cursors already step through results lazily
+        return SQLiteCursor(self._connection.cursor())
+
+    def begin(self):
+        # sqlite3 opens a transaction before the first write by itself
+        pass
+
+    def commit(self):
+        self._connection.commit()
+
+    def rollback(self):
+        self._connection.rollback()
+
+    def close(self):
+        self._connection.close()
+
+
+class SQLiteDatabase:
+    """Handle holding one connection borrowed from an SQLiteBackend"""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.connection = None
+        try:
+            self.connection = backend.acquire()
+        except sqlite3.Error as e:
+            print(f"Error opening SQLite database: {e}")
+
+    def create_tables(self):
+        """Bring the schema up to date by applying pending migrations"""
+        if self.connection is None:
+            print("No database connection")
+            return
+
+        try:
+            migrate(self.connection, self.backend)
+        except sqlite3.Error as e:
+            print(f"Error creating tables: {e}")
+
+    def close(self):
+        """Return the connection to the backend"""
+        if self.connection:
+            connection = self.connection
+            self.connection = None
+            self.backend.release(connection)
+
+    def __del__(self):
+        self.close()
+
+
+class SQLiteBackend(StorageBackend):
+    """Embedded SQLite storage, for edge deployments and local test runs.
+
+    Connections are opened in WAL mode so readers don't block the writer
+    and are kept for reuse. ':memory:' uses one shared connection, since
+    every new in-memory connection would be a separate empty database.
+    """
+
+    name = 'sqlite'
+    now_sql = "datetime('now', 'localtime')"
+    today_sql = "date('now', 'localtime')"
+    insert_ignore_sql = "INSERT OR IGNORE"
+    # No row locks; the database write lock is taken by the first write
+    lock_rows_sql = ""
+    no_limit_sql = "-1"
+
+    def __init__(self, path='tasks.db', max_idle=5):
+        super().__init__()
+        self.path = path
+        self.max_idle = max_idle
+        self._lock = threading.Lock()
+        self._idle = []
+        self._shared = None
+        self._stats = {'created': 0, 'reused': 0, 'checkouts': 0}
+
+    def _connect(self):
+        connection = sqlite3.connect(
+            self.path,
+            detect_types=sqlite3.PARSE_DECLTYPES,
+            check_same_thread=False
+        )
+        connection.row_factory = _dict_row
+        for pragma in PRAGMAS:
+            connection.execute(pragma)
+        self._stats['created'] += 1
+        return SQLiteConnection(connection)
+
+    def acquire(self):
+        """Check out a connection, reusing an idle one when available"""
+        started = time.perf_counter()
+        with self._lock:
+            self._stats['checkouts'] += 1
+            if self.path == ':memory:':
+                if self._shared is None:
+                    self._shared = self._connect()
+                connection = self._shared
+            elif self._idle:
+                self._stats['reused'] += 1
+                connection = self._idle.pop()
+            else:
+                connection = self._connect()
+        metrics.record_acquire('sqlite', time.perf_counter() - started)
+        return connection
+
+    def release(self, connection):
+        """Return a connection, closing it if enough are already idle"""
+        if connection is self._shared:
+            # Other handles are still using the one :memory: connection and
+            # may be mid-transaction, so it is never rolled back here
+            return
+        connection.rollback()
+        with self._lock:
+            if len(self._idle) < self.max_idle:
+                self._idle.append(connection)
+                return
+        connection.close()
+
+    def open(self):
+        return SQLiteDatabase(self)
+
+    def days_left_sql(self, column):
+        return (f"CAST(julianday(date({column})) - "
+                f"julianday({self.today_sql}) AS INTEGER)")
+
+    def days_from_today_sql(self, placeholder):
+        return f"date('now', 'localtime', '+' || {placeholder} || ' days')"
+
+    def seconds_ago_sql(self, placeholder):
+        return f"datetime('now', 'localtime', '-' || {placeholder} || ' seconds')"
+
+    def fulltext_sql(self, terms):
+        # Quoted FTS5 strings, implicitly ANDed; bm25() is lower for better matches
+        text = " ".join(f'"{term}"' for term in terms)
+        return ("JOIN tasks_fts ON tasks_fts.rowid = t.id", "tasks_fts MATCH %s",
+                "-bm25(tasks_fts)", [text])
+
+    def first_insert_id(self, cursor, row_count):
+        # SQLite reports the ID of the last row inserted
+        return cursor.lastrowid - row_count + 1
+
+    def is_missing_table_error(self, error):
+        return (isinstance(error, sqlite3.OperationalError)
+                and "no such table" in str(error))
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['idle'] = len(self._idle)
+            return stats
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+            shared, self._shared = self._shared, None
+        for connection in idle + ([shared] if shared else []):
+            connection.close()
@@ -1,18 +1,56 @@
+from types import MappingProxyType
+
+
 class Status:
-    def __init__(self, status_code):
-        self.status_code = status_code
-        self.statuses = {
-            "PENDING": "Pending",
-            "IN_PROGRESS": "In Progress",
-            "COMPLETED": "Completed",
-        }
-        self.stored_statuses = {}
-        for code, status in self.statuses.items():
-            self.stored_statuses[code] = status
-
-    def get_status(self, status_code):
-        return self.stored_statuses.get(status_code, "Unknown")
-
-    def get_status_code(self, status):
-        return list(self.stored_statuses.keys())[list(self.stored_statuses.values()).index(status)]
-    
\ No newline at end of file
+    """Immutable task status, interned per code.
+
+    Status("PENDING") always returns the same shared instance, so tasks
+    don't each carry their own copy of the lookup tables; the code <-> name
+    maps are built once for the class.
+    """
+
+    __slots__ = ('status_code',)
+
+    statuses = MappingProxyType({
+        "PENDING": "Pending",
+        "IN_PROGRESS": "In Progress",
+        "COMPLETED": "Completed",
+    })
+    stored_statuses = statuses
+    _codes_by_status = MappingProxyType({status: code for code, status in statuses.items()})
+    _instances = {}
+
+    def __new__(cls, status_code):
+        instance = cls._instances.get(status_code)
+        if instance is None:
+            instance = super().__new__(cls)
+            object.__setattr__(instance, 'status_code', status_code)
+            if status_code in cls.statuses:
+                instance = cls._instances.setdefault(status_code, instance)
+        return instance
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Status is immutable")
+
+    def __eq__(self, other):
+        return isinstance(other, Status) and other.status_code == self.status_code
+
+    def __hash__(self):
+        return hash(self.status_code)
+
+    def __repr__(self):
+        return f"Status({self.status_code!r})"
+
+    def __reduce__(self):
+        return (Status, (self.status_code,))
+
+    @classmethod
+    def get_status(cls, status_code):
+        return cls.statuses.get(status_code, "Unknown")
+
+    @classmethod
+    def get_status_code(cls, status):
+        try:
+            return cls._codes_by_status[status]
+        except KeyError:
+            raise ValueError(f"{status!r} is not a known status")
@@ -0,0 +1,115 @@
+import os
+import sqlite3
+import threading
+import pymysql
+from lookup_cache import LookupCache
+
+# Driver errors that TaskManager reports as TaskManagerError
+DB_ERRORS = (pymysql.Error, sqlite3.Error)
+
+
+class StorageBackend:
+    """Connection source and SQL dialect beneath TaskManager.
+
+    open() returns a handle with a `connection` attribute and a close()
+    method. The connection's cursors accept %s placeholders, return rows as
+    dicts and work as context managers, so TaskManager's SQL runs unchanged;
+    the few fragments that differ between engines come from the backend.
+    """
+
+    name = None
+
+    # Cursor class for unbuffered streaming reads, None if not needed
+    streaming_cursor = None
+
+    # SQL for the current timestamp (updated_at) and today's date
+    now_sql = "CURRENT_TIMESTAMP"
+    today_sql = "CURDATE()"
+
+    insert_ignore_sql = "INSERT IGNORE"
+
+    # Suffix locking the rows a SELECT reads until the transaction ends
+    lock_rows_sql = " FOR UPDATE"
+
+    # LIMIT value meaning no limit, for an OFFSET on its own
+    no_limit_sql = "18446744073709551615"
+
+    def __init__(self):
+        # Per-backend state: lookup IDs and the schema version checked by
+        # migrations.ensure_schema, both cached for the life of the process
+        self.lookups = LookupCache()
+        self.schema_version = None
+        self.schema_lock = threading.Lock()
+        # Whether the optional task_summary table exists; None until checked
+        self.summary_enabled = None
+
+    def open(self):
+        """Return a database handle with a live connection"""
+        raise NotImplementedError
+
+    def days_left_sql(self, column):
+        """SQL for the calendar days from today until `column`"""
+        raise NotImplementedError
+
+    def days_from_today_sql(self, placeholder):
+        """SQL for the date `placeholder` days after today"""
+        raise NotImplementedError
+
+    def seconds_ago_sql(self, placeholder):
+        """SQL for the timestamp `placeholder` seconds before now"""
+        raise NotImplementedError
+
+    def fulltext_sql(self, terms):
+        """(join, condition, score, params) matching tasks containing every term.
+
+        join is added to the FROM clause, condition to the WHERE clause and
+        score (higher is more relevant) to the select list. params holds the
+        values for the %s placeholders of score and then condition.
+        """
+        raise NotImplementedError
+
+    def first_insert_id(self, cursor, row_count):
+        """ID of the first row written by a multi-row INSERT on cursor"""
+        raise NotImplementedError
+
+    def is_missing_table_error(self, error):
+        """Whether a driver error means the queried table does not exist"""
+        raise NotImplementedError
+
+    def stats(self):
+        """Connection usage counters"""
+        return {}
+
+    def close(self):
+        """Close every connection the backend holds"""
+        pass
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def create_backend(name, **options):
+    """Create a storage backend by name ('mysql', 'sqlite' or 'memory')"""
+    # Imported here so each engine's module loads only when selected
+    if name == 'mysql':
+        from database import MySQLBackend
+        return MySQLBackend(**options)
+    if name == 'memory':
+        from memory_storage import MemoryBackend
+        options.setdefault('snapshot_path', os.getenv('MEMORY_SNAPSHOT_PATH'))
+        return MemoryBackend(**options)
+    if name == 'sqlite':
+        from sqlite_storage import SQLiteBackend
+        options.setdefault('path', os.getenv('SQLITE_PATH', 'tasks.db'))
+        return SQLiteBackend(**options)
+    raise ValueError(f"Unknown storage backend: {name}")
+
+
+def get_backend():
+    """Return the process-wide backend selected by DB_BACKEND (default mysql)"""
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            _backend = create_backend(os.getenv('DB_BACKEND', 'mysql'))
+        return _backend
@@ -6,6 +6,10 @@ from task_validator import TaskValidator, TaskValidationError
 
 
 class Task:
+    # Tasks are materialised per result row, so skip the per-instance dict
+    __slots__ = ('task_id', 'title', 'description', 'status', 'priority_level', 'due_date',
+                 'created_at', 'updated_at')
+
     def __init__(self, title, description, status, priority_level, due_date,
                  task_id=None, created_at=None, updated_at=None):
         try:
@@ -21,8 +25,8 @@ class Task:
             self.created_at = created_at or datetime.now()
             self.updated_at = updated_at or datetime.now()
             
-        except TaskValidationError as e:
-            raise TaskValidationError(str(e))
+        except TaskValidationError:
+            raise
         except Exception as e:
             raise TaskValidationError(f"Error creating task: {str(e)}")
 
@@ -83,8 +87,8 @@ class Task:
             
             self.updated_at = datetime.now()
             
-        except TaskValidationError as e:
-            raise TaskValidationError(str(e))
+        except TaskValidationError:
+            raise
         except Exception as e:
             raise TaskValidationError(f"Error updating task: {str(e)}")
 
@@ -94,8 +98,8 @@ class Task:
             f"Task {self.task_id}:\n"
             f"  Title: {self.title}\n"
             f"  Description: {self.description}\n"
-            f"  Status: {self.status.get_status_message(self.status.status_code)}\n"
-            f"  Priority: {self.priority_level.get_priority_level(self.priority_level.priority_level)}\n"
+            f"  Status: {Status.get_status(self.status.status_code)}\n"
+            f"  Priority: {PriorityLevel.get_priority_level(self.priority_level.priority_level)}\n"
             f"  Due Date: {TaskValidator.format_date_for_display(self.due_date)}\n"
             f"  Created: {self.created_at.strftime('%m/%d/%Y %H:%M:%S')}\n"
             f"  Updated: {self.updated_at.strftime('%m/%d/%Y %H:%M:%S')}"
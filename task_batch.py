@@ -0,0 +1,83 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from task_manager import TaskManagerError
+from task_validator import TaskValidationError
+
+
+class TaskBatchExecutor:
+    """Run task operations in parallel on a thread pool.
+
+    Every worker thread calls the one shared task manager, which gives each
+    thread its own pooled connection (see TaskManager), so up to
+    max_workers statements are in flight at once. A worker returns its
+    connection as soon as its call finishes, so idle workers never hold
+    one. max_workers defaults to DB_POOL_SIZE - 1, leaving a connection
+    for the calling thread, which usually holds one of its own. Results
+    keep the order of the input.
+
+        with TaskBatchExecutor(task_manager) as batch:
+            tasks = batch.get_tasks(task_ids)
+    """
+
+    def __init__(self, task_manager, max_workers=None):
+        self.task_manager = task_manager
+        self.max_workers = max_workers or max(1, int(os.getenv('DB_POOL_SIZE', 10)) - 1)
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                            thread_name_prefix="task-batch")
+
+    def map(self, operation, items):
+        """Call operation(item) for every item in parallel and return the results.
+
+        The first exception raised by any call is re-raised once all calls
+        have finished.
+        """
+        futures = [self._executor.submit(self._call, operation, item) for item in items]
+        results = []
+        error = None
+        for future in futures:
+            try:
+                results.append(future.result())
+            except Exception as e:
+                results.append(None)
+                error = error or e
+        if error is not None:
+            raise error
+        return results
+
+    def _call(self, operation, item):
+        try:
+            return operation(item)
+        finally:
+            self.task_manager.release_connection()
+
+    def get_tasks(self, task_ids):
+        """Fetch many tasks by ID; returns {task_id: task or None}"""
+        task_ids = list(dict.fromkeys(task_ids))
+        return dict(zip(task_ids, self.map(self.task_manager.get_task, task_ids)))
+
+    def update_each(self, updates):
+        """Apply per-task field changes from {task_id: update_data}.
+
+        Returns {task_id: updated state or the error raised for that task},
+        so one missing or invalid task does not hide the rest.
+        """
+        def update(item):
+            task_id, update_data = item
+            try:
+                return self.task_manager.update_task(task_id, update_data)
+            except (TaskManagerError, TaskValidationError) as e:
+                return e
+
+        return dict(zip(updates, self.map(update, list(updates.items()))))
+
+    def close(self):
+        """Wait for running calls and return the workers' connections"""
+        self._executor.shutdown(wait=True)
+        # The worker threads have exited; their connections can go back now
+        self.task_manager.release_finished_threads()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,113 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class TaskCache:
+    """In-process read-through cache for task rows and list query results.
+
+    Entries are evicted least-recently-used once max_size is reached and
+    expire ttl seconds after they were stored. TaskManager invalidates the
+    affected entries on every write it performs; writes made by other
+    processes become visible once the entry expires. Cached rows are shared
+    between callers and must not be mutated.
+
+    Every invalidation bumps `generation`. A reader takes it before running
+    its query and passes it to put(), which drops the fill if a write was
+    invalidated in between, so a result read before that write is never
+    cached after it.
+    """
+
+    def __init__(self, max_size=1024, ttl=60):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()   # key -> (expires_at, value)
+        self._query_keys = set()
+        self.generation = 0
+        self._stats = {
+            'hits': 0,
+            'misses': 0,
+            'evictions': 0,
+            'expirations': 0,
+            'invalidations': 0,
+            'stale_fills': 0,
+        }
+
+    @staticmethod
+    def task_key(task_id):
+        return ('task', str(task_id))
+
+    @staticmethod
+    def query_key(sql, params=()):
+        return ('query', sql, tuple(params))
+
+    def get(self, key):
+        """Return (True, value) on a hit and (False, None) on a miss"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats['misses'] += 1
+                return False, None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                self._remove(key)
+                self._stats['expirations'] += 1
+                self._stats['misses'] += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self._stats['hits'] += 1
+            return True, value
+
+    def put(self, key, value, generation=None):
+        """Store a value, evicting the least recently used entry if full.
+
+        generation is the cache's generation read before the value was
+        fetched; the value is dropped if anything was invalidated since.
+        """
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                self._stats['stale_fills'] += 1
+                return
+            if key in self._entries:
+                self._entries.move_to_end(key)
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            if key[0] == 'query':
+                self._query_keys.add(key)
+            while len(self._entries) > self.max_size:
+                oldest, _ = self._entries.popitem(last=False)
+                self._query_keys.discard(oldest)
+                self._stats['evictions'] += 1
+
+    def _remove(self, key):
+        self._entries.pop(key, None)
+        self._query_keys.discard(key)
+
+    def invalidate_tasks(self, task_ids=()):
+        """Drop the given tasks and every cached list, which may include them"""
+        with self._lock:
+            for task_id in task_ids:
+                self._remove(self.task_key(task_id))
+            for key in self._query_keys:
+                self._entries.pop(key, None)
+            self._query_keys.clear()
+            self.generation += 1
+            self._stats['invalidations'] += 1
+
+    def clear(self):
+        """Drop every entry"""
+        with self._lock:
+            self._entries.clear()
+            self._query_keys.clear()
+            self.generation += 1
+            self._stats['invalidations'] += 1
+
+    def stats(self):
+        """Return hit/miss counters and the current size"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['size'] = len(self._entries)
+            stats['max_size'] = self.max_size
+            lookups = stats['hits'] + stats['misses']
+            stats['hit_rate'] = stats['hits'] / lookups if lookups else 0.0
+            return stats
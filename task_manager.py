@@ -1,314 +1,1292 @@
-from database import Database
+import threading
+from datetime import date, datetime, timedelta
 from task import Task
+from task_validator import TaskValidator
 from status import Status
 from priority_level import PriorityLevel
-import pymysql
+from migrations import ensure_schema, SchemaVersionError
+from storage import DB_ERRORS, get_backend
+from task_cache import TaskCache
+from metrics import instrumented
+from search_index import search_terms
 
 class TaskManagerError(Exception):
     """Custom exception for database operation errors"""
     pass
 
-class TaskManager:
-    def __init__(self):
-        """Initialize database connection and ensure lookup data exists"""
-        self.db = Database()
-        self.db.create_tables()
-        self._init_lookup_data()
+# Columns returned for a task, shared by the read queries
+TASK_SELECT = """
+    SELECT 
+        t.id,
+        t.title,
+        t.description,
+        t.due_date,
+        t.is_completed,
+        t.created_at,
+        t.updated_at,
+        s.status_code,
+        p.priority_level_code
+    FROM tasks t
+    JOIN statuses s ON t.status_id = s.id
+    JOIN priority_levels p ON t.priority_level_id = p.id
+"""
 
-    def _init_lookup_data(self):
-        """Initialize status and priority level data"""
+# Task columns plus calendar days until due, computed by the server. Slots in
+# braces here and below are filled from the storage backend by backend_sql:
+# {days_left}, {today}, {days_ahead} (the date %s days from today) and
+# {settled} (the timestamp %s seconds ago).
+DAYS_LEFT_SELECT = """
+    SELECT 
+        t.id,
+        t.title,
+        t.description,
+        t.due_date,
+        t.is_completed,
+        t.created_at,
+        t.updated_at,
+        s.status_code,
+        p.priority_level_code,
+        {days_left} AS days_left
+    FROM tasks t
+    JOIN statuses s ON t.status_id = s.id
+    JOIN priority_levels p ON t.priority_level_id = p.id
+"""
+
+# get_tasks_due_between, get_upcoming and get_tasks_with_days_left; the
+# upcoming bounds are constant expressions so the due_date index applies
+DUE_BETWEEN_SELECT = DAYS_LEFT_SELECT + """
+    WHERE t.due_date BETWEEN %s AND %s
+    ORDER BY t.due_date, t.id
+"""
+
+UPCOMING_SELECT = DAYS_LEFT_SELECT + """
+    WHERE t.due_date >= {today}
+      AND t.due_date < {days_ahead}
+    ORDER BY t.due_date, t.id
+"""
+
+ALL_DAYS_LEFT_SELECT = DAYS_LEFT_SELECT + """
+    ORDER BY t.due_date, t.id
+"""
+
+# Dashboard counts in one pass: one row per status/priority/completion
+# group with its overdue and due-this-week counts
+STATS_SELECT = """
+    SELECT
+        t.status_id,
+        t.priority_level_id,
+        t.is_completed,
+        COUNT(*) AS task_count,
+        SUM(CASE WHEN t.due_date < {today} THEN 1 ELSE 0 END) AS overdue,
+        SUM(CASE WHEN t.due_date >= {today} AND t.due_date < {days_ahead}
+            THEN 1 ELSE 0 END) AS due_this_week
+    FROM tasks t
+    GROUP BY t.status_id, t.priority_level_id, t.is_completed
+"""
+
+# With the optional task_summary table (see task_summary.py) the group
+# counts are read from it and only open tasks due before next week are
+# counted, as a range over the (is_completed, due_date) index
+SUMMARY_SELECT = """
+    SELECT status_id, priority_level_id, is_completed, task_count
+    FROM task_summary
+    WHERE task_count > 0
+"""
+
+DUE_SOON_SELECT = """
+    SELECT
+        SUM(CASE WHEN t.due_date < {today} THEN 1 ELSE 0 END) AS overdue,
+        SUM(CASE WHEN t.due_date >= {today} THEN 1 ELSE 0 END) AS due_this_week
+    FROM tasks t
+    WHERE t.is_completed = %s AND t.due_date < {days_ahead}
+"""
+
+# Change log rows, written in the same transaction as the task writes they
+# describe; event_type is 'create', 'update', 'complete' or 'delete'. Always
+# a plain VALUES insert: INSERT ... SELECT reserves MySQL auto-increment
+# values in batches and leaves gaps that changes_since has to wait out.
+EVENT_INSERT = "INSERT INTO task_events (task_id, event_type) VALUES (%s, %s)"
+
+# A page of the change log with each task's current row (NULL once
+# deleted), with settled false for entries newer than settle_seconds
+CHANGES_SELECT = """
+    SELECT
+        e.seq,
+        e.task_id,
+        e.event_type,
+        e.created_at AS changed_at,
+        e.created_at <= {settled} AS settled,
+        t.id,
+        t.title,
+        t.description,
+        t.due_date,
+        t.is_completed,
+        t.created_at,
+        t.updated_at,
+        s.status_code,
+        p.priority_level_code
+    FROM task_events e
+    LEFT JOIN tasks t ON t.id = e.task_id
+    LEFT JOIN statuses s ON t.status_id = s.id
+    LEFT JOIN priority_levels p ON t.priority_level_id = p.id
+    WHERE e.seq > %s
+    ORDER BY e.seq
+    LIMIT %s
+"""
+
+# Seconds after which a hole in the change log's sequence is taken to be a
+# rolled-back write rather than one still committing; longer than any write
+# transaction keeps its events between insert and commit
+CHANGE_SETTLE_SECONDS = 10
+
+LATEST_CHANGE_SELECT = "SELECT MAX(seq) AS seq FROM task_events"
+
+
+def backend_sql(statement, backend):
+    """Fill the {slots} of one of the statements above with the backend's SQL"""
+    return statement.format(
+        days_left=backend.days_left_sql('t.due_date'),
+        today=backend.today_sql,
+        days_ahead=backend.days_from_today_sql('%s'),
+        settled=backend.seconds_ago_sql('%s'),
+    )
+
+
+def fold_stats(groups):
+    """Build the get_stats result from per status/priority/completion groups.
+
+    Each group is a dict with status_code, priority_level_code,
+    is_completed, task_count and optionally overdue and due_this_week.
+    """
+    stats = {
+        'total': 0,
+        'open': 0,
+        'completed': 0,
+        'overdue': 0,
+        'due_this_week': 0,
+        'by_status': dict.fromkeys(Status.statuses, 0),
+        'by_priority': dict.fromkeys(PriorityLevel.priority_levels, 0),
+    }
+    for group in groups:
+        count = int(group['task_count'])
+        by_status, by_priority = stats['by_status'], stats['by_priority']
+        by_status[group['status_code']] = by_status.get(group['status_code'], 0) + count
+        by_priority[group['priority_level_code']] = (
+            by_priority.get(group['priority_level_code'], 0) + count)
+        stats['total'] += count
+        if group['is_completed']:
+            stats['completed'] += count
+        else:
+            stats['open'] += count
+            stats['overdue'] += int(group.get('overdue') or 0)
+            stats['due_this_week'] += int(group.get('due_this_week') or 0)
+    return stats
+
+
+def fold_changes(rows, since):
+    """Build the changes_since result from CHANGES_SELECT rows.
+
+    MySQL hands out sequence numbers when events are inserted, not when they
+    commit, so a missing number may belong to a write that has not committed
+    yet. The page stops before such a gap until the event after it has
+    settled; otherwise the consumer would move past the gap for good.
+    """
+    changes = []
+    next_seq = since
+    for row in rows:
+        if row['seq'] != next_seq + 1 and not row['settled']:
+            break
+        task = None
+        if row['id'] is not None:
+            task = {column: row[column] for column in TaskQuery.DEFAULT_COLUMNS}
+        changes.append({
+            'seq': row['seq'],
+            'task_id': row['task_id'],
+            'event_type': row['event_type'],
+            'changed_at': row['changed_at'],
+            'task': task,
+        })
+        next_seq = row['seq']
+    return {'changes': changes, 'next_seq': next_seq}
+
+
+class TaskQuery:
+    """Composable, parameterised SELECT over tasks.
+
+    Filters combine with AND and are rendered into a single statement, so
+    status + priority + due date range + completion + ordering + limit cost
+    one round trip. Status and priority filters are resolved to IDs through
+    the TaskManager's lookup cache and compared on the indexed columns.
+
+        query = (TaskQuery(columns=TaskQuery.LIST_COLUMNS)
+                 .status("PENDING", "IN_PROGRESS")
+                 .due_between(None, "2030-01-31 23:59:59")
+                 .order_by("due_date", "-id")
+                 .limit(20))
+        tasks = task_manager.run_query(query)
+    """
+
+    COLUMNS = {
+        'id': 't.id',
+        'title': 't.title',
+        'description': 't.description',
+        'due_date': 't.due_date',
+        'is_completed': 't.is_completed',
+        'created_at': 't.created_at',
+        'updated_at': 't.updated_at',
+        'status_code': 's.status_code',
+        'priority_level_code': 'p.priority_level_code',
+        'days_left': None,  # dialect-specific, see build()
+    }
+
+    # Columns returned by TASK_SELECT
+    DEFAULT_COLUMNS = (
+        'id', 'title', 'description', 'due_date', 'is_completed',
+        'created_at', 'updated_at', 'status_code', 'priority_level_code',
+    )
+
+    # Everything but the description TEXT column, for list views
+    LIST_COLUMNS = tuple(c for c in DEFAULT_COLUMNS if c != 'description')
+
+    SORT_KEYS = {
+        'id': 't.id',
+        'title': 't.title',
+        'due_date': 't.due_date',
+        'created_at': 't.created_at',
+        'updated_at': 't.updated_at',
+        'status': 't.status_id',
+        'priority_level': 't.priority_level_id',
+    }
+
+    def __init__(self, columns=None):
+        columns = tuple(columns or self.DEFAULT_COLUMNS)
+        unknown = [c for c in columns if c not in self.COLUMNS]
+        if unknown:
+            raise TaskManagerError(f"Unknown columns: {', '.join(unknown)}")
+        if 'id' not in columns:
+            columns = ('id',) + columns
+        self.columns = columns
+        self._statuses = []
+        self._priorities = []
+        self._due_from = None
+        self._due_to = None
+        self._is_completed = None
+        self._updated_since = None
+        self._search_terms = None
+        self._after_id = None
+        self._order = []
+        self._limit = None
+        self._offset = None
+
+    def status(self, *status_codes):
+        """Keep tasks having any of the given status codes"""
+        self._statuses.extend(status_codes)
+        return self
+
+    def priority(self, *priority_codes):
+        """Keep tasks having any of the given priority level codes"""
+        self._priorities.extend(priority_codes)
+        return self
+
+    def due_between(self, start=None, end=None):
+        """Keep tasks due from start through end; either bound may be None"""
+        self._due_from = start
+        self._due_to = end
+        return self
+
+    def completed(self, is_completed=True):
+        """Keep completed (or, with False, not completed) tasks"""
+        self._is_completed = bool(is_completed)
+        return self
+
+    def updated_since(self, timestamp):
+        """Keep tasks created or updated at or after timestamp"""
+        self._updated_since = timestamp
+        return self
+
+    def search(self, text):
+        """Keep tasks whose title or description contains every term of text.
+
+        Adds a `score` column and, unless order_by() is used, ranks the
+        results by it (most relevant first, then by ID).
+        """
+        self._search_terms = search_terms(text)
+        return self
+
+    def after_id(self, task_id):
+        """Keep tasks with an ID greater than task_id (keyset pagination)"""
+        self._after_id = task_id
+        return self
+
+    def order_by(self, *keys):
+        """Sort by SORT_KEYS names; prefix a key with '-' for descending"""
+        for key in keys:
+            name = key.lstrip('-')
+            if name not in self.SORT_KEYS:
+                raise TaskManagerError(f"Unknown sort key: {name}")
+            direction = "DESC" if key.startswith('-') else "ASC"
+            self._order.append(f"{self.SORT_KEYS[name]} {direction}")
+        return self
+
+    def limit(self, limit, offset=None):
+        """Return at most `limit` tasks, optionally skipping `offset`"""
+        self._limit = int(limit)
+        return self.offset(offset)
+
+    def offset(self, offset):
+        """Skip the first `offset` tasks, with or without a limit"""
+        self._offset = int(offset) if offset else None
+        return self
+
+    @classmethod
+    def from_filters(cls, status=None, priority_level=None, due_from=None, due_to=None,
+                     is_completed=None, updated_since=None, search=None, order_by=None,
+                     limit=None, offset=None, columns=None):
+        """Build a query from keyword filters; status/priority take a code or a list"""
+        query = cls(columns=columns)
+        if status is not None:
+            query.status(*([status] if isinstance(status, str) else status))
+        if priority_level is not None:
+            query.priority(*([priority_level] if isinstance(priority_level, str) else priority_level))
+        if due_from is not None or due_to is not None:
+            query.due_between(due_from, due_to)
+        if is_completed is not None:
+            query.completed(is_completed)
+        if updated_since is not None:
+            query.updated_since(updated_since)
+        if search is not None:
+            query.search(search)
+        if order_by:
+            query.order_by(*([order_by] if isinstance(order_by, str) else order_by))
+        if limit is not None:
+            query.limit(limit)
+        if offset is not None:
+            query.offset(offset)
+        return query
+
+    def lookup_codes(self):
+        """Status and priority codes the filters need resolved to IDs"""
+        return list(self._statuses), list(self._priorities)
+
+    def where(self, task_manager):
+        """Return the WHERE conditions and parameters for the filters"""
+        conditions = []
+        params = []
+        if self._statuses:
+            ids = [task_manager.get_status_id(code) for code in self._statuses]
+            conditions.append(f"t.status_id IN ({', '.join(['%s'] * len(ids))})")
+            params.extend(ids)
+        if self._priorities:
+            ids = [task_manager.get_priority_id(code) for code in self._priorities]
+            conditions.append(f"t.priority_level_id IN ({', '.join(['%s'] * len(ids))})")
+            params.extend(ids)
+        if self._due_from is not None:
+            conditions.append("t.due_date >= %s")
+            params.append(date_bound(self._due_from))
+        if self._due_to is not None:
+            conditions.append("t.due_date <= %s")
+            params.append(date_bound(self._due_to, end_of_day=True))
+        if self._is_completed is not None:
+            conditions.append("t.is_completed = %s")
+            params.append(self._is_completed)
+        if self._updated_since is not None:
+            conditions.append("t.updated_at >= %s")
+            params.append(date_bound(self._updated_since))
+        if self._after_id is not None:
+            conditions.append("t.id > %s")
+            params.append(self._after_id)
+        return conditions, params
+
+    def select_ids(self, task_manager, lock=False):
+        """Render (sql, params) selecting only the IDs of the matching tasks.
+
+        With lock, the rows stay locked until the transaction ends on
+        backends that support it.
+        """
+        conditions, params = self.where(task_manager)
+        sql = "SELECT t.id FROM tasks t"
+        if conditions:
+            sql += f" WHERE {' AND '.join(conditions)}"
+        if lock:
+            sql += task_manager.backend.lock_rows_sql
+        return sql, params
+
+    def build(self, task_manager):
+        """Render the query into (sql, params)"""
+        expressions = dict(self.COLUMNS)
+        expressions['days_left'] = task_manager.backend.days_left_sql('t.due_date')
+        columns = self.columns
+        join = ""
+        params = []
+        conditions = []
+        order = self._order
+        if self._search_terms is not None:
+            if self._search_terms:
+                join, match, score, params = task_manager.backend.fulltext_sql(self._search_terms)
+            else:
+                # Only stopwords or too-short terms: nothing can match
+                match, score = "1 = 0", "0"
+            expressions['score'] = score
+            columns += ('score',)
+            conditions.append(match)
+            order = order or ["score DESC", "t.id ASC"]
+        select = ", ".join(f"{expressions[c]} AS {c}" for c in columns)
+        sql = f"""
+            SELECT {select}
+            FROM tasks t
+            JOIN statuses s ON t.status_id = s.id
+            JOIN priority_levels p ON t.priority_level_id = p.id
+            {join}
+        """
+        filter_conditions, filter_params = self.where(task_manager)
+        conditions += filter_conditions
+        params += filter_params
+        if conditions:
+            sql += f" WHERE {' AND '.join(conditions)}"
+        if order:
+            sql += f" ORDER BY {', '.join(order)}"
+        if self._limit is not None:
+            sql += " LIMIT %s"
+            params.append(self._limit)
+        elif self._offset is not None:
+            # OFFSET is only valid after a LIMIT
+            sql += f" LIMIT {task_manager.backend.no_limit_sql}"
+        if self._offset is not None:
+            sql += " OFFSET %s"
+            params.append(self._offset)
+        return sql, params
+
+
+def date_bound(value, end_of_day=False):
+    """A due date or updated_at filter bound as a datetime.
+
+    Accepts a datetime, a date or a 'YYYY-MM-DD[ HH:MM:SS]' string. A bare
+    day as an upper bound (end_of_day) means the last second of that day.
+    SQLite compares the stored text, so every backend gets full timestamps.
+    """
+    if isinstance(value, datetime):
+        return value
+    if not isinstance(value, date):
         try:
-            with self.db.connection.cursor() as cursor:
-                # Get default values from Status and PriorityLevel classes
-                status = Status("")
-                priority = PriorityLevel("")
-
-                # Insert status codes if they don't exist
-                for status_code in status.stored_statuses.keys():
-                    cursor.execute("""
-                        INSERT IGNORE INTO statuses (status_code) 
-                        VALUES (%s)
-                    """, (status_code,))
-
-                # Insert priority levels if they don't exist
-                for priority_code in priority.stored_priority_levels.keys():
-                    cursor.execute("""
-                        INSERT IGNORE INTO priority_levels (priority_level_code) 
-                        VALUES (%s)
-                    """, (priority_code,))
+            if len(str(value)) > 10:
+                return datetime.strptime(str(value), '%Y-%m-%d %H:%M:%S')
+            value = datetime.strptime(str(value), '%Y-%m-%d').date()
+        except ValueError:
+            raise TaskManagerError(f"Invalid date bound: {value}")
+    day = datetime(value.year, value.month, value.day)
+    return day + timedelta(days=1, seconds=-1) if end_of_day else day
 
-                self.db.connection.commit()
-        except pymysql.Error as e:
-            raise TaskManagerError(f"Error initializing lookup data: {str(e)}")
+
+def _merge_filters(filters, status=None, priority=None):
+    """Combine a find_tasks filter dict with the status/priority shorthands"""
+    merged = dict(filters or {})
+    if status is not None:
+        merged['status'] = status
+    if priority is not None:
+        merged['priority_level'] = priority
+    return merged
+
+
+class TaskRowBuilder:
+    """Validation and column mapping shared by TaskManager and AsyncTaskManager.
+
+    Turns task input into INSERT values and UPDATE assignments and builds
+    post-update task states. Subclasses provide backend, get_status_id and
+    get_priority_id.
+    """
+
+    def build_task_row(self, task_data):
+        """Validate task data and return the column values for an INSERT"""
+        # Create Task object for validation and conversion
+        task = Task(
+            title=task_data['title'],
+            description=task_data['description'],
+            status=task_data['status'],
+            priority_level=task_data['priority_level'],
+            due_date=task_data['due_date']
+        )
+
+        # Convert to dictionary for database
+        task_dict = task.to_dict()
+
+        return (
+            task_dict['title'],
+            task_dict['description'],
+            self.get_status_id(task_dict['status_code']),
+            self.get_priority_id(task_dict['priority_level_code']),
+            task_dict['due_date']
+        )
+
+    def _validated_rows(self, chunk, start, result):
+        """Validate one chunk of a batch and return the INSERT values of its valid rows.
+
+        Errors are added to result['errors'] offset by start, the chunk's
+        position in the batch, so they index the caller's input.
+        """
+        records, errors = TaskValidator.validate_batch(chunk)
+        result['errors'].extend((start + index, message) for index, message in errors)
+        return [self.row_from_record(record) for _, record in records]
+
+    def row_from_record(self, record):
+        """INSERT column values for a record returned by TaskValidator.validate_batch"""
+        return (
+            record['title'],
+            record['description'],
+            self.get_status_id(record['status']),
+            self.get_priority_id(record['priority_level']),
+            record['due_date']
+        )
+
+    def _update_assignments(self, fields):
+        """Validate update fields and return SET clauses, values and the normalized fields"""
+        normalized = TaskValidator.normalize_update_fields(fields)
+        assignments, values = self._assignments(normalized)
+        return assignments, values, normalized
+
+    def _assignments(self, normalized):
+        """SET clauses and values for fields already normalized for an update"""
+        columns = {
+            'title': 'title',
+            'description': 'description',
+            'status': 'status_id',
+            'priority_level': 'priority_level_id',
+            'due_date': 'due_date',
+        }
+        to_id = {
+            'status': self.get_status_id,
+            'priority_level': self.get_priority_id,
+        }
+        assignments = []
+        values = []
+        for name, value in normalized.items():
+            assignments.append(f"{columns[name]} = %s")
+            values.append(to_id[name](value) if name in to_id else value)
+        assignments.append(f"updated_at = {self.backend.now_sql}")
+        return assignments, values
+
+    def _updated_state(self, task_id, current, changes):
+        """Build a task's post-update state without re-reading it"""
+        state = dict(current) if current else {'id': task_id}
+        state.update(changes)
+        state['updated_at'] = datetime.now()
+        return state
+
+    def _state_changes(self, normalized):
+        """Task row fields changed by normalized update fields"""
+        changes = {}
+        for name in ('title', 'description'):
+            if name in normalized:
+                changes[name] = normalized[name]
+        if 'status' in normalized:
+            changes['status_code'] = normalized['status']
+        if 'priority_level' in normalized:
+            changes['priority_level_code'] = normalized['priority_level']
+        if 'due_date' in normalized:
+            changes['due_date'] = datetime.strptime(normalized['due_date'], '%Y-%m-%d %H:%M:%S')
+        return changes
+
+
+class TaskManager(TaskRowBuilder):
+    """Task operations over a storage backend.
+
+    One instance can be shared by many threads. Each thread borrows its own
+    connection from the backend on first use (see `db`) and keeps it until
+    close(), so calls never interleave on one protocol stream. Every method
+    is its own transaction: MySQL connections run in autocommit mode so a
+    read always sees the latest committed data, and methods issuing several
+    writes wrap them in begin()/commit(). The lookup and schema caches and
+    an attached TaskCache are shared and lock-protected. Size the
+    connection pool (DB_POOL_SIZE) to at least the number of threads.
+    """
+
+    def __init__(self, cache=None, backend=None):
+        """Borrow a database connection and verify the schema version.
+
+        The storage backend defaults to the one selected by DB_BACKEND.
+        Pass a TaskCache to serve get_task and the list queries from memory;
+        the cache can be shared by every TaskManager in the process.
+        """
+        self.cache = cache
+        self.backend = backend or get_backend()
+        self._local = threading.local()
+        self._handles = {}   # thread -> database handle it borrowed
+        self._handles_lock = threading.Lock()
+        try:
+            ensure_schema(self.db.connection, self.backend)
+        except (*DB_ERRORS, SchemaVersionError) as e:
+            raise TaskManagerError(f"Error checking database schema: {str(e)}")
+
+    @property
+    def db(self):
+        """The calling thread's database handle, opened on first use"""
+        db = getattr(self._local, 'db', None)
+        if db is None:
+            db = self.backend.open()
+            if db.connection is None:
+                raise TaskManagerError("No database connection")
+            self._local.db = db
+            with self._handles_lock:
+                self._release_finished_threads()
+                self._handles[threading.current_thread()] = db
+        return db
+
+    def _release_finished_threads(self):
+        """Return connections borrowed by threads that have exited (lock held)"""
+        for thread in [t for t in self._handles if not t.is_alive()]:
+            self._handles.pop(thread).close()
+
+    def release_finished_threads(self):
+        """Return the connections of worker threads that have exited"""
+        with self._handles_lock:
+            self._release_finished_threads()
+
+    def release_connection(self):
+        """Return the calling thread's connection; its next call borrows one again"""
+        db = getattr(self._local, 'db', None)
+        if db is None:
+            return
+        self._local.db = None
+        with self._handles_lock:
+            self._handles.pop(threading.current_thread(), None)
+        db.close()
+
+    def _fetch_all(self, query, params=()):
+        """Run a read query, serving it from the cache when one is attached"""
+        generation = None
+        if self.cache is not None:
+            key = TaskCache.query_key(query, params)
+            hit, rows = self.cache.get(key)
+            if hit:
+                return rows
+            generation = self.cache.generation
+        with self.db.connection.cursor() as cursor:
+            cursor.execute(query, params)
+            rows = cursor.fetchall()
+        if self.cache is not None:
+            self.cache.put(key, rows, generation)
+        return rows
+
+    def _invalidate(self, task_ids=()):
+        """Drop cached entries a write to task_ids may have made stale"""
+        if self.cache is not None:
+            self.cache.invalidate_tasks(task_ids)
+
+    def refresh_lookups(self):
+        """Reload the shared status and priority level ID cache"""
+        try:
+            self.backend.lookups.load(self.db.connection)
+        except DB_ERRORS as e:
+            raise TaskManagerError(f"Error loading lookup data: {str(e)}")
+
+    def _lookup_id(self, find, code):
+        """Resolve a lookup code from the cache, reloading once on a miss"""
+        if not self.backend.lookups.loaded:
+            self.refresh_lookups()
+        lookup_id = find(code)
+        if lookup_id is None:
+            # The table may have gained a row since the cache was loaded
+            self.refresh_lookups()
+            lookup_id = find(code)
+        return lookup_id
 
     def get_status_id(self, status_code):
         """Get status ID from status code"""
-        try:
-            with self.db.connection.cursor() as cursor:
-                query = "SELECT id FROM statuses WHERE status_code = %s"
-                cursor.execute(query, (status_code,))
-                result = cursor.fetchone()
-                if result:
-                    return result['id']
-                raise TaskManagerError(f"Invalid status code: {status_code}")
-        except pymysql.Error as e:
-            raise TaskManagerError(f"Error getting status ID: {str(e)}")
+        status_id = self._lookup_id(self.backend.lookups.status_id, status_code)
+        if status_id is None:
+            raise TaskManagerError(f"Invalid status code: {status_code}")
+        return status_id
 
     def get_priority_id(self, priority_code):
         """Get priority level ID from priority code"""
-        try:
-            with self.db.connection.cursor() as cursor:
-                query = "SELECT id FROM priority_levels WHERE priority_level_code = %s"
-                cursor.execute(query, (priority_code,))
-                result = cursor.fetchone()
-                if result:
-                    return result['id']
-                raise TaskManagerError(f"Invalid priority level code: {priority_code}")
-        except pymysql.Error as e:
-            raise TaskManagerError(f"Error getting priority level ID: {str(e)}")
+        priority_id = self._lookup_id(self.backend.lookups.priority_id, priority_code)
+        if priority_id is None:
+            raise TaskManagerError(f"Invalid priority level code: {priority_code}")
+        return priority_id
 
+    @instrumented
     def create_task(self, task_data):
         """Create a new task in database"""
         try:
-            # Create Task object for validation and conversion
-            task = Task(
-                title=task_data['title'],
-                description=task_data['description'],
-                status=task_data['status'],
-                priority_level=task_data['priority_level'],
-                due_date=task_data['due_date']
-            )
-            
-            # Convert to dictionary for database
-            task_dict = task.to_dict()
-            
-            # Get IDs for status and priority level
-            status_id = self.get_status_id(task_dict['status_code'])
-            priority_id = self.get_priority_id(task_dict['priority_level_code'])
-            
+            values = self.build_task_row(task_data)
+
             # Insert into database
+            self.db.connection.begin()
             with self.db.connection.cursor() as cursor:
                 query = """
                     INSERT INTO tasks (title, description, status_id, priority_level_id, due_date)
                     VALUES (%s, %s, %s, %s, %s)
                 """
-                values = (
-                    task_dict['title'],
-                    task_dict['description'],
-                    status_id,
-                    priority_id,
-                    task_dict['due_date']
-                )
-                
                 cursor.execute(query, values)
                 task_id = cursor.lastrowid
+                cursor.execute(EVENT_INSERT, (task_id, 'create'))
                 self.db.connection.commit()
+                self._invalidate()
                 
                 # Get the created task
                 return self.get_task(task_id)
                 
-        except pymysql.Error as e:
+        except DB_ERRORS as e:
+            self.db.connection.rollback()
             raise TaskManagerError(f"Error creating task: {str(e)}")
 
-    def mark_as_completed(self, task_id):
-        """Mark a task as completed"""
+    @instrumented
+    def create_tasks(self, tasks_data, chunk_size=1000):
+        """Create many tasks using one multi-row INSERT per chunk.
+
+        Each chunk of chunk_size items is validated with
+        TaskValidator.validate_batch (Task's rules); invalid items are
+        skipped and reported instead of aborting the import. Each chunk is
+        inserted and committed as one transaction, and the new IDs are taken
+        from the chunk's lastrowid range rather than re-read (this relies on
+        auto_increment_increment = 1, the MySQL default).
+
+        Returns {'ids': [...], 'errors': [(index, message), ...]} where ids
+        are in input order for the valid items and index is the position of
+        the rejected item in tasks_data.
+        """
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1")
+
+        result = {'ids': [], 'errors': []}
+        chunk = []
+        start = 0
+        for task_data in tasks_data:
+            chunk.append(task_data)
+            if len(chunk) >= chunk_size:
+                self._create_chunk(chunk, start, result)
+                start += len(chunk)
+                chunk = []
+        if chunk:
+            self._create_chunk(chunk, start, result)
+        return result
+
+    def _create_chunk(self, chunk, start, result):
+        """Validate one chunk in a batch, insert its valid rows and record the outcome"""
+        rows = self._validated_rows(chunk, start, result)
+        if rows:
+            result['ids'].extend(self._insert_chunk(rows, len(result['ids'])))
+
+    def _insert_chunk(self, rows, created_so_far):
+        """Insert validated rows in a single statement and return their IDs"""
+        placeholders = ", ".join(["(%s, %s, %s, %s, %s)"] * len(rows))
+        query = f"""
+            INSERT INTO tasks (title, description, status_id, priority_level_id, due_date)
+            VALUES {placeholders}
+        """
+        values = [value for row in rows for value in row]
         try:
-            # First check if task exists
-            task = self.get_task(task_id)
-            if not task:
-                raise TaskManagerError(f"Task {task_id} not found")
+            self.db.connection.begin()
+            with self.db.connection.cursor() as cursor:
+                cursor.execute(query, values)
+                first_id = self.backend.first_insert_id(cursor, len(rows))
+                ids = list(range(first_id, first_id + len(rows)))
+                self._log_events(cursor, 'create', ids)
+            self.db.connection.commit()
+            self._invalidate()
+        except DB_ERRORS as e:
+            self.db.connection.rollback()
+            raise TaskManagerError(
+                f"Error creating tasks after {created_so_far} were created: {str(e)}")
+        return ids
+
+    def _log_events(self, cursor, event_type, task_ids):
+        """Append an event_type change for each of task_ids in cursor's transaction"""
+        cursor.executemany(EVENT_INSERT, [(task_id, event_type) for task_id in task_ids])
 
+    @instrumented
+    def mark_as_completed(self, task_id, current=None, reread=False):
+        """Mark a task as completed in a single UPDATE.
+
+        Returns the task state built in memory from `current` (the row the
+        caller already holds, if any) plus the completed fields, or the
+        re-read row when reread is True.
+        """
+        try:
             # Get the status ID for "COMPLETED"
             completed_status = self.get_status_id("COMPLETED")
-                
+
             # Update task to mark as completed and change status
+            self.db.connection.begin()
             with self.db.connection.cursor() as cursor:
-                query = """
+                query = f"""
                     UPDATE tasks 
                     SET is_completed = TRUE,
                         status_id = %s,
-                        updated_at = CURRENT_TIMESTAMP
+                        updated_at = {self.backend.now_sql}
                     WHERE id = %s
                 """
                 cursor.execute(query, (completed_status, task_id))
-                self.db.connection.commit()
-                
-                # Get the updated task
-                return self.get_task(task_id)
-                
-        except pymysql.Error as e:
+                found = cursor.rowcount > 0
+                if found:
+                    cursor.execute(EVENT_INSERT, (task_id, 'complete'))
+            self.db.connection.commit()
+            self._invalidate([task_id])
+        except DB_ERRORS as e:
+            self.db.connection.rollback()
             raise TaskManagerError(f"Error marking task as completed: {str(e)}")
 
+        if not found:
+            raise TaskManagerError(f"Task {task_id} not found")
+        if reread:
+            return self.get_task(task_id)
+        return self._updated_state(task_id, current, {
+            'is_completed': True,
+            'status_code': "COMPLETED",
+        })
 
+    @instrumented
     def get_task(self, task_id):
         """Get task from database by ID"""
+        generation = None
+        if self.cache is not None:
+            hit, task = self.cache.get(TaskCache.task_key(task_id))
+            if hit:
+                return task
+            generation = self.cache.generation
         try:
             with self.db.connection.cursor() as cursor:
-                query = """
-                    SELECT 
-                        t.id,
-                        t.title,
-                        t.description,
-                        t.due_date,
-                        t.is_completed,
-                        t.created_at,
-                        t.updated_at,
-                        s.status_code,
-                        p.priority_level_code
-                    FROM tasks t
-                    JOIN statuses s ON t.status_id = s.id
-                    JOIN priority_levels p ON t.priority_level_id = p.id
-                    WHERE t.id = %s
-                """
-                cursor.execute(query, (task_id,))
-                return cursor.fetchone()
-        except pymysql.Error as e:
+                cursor.execute(f"{TASK_SELECT} WHERE t.id = %s", (task_id,))
+                task = cursor.fetchone()
+        except DB_ERRORS as e:
             raise TaskManagerError(f"Error retrieving task: {str(e)}")
+        if task is not None and self.cache is not None:
+            self.cache.put(TaskCache.task_key(task_id), task, generation)
+        return task
 
-    def get_all_tasks(self):
-        """Get all tasks from database"""
+    @instrumented
+    def run_query(self, query):
+        """Execute a TaskQuery and return the matching tasks"""
+        sql, params = query.build(self)
         try:
-            with self.db.connection.cursor() as cursor:
-                query = """
-                    SELECT 
-                        t.id,
-                        t.title,
-                        t.description,
-                        t.due_date,
-                        t.is_completed,
-                        t.created_at,
-                        t.updated_at,
-                        s.status_code,
-                        p.priority_level_code
-                    FROM tasks t
-                    JOIN statuses s ON t.status_id = s.id
-                    JOIN priority_levels p ON t.priority_level_id = p.id
-                """
-                cursor.execute(query)
-                return cursor.fetchall()
-        except pymysql.Error as e:
+            return self._fetch_all(sql, params)
+        except DB_ERRORS as e:
             raise TaskManagerError(f"Error retrieving tasks: {str(e)}")
 
+    @instrumented
+    def find_tasks(self, **filters):
+        """Get tasks matching any combination of filters in one query.
+
+        Accepts status, priority_level (a code or list of codes), due_from,
+        due_to (inclusive), is_completed, updated_since, search (see
+        search_tasks), order_by (a SORT_KEYS name or list, '-' prefix for
+        descending), limit, offset and columns (e.g. TaskQuery.LIST_COLUMNS
+        to skip the description).
+        """
+        return self.run_query(TaskQuery.from_filters(**filters))
+
+    @instrumented
+    def search_tasks(self, query, filters=None, limit=20, offset=0, columns=None):
+        """Full-text search over task titles and descriptions.
+
+        Returns one page of the tasks containing every term of query, most
+        relevant first, each with a `score`. filters takes any of the
+        find_tasks filters. Terms shorter than three characters and common
+        stopwords are ignored (see search_index). Backed by the FULLTEXT
+        index on MySQL and the tasks_fts FTS5 table on SQLite.
+        """
+        return self.find_tasks(search=query, limit=limit, offset=offset, columns=columns,
+                               **(filters or {}))
+
+    @instrumented
+    def get_all_tasks(self):
+        """Get all tasks from database"""
+        return self.find_tasks()
+
+    @instrumented
     def get_tasks_by_status(self, status):
         """Get tasks by status from database"""
-        try:
-            with self.db.connection.cursor() as cursor:
-                query = """
-                    SELECT 
-                        t.id,
-                        t.title,
-                        t.description,
-                        t.due_date,
-                        t.is_completed,
-                        t.created_at,
-                        t.updated_at,
-                        s.status_code,
-                        p.priority_level_code
-                    FROM tasks t
-                    JOIN statuses s ON t.status_id = s.id
-                    JOIN priority_levels p ON t.priority_level_id = p.id
-                    WHERE s.status_code = %s
-                """
-                cursor.execute(query, (status,))
-                return cursor.fetchall()
-        except pymysql.Error as e:
-            raise TaskManagerError(f"Error retrieving tasks by status: {str(e)}")
+        return self.find_tasks(status=status)
 
+    @instrumented
     def get_tasks_by_priority(self, priority):
         """Get tasks by priority from database"""
+        return self.find_tasks(priority_level=priority)
+
+    def iter_task_pages(self, status=None, priority=None, page_size=500, cursor=None,
+                        columns=None, filters=None):
+        """Yield (tasks, next_cursor) pages of tasks ordered by ID.
+
+        Pages are fetched with keyset pagination (id > last id) through an
+        unbuffered server-side cursor, so memory stays bounded by page_size
+        however large the table is. Pass a next_cursor back as `cursor` to
+        resume after that page; the last page has next_cursor None.
+        filters takes any of the find_tasks filters; status and priority,
+        when given, override the ones in filters.
+        """
+        if page_size < 1:
+            raise ValueError("page_size must be at least 1")
+
+        filters = _merge_filters(filters, status, priority)
+        last_id = int(cursor) if cursor else 0
+        while True:
+            query = TaskQuery.from_filters(columns=columns, **filters
+                                           ).after_id(last_id).order_by('id').limit(page_size)
+            sql, params = query.build(self)
+            try:
+                with self.db.connection.cursor(self.backend.streaming_cursor) as ss_cursor:
+                    ss_cursor.execute(sql, params)
+                    page = list(ss_cursor)
+            except DB_ERRORS as e:
+                raise TaskManagerError(f"Error retrieving tasks: {str(e)}")
+
+            if not page:
+                return
+            last_id = page[-1]['id']
+            next_cursor = str(last_id) if len(page) == page_size else None
+            yield page, next_cursor
+            if next_cursor is None:
+                return
+
+    def iter_tasks(self, status=None, priority=None, page_size=500, cursor=None,
+                   columns=None, filters=None):
+        """Yield tasks one at a time, optionally filtered, in ID order"""
+        for page, _ in self.iter_task_pages(status, priority, page_size, cursor, columns,
+                                            filters):
+            yield from page
+
+    def iter_all_tasks(self, page_size=500):
+        """Stream all tasks from database"""
+        return self.iter_tasks(page_size=page_size)
+
+    def iter_tasks_by_status(self, status, page_size=500):
+        """Stream tasks by status from database"""
+        return self.iter_tasks(status=status, page_size=page_size)
+
+    def iter_tasks_by_priority(self, priority, page_size=500):
+        """Stream tasks by priority from database"""
+        return self.iter_tasks(priority=priority, page_size=page_size)
+
+    @instrumented
+    def get_tasks_due_between(self, start, end):
+        """Get tasks due between start and end (inclusive), soonest first.
+
+        Each task includes days_left, the number of calendar days from the
+        database server's current date to the due date.
+        """
         try:
-            with self.db.connection.cursor() as cursor:
-                query = """
-                    SELECT 
-                        t.id,
-                        t.title,
-                        t.description,
-                        t.due_date,
-                        t.is_completed,
-                        t.created_at,
-                        t.updated_at,
-                        s.status_code,
-                        p.priority_level_code
-                    FROM tasks t
-                    JOIN statuses s ON t.status_id = s.id
-                    JOIN priority_levels p ON t.priority_level_id = p.id
-                    WHERE p.priority_level_code = %s
-                """
-                cursor.execute(query, (priority,))
-                return cursor.fetchall()
-        except pymysql.Error as e:
-            raise TaskManagerError(f"Error retrieving tasks by priority: {str(e)}")
+            return self._fetch_all(backend_sql(DUE_BETWEEN_SELECT, self.backend),
+                                   (date_bound(start), date_bound(end, end_of_day=True)))
+        except DB_ERRORS as e:
+            raise TaskManagerError(f"Error retrieving tasks by due date: {str(e)}")
 
-    def update_task(self, task_id, update_data):
-        """Update task in database"""
+    @instrumented
+    def get_upcoming(self, days=30):
+        """Get tasks due from today through `days` days from now, soonest first"""
         try:
-            # Get current task data
-            current_task = self.get_task(task_id)
-            if not current_task:
-                raise TaskManagerError(f"Task {task_id} not found")
-
-            # Create Task object with updated data
-            task = Task(
-                title=update_data.get('title', current_task['title']),
-                description=update_data.get('description', current_task['description']),
-                status=update_data.get('status', current_task['status_code']),
-                priority_level=update_data.get('priority_level', current_task['priority_level_code']),
-                due_date=update_data.get('due_date', current_task['due_date']),
-                task_id=task_id
-            )
+            return self._fetch_all(backend_sql(UPCOMING_SELECT, self.backend), (days + 1,))
+        except DB_ERRORS as e:
+            raise TaskManagerError(f"Error retrieving upcoming tasks: {str(e)}")
+
+    @instrumented
+    def get_tasks_with_days_left(self):
+        """Get all tasks with days_left, soonest due first"""
+        try:
+            return self._fetch_all(backend_sql(ALL_DAYS_LEFT_SELECT, self.backend))
+        except DB_ERRORS as e:
+            raise TaskManagerError(f"Error retrieving tasks: {str(e)}")
+
+    def _summary_enabled(self):
+        """Whether the optional task_summary table exists, checked once per backend"""
+        if self.backend.summary_enabled is None:
+            try:
+                with self.db.connection.cursor() as cursor:
+                    cursor.execute("SELECT 1 FROM task_summary LIMIT 1")
+                    cursor.fetchall()
+                self.backend.summary_enabled = True
+            except DB_ERRORS as e:
+                if not self.backend.is_missing_table_error(e):
+                    raise
+                self.backend.summary_enabled = False
+        return self.backend.summary_enabled
 
-            # Convert to dictionary and get IDs
-            task_dict = task.to_dict()
-            status_id = self.get_status_id(task_dict['status_code'])
-            priority_id = self.get_priority_id(task_dict['priority_level_code'])
-            
-            # Update in database
+    def _with_codes(self, groups):
+        """Add status and priority codes to rows carrying the lookup IDs"""
+        lookups = self.backend.lookups
+        if not lookups.loaded or any(
+                lookups.status_code(g['status_id']) is None
+                or lookups.priority_code(g['priority_level_id']) is None for g in groups):
+            self.refresh_lookups()
+        return [dict(group,
+                     status_code=lookups.status_code(group['status_id']),
+                     priority_level_code=lookups.priority_code(group['priority_level_id']))
+                for group in groups]
+
+    @instrumented
+    def get_stats(self):
+        """Get dashboard counts without fetching any task rows.
+
+        Returns total, open, completed, overdue (open and due before today),
+        due_this_week (open and due today or in the next 6 days) and
+        by_status/by_priority counts for every code. All of it comes from
+        one GROUP BY query, or, when the optional task_summary table is
+        installed (see task_summary.py), from that table plus an index range
+        count of the open tasks due before next week.
+        """
+        try:
+            if self._summary_enabled():
+                stats = fold_stats(self._with_codes(self._fetch_all(SUMMARY_SELECT)))
+                due, = self._fetch_all(backend_sql(DUE_SOON_SELECT, self.backend), (False, 7))
+                stats['overdue'] = int(due['overdue'] or 0)
+                stats['due_this_week'] = int(due['due_this_week'] or 0)
+                return stats
+            groups = self._fetch_all(backend_sql(STATS_SELECT, self.backend), (7,))
+            return fold_stats(self._with_codes(groups))
+        except DB_ERRORS as e:
+            if self.backend.is_missing_table_error(e):
+                # The summary table was dropped by another process
+                self.backend.summary_enabled = None
+            raise TaskManagerError(f"Error retrieving task statistics: {str(e)}")
+
+    @instrumented
+    def update_task(self, task_id, update_data, current=None, reread=False):
+        """Update only the supplied fields of a task in a single UPDATE.
+
+        update_data may hold title, description, status, priority_level and
+        due_date; only those fields are validated and written. Returns the
+        task state built in memory from `current` (the row the caller already
+        holds, if any) plus the changes, or the re-read row when reread is
+        True.
+        """
+        assignments, values, normalized = self._update_assignments(update_data)
+        try:
+            self.db.connection.begin()
             with self.db.connection.cursor() as cursor:
-                query = """
-                    UPDATE tasks 
-                    SET title = %s,
-                        description = %s,
-                        status_id = %s,
-                        priority_level_id = %s,
-                        due_date = %s,
-                        updated_at = CURRENT_TIMESTAMP
-                    WHERE id = %s
-                """
-                values = (
-                    task_dict['title'],
-                    task_dict['description'],
-                    status_id,
-                    priority_id,
-                    task_dict['due_date'],
-                    task_id
+                cursor.execute(
+                    f"UPDATE tasks SET {', '.join(assignments)} WHERE id = %s",
+                    values + [task_id]
                 )
-                
-                cursor.execute(query, values)
-                self.db.connection.commit()
-                
-                # Get the updated task
-                return self.get_task(task_id)
-                
-        except pymysql.Error as e:
+                found = cursor.rowcount > 0
+                if found:
+                    cursor.execute(EVENT_INSERT, (task_id, 'update'))
+            self.db.connection.commit()
+            self._invalidate([task_id])
+        except DB_ERRORS as e:
+            self.db.connection.rollback()
             raise TaskManagerError(f"Error updating task: {str(e)}")
 
+        if not found:
+            raise TaskManagerError(f"Task {task_id} not found")
+        if reread:
+            return self.get_task(task_id)
+
+        return self._updated_state(task_id, current, self._state_changes(normalized))
+
+    @instrumented
     def delete_task(self, task_id):
         """Delete task from database"""
         try:
+            self.db.connection.begin()
             with self.db.connection.cursor() as cursor:
                 query = "DELETE FROM tasks WHERE id = %s"
                 cursor.execute(query, (task_id,))
+                deleted = cursor.rowcount > 0
+                if deleted:
+                    cursor.execute(EVENT_INSERT, (task_id, 'delete'))
                 self.db.connection.commit()
-                return cursor.rowcount > 0
-        except pymysql.Error as e:
+                self._invalidate([task_id])
+                return deleted
+        except DB_ERRORS as e:
+            self.db.connection.rollback()
             raise TaskManagerError(f"Error deleting task: {str(e)}")
 
+    def _execute_for_ids(self, statement, values, task_ids, chunk_size, event_type):
+        """Run `statement ... WHERE id IN (...)` over chunks of task IDs.
+
+        All chunks and their change events run in one transaction; the
+        summed rowcount is returned.
+        """
+        task_ids = list(dict.fromkeys(task_ids))
+        self.db.connection.begin()
+        try:
+            with self.db.connection.cursor() as cursor:
+                affected = self._write_ids(cursor, statement, values, task_ids,
+                                           chunk_size, event_type)
+            self.db.connection.commit()
+            self._invalidate(task_ids)
+        except DB_ERRORS:
+            self.db.connection.rollback()
+            raise
+        return affected
+
+    def _write_ids(self, cursor, statement, values, task_ids, chunk_size, event_type):
+        """Run the chunked statement on cursor, then log one event per task written.
+
+        The events go in last so their sequence numbers are taken just
+        before commit. Only tasks that exist are logged: a delete chunk
+        selects (and locks, on MySQL) its existing IDs first, and an update
+        chunk that missed some IDs looks up the ones it found.
+        """
+        affected = 0
+        written = []
+        for start in range(0, len(task_ids), chunk_size):
+            chunk = task_ids[start:start + chunk_size]
+            placeholders = ", ".join(["%s"] * len(chunk))
+            existing = f"SELECT id FROM tasks WHERE id IN ({placeholders})"
+            if event_type == 'delete':
+                cursor.execute(existing + self.backend.lock_rows_sql, chunk)
+                chunk = [row['id'] for row in cursor.fetchall()]
+                if not chunk:
+                    continue
+                placeholders = ", ".join(["%s"] * len(chunk))
+            cursor.execute(
+                f"{statement} WHERE id IN ({placeholders})",
+                list(values) + chunk
+            )
+            rowcount = cursor.rowcount
+            if 0 < rowcount < len(chunk) and event_type != 'delete':
+                cursor.execute(existing, chunk)
+                chunk = [row['id'] for row in cursor.fetchall()]
+            if rowcount > 0:
+                written.extend(chunk)
+            affected += rowcount
+        self._log_events(cursor, event_type, written)
+        return affected
+
+    @instrumented
+    def complete_tasks(self, task_ids, chunk_size=1000):
+        """Mark many tasks as completed and return how many were found"""
+        try:
+            completed_status = self.get_status_id("COMPLETED")
+            return self._execute_for_ids(
+                f"""
+                UPDATE tasks
+                SET is_completed = TRUE,
+                    status_id = %s,
+                    updated_at = {self.backend.now_sql}
+                """,
+                (completed_status,), task_ids, chunk_size, 'complete'
+            )
+        except DB_ERRORS as e:
+            raise TaskManagerError(f"Error marking tasks as completed: {str(e)}")
+
+    @instrumented
+    def delete_tasks(self, task_ids, chunk_size=1000):
+        """Delete many tasks and return how many were deleted"""
+        try:
+            return self._execute_for_ids("DELETE FROM tasks", (), task_ids, chunk_size, 'delete')
+        except DB_ERRORS as e:
+            raise TaskManagerError(f"Error deleting tasks: {str(e)}")
+
+    @instrumented
+    def update_tasks(self, task_ids, fields, chunk_size=1000):
+        """Apply the same field changes to many tasks and return how many were found"""
+        assignments, values, _ = self._update_assignments(fields)
+        try:
+            return self._execute_for_ids(
+                f"UPDATE tasks SET {', '.join(assignments)}",
+                values, task_ids, chunk_size, 'update'
+            )
+        except DB_ERRORS as e:
+            raise TaskManagerError(f"Error updating tasks: {str(e)}")
+
+    @instrumented
+    def update_where(self, filters, fields, chunk_size=1000):
+        """Apply field changes to every task matching the filters.
+
+        filters accepts the find_tasks filters status, priority_level,
+        due_from, due_to and is_completed. An empty filter is rejected so a
+        typo cannot rewrite the whole table. The matching IDs are selected
+        (and locked, on MySQL) first so each gets a change event, then
+        updated in chunks like update_tasks. Returns the number of matching
+        tasks.
+        """
+        if not filters:
+            raise TaskManagerError("update_where requires at least one filter")
+        unknown = set(filters) - {'status', 'priority_level', 'due_from', 'due_to', 'is_completed'}
+        if unknown:
+            raise TaskManagerError(f"Unknown filters: {', '.join(sorted(unknown))}")
+        assignments, values, _ = self._update_assignments(fields)
+        select, filter_values = TaskQuery.from_filters(**filters).select_ids(self, lock=True)
+        try:
+            self.db.connection.begin()
+            with self.db.connection.cursor() as cursor:
+                cursor.execute(select, filter_values)
+                task_ids = [row['id'] for row in cursor.fetchall()]
+                affected = self._write_ids(cursor, f"UPDATE tasks SET {', '.join(assignments)}",
+                                           values, task_ids, chunk_size, 'update')
+            self.db.connection.commit()
+            self._invalidate(task_ids)
+            return affected
+        except DB_ERRORS as e:
+            self.db.connection.rollback()
+            raise TaskManagerError(f"Error updating tasks: {str(e)}")
+
+    @instrumented
+    def changes_since(self, seq=0, limit=1000, settle_seconds=CHANGE_SETTLE_SECONDS):
+        """Read the task change log after sequence number seq.
+
+        Returns {'changes': [...], 'next_seq': n}. Each change has seq,
+        task_id, event_type ('create', 'update', 'complete' or 'delete'),
+        changed_at and task, the task's current row or None once it is
+        deleted. Pass next_seq back in to continue; a full page means more
+        may be waiting. A consumer starts from latest_change_seq(), read
+        before it loads its initial copy of the tasks. The cost follows the
+        number of changes, not the size of the table. settle_seconds is how
+        long a gap in the sequence is waited on, see fold_changes.
+        """
+        sql = backend_sql(CHANGES_SELECT, self.backend)
+        try:
+            # Not cached: the log grows without touching cached task entries
+            with self.db.connection.cursor() as cursor:
+                cursor.execute(sql, (settle_seconds, seq, limit))
+                rows = cursor.fetchall()
+        except DB_ERRORS as e:
+            raise TaskManagerError(f"Error reading task changes: {str(e)}")
+        return fold_changes(rows, seq)
+
+    @instrumented
+    def latest_change_seq(self):
+        """Sequence number of the newest change, 0 if there are none"""
+        try:
+            with self.db.connection.cursor() as cursor:
+                cursor.execute(LATEST_CHANGE_SELECT)
+                return cursor.fetchone()['seq'] or 0
+        except DB_ERRORS as e:
+            raise TaskManagerError(f"Error reading task changes: {str(e)}")
+
+    @instrumented
+    def prune_changes(self, before_seq):
+        """Delete change log entries older than before_seq and return how many.
+
+        Consumers still behind before_seq can no longer catch up from the
+        log and have to reload every task.
+        """
+        try:
+            with self.db.connection.cursor() as cursor:
+                cursor.execute("DELETE FROM task_events WHERE seq < %s", (before_seq,))
+                pruned = cursor.rowcount
+            self.db.connection.commit()
+            return pruned
+        except DB_ERRORS as e:
+            self.db.connection.rollback()
+            raise TaskManagerError(f"Error pruning task changes: {str(e)}")
+
     def __del__(self):
-        """Ensure database connection is closed"""
-        if hasattr(self, 'db'):
-            self.db.close()
+        """Ensure database connections are returned"""
+        if hasattr(self, '_handles'):
+            self.close()
 
     def close(self):
-        """Explicitly close the database connection"""
-        if hasattr(self, 'db'):
-            self.db.close()
\ No newline at end of file
+        """Return every thread's connection to the backend.
+
+        Call it once no thread is using the manager any more.
+        """
+        with self._handles_lock:
+            handles = list(self._handles.values())
+            self._handles.clear()
+        self._local = threading.local()
+        for handle in handles:
+            handle.close()
+
+
+def open_task_manager(cache=None, backend=None):
+    """Return a task manager for the backend selected by DB_BACKEND.
+
+    The in-memory engine has no SQL connection, so it is served by
+    MemoryTaskManager, which offers the same methods as TaskManager.
+    """
+    backend = backend or get_backend()
+    if backend.name == 'memory':
+        from memory_storage import MemoryTaskManager
+        return MemoryTaskManager(cache=cache, backend=backend)
+    return TaskManager(cache=cache, backend=backend)
@@ -0,0 +1,193 @@
+import argparse
+import sys
+from storage import DB_ERRORS
+from task_manager import open_task_manager, TaskManagerError
+
+# Task counts per status, priority and completion, kept current by triggers
+# on tasks so get_stats reads a handful of rows however large the table is.
+# Optional: every write that changes one of the three columns also updates
+# a summary row, and concurrent writers of the same combination queue on it.
+SUMMARY_TABLE = {
+    'mysql': """
+        CREATE TABLE IF NOT EXISTS task_summary (
+            status_id INT NOT NULL,
+            priority_level_id INT NOT NULL,
+            is_completed BOOLEAN NOT NULL,
+            task_count BIGINT NOT NULL DEFAULT 0,
+            PRIMARY KEY (status_id, priority_level_id, is_completed)
+        )
+    """,
+    'sqlite': """
+        CREATE TABLE IF NOT EXISTS task_summary (
+            status_id INTEGER NOT NULL,
+            priority_level_id INTEGER NOT NULL,
+            is_completed BOOLEAN NOT NULL,
+            task_count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (status_id, priority_level_id, is_completed)
+        )
+    """,
+}
+
+_MYSQL_ADD = """
+    INSERT INTO task_summary (status_id, priority_level_id, is_completed, task_count)
+    VALUES (NEW.status_id, NEW.priority_level_id, NEW.is_completed, 1)
+    ON DUPLICATE KEY UPDATE task_count = task_count + 1
+"""
+
+_MYSQL_REMOVE = """
+    UPDATE task_summary SET task_count = task_count - 1
+    WHERE status_id = OLD.status_id AND priority_level_id = OLD.priority_level_id
+      AND is_completed = OLD.is_completed
+"""
+
+# Two statements rather than an upsert, which needs SQLite 3.24 or later
+_SQLITE_ADD = """
+    INSERT OR IGNORE INTO task_summary (status_id, priority_level_id, is_completed, task_count)
+    VALUES (NEW.status_id, NEW.priority_level_id, NEW.is_completed, 0);
+    UPDATE task_summary SET task_count = task_count + 1
+    WHERE status_id = NEW.status_id AND priority_level_id = NEW.priority_level_id
+      AND is_completed = NEW.is_completed;
+"""
+
+_SQLITE_REMOVE = """
+    UPDATE task_summary SET task_count = task_count - 1
+    WHERE status_id = OLD.status_id AND priority_level_id = OLD.priority_level_id
+      AND is_completed = OLD.is_completed;
+"""
+
+SUMMARY_TRIGGERS = {
+    'mysql': [
+        f"CREATE TRIGGER task_summary_insert AFTER INSERT ON tasks FOR EACH ROW {_MYSQL_ADD}",
+        f"CREATE TRIGGER task_summary_delete AFTER DELETE ON tasks FOR EACH ROW {_MYSQL_REMOVE}",
+        f"""
+        CREATE TRIGGER task_summary_update AFTER UPDATE ON tasks FOR EACH ROW
+        BEGIN
+            IF NOT (NEW.status_id <=> OLD.status_id
+                    AND NEW.priority_level_id <=> OLD.priority_level_id
+                    AND NEW.is_completed <=> OLD.is_completed) THEN
+                {_MYSQL_REMOVE};
+                {_MYSQL_ADD};
+            END IF;
+        END
+        """,
+    ],
+    'sqlite': [
+        f"CREATE TRIGGER task_summary_insert AFTER INSERT ON tasks BEGIN {_SQLITE_ADD} END",
+        f"CREATE TRIGGER task_summary_delete AFTER DELETE ON tasks BEGIN {_SQLITE_REMOVE} END",
+        f"""
+        CREATE TRIGGER task_summary_update
+        AFTER UPDATE OF status_id, priority_level_id, is_completed ON tasks
+        WHEN NEW.status_id IS NOT OLD.status_id
+          OR NEW.priority_level_id IS NOT OLD.priority_level_id
+          OR NEW.is_completed IS NOT OLD.is_completed
+        BEGIN {_SQLITE_REMOVE} {_SQLITE_ADD} END
+        """,
+    ],
+}
+
+TRIGGER_NAMES = ('task_summary_insert', 'task_summary_delete', 'task_summary_update')
+
+
+def _check_backend(task_manager):
+    if task_manager.backend.name not in SUMMARY_TABLE:
+        raise TaskManagerError(
+            f"The {task_manager.backend.name} backend keeps its own task counts")
+
+
+def rebuild_summary(task_manager):
+    """Recount the summary rows from the tasks table"""
+    _check_backend(task_manager)
+    connection = task_manager.db.connection
+    try:
+        connection.begin()
+        with connection.cursor() as cursor:
+            cursor.execute("DELETE FROM task_summary")
+            cursor.execute("""
+                INSERT INTO task_summary (status_id, priority_level_id, is_completed, task_count)
+                SELECT status_id, priority_level_id, is_completed, COUNT(*)
+                FROM tasks
+                GROUP BY status_id, priority_level_id, is_completed
+            """)
+        connection.commit()
+    except DB_ERRORS as e:
+        connection.rollback()
+        raise TaskManagerError(f"Error rebuilding task summary: {str(e)}")
+
+
+def enable_summary(task_manager):
+    """Create the summary table and its triggers, then fill it.
+
+    On MySQL, creating triggers needs the TRIGGER privilege (and, with
+    binary logging, log_bin_trust_function_creators or SUPER). Run it while
+    writes are quiet; writes committed between creating the triggers and
+    the recount are counted by the recount.
+    """
+    _check_backend(task_manager)
+    dialect = task_manager.backend.name
+    connection = task_manager.db.connection
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(SUMMARY_TABLE[dialect])
+            for name in TRIGGER_NAMES:
+                cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+            for statement in SUMMARY_TRIGGERS[dialect]:
+                cursor.execute(statement)
+        connection.commit()
+    except DB_ERRORS as e:
+        connection.rollback()
+        raise TaskManagerError(f"Error enabling task summary: {str(e)}")
+    rebuild_summary(task_manager)
+    task_manager.backend.summary_enabled = True
+
+
+def disable_summary(task_manager):
+    """Drop the summary triggers and table; get_stats falls back to GROUP BY"""
+    _check_backend(task_manager)
+    connection = task_manager.db.connection
+    try:
+        with connection.cursor() as cursor:
+            for name in TRIGGER_NAMES:
+                cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+            cursor.execute("DROP TABLE IF EXISTS task_summary")
+        connection.commit()
+    except DB_ERRORS as e:
+        connection.rollback()
+        raise TaskManagerError(f"Error disabling task summary: {str(e)}")
+    task_manager.backend.summary_enabled = False
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Manage the optional task_summary table behind get_stats")
+    parser.add_argument('action', choices=('enable', 'disable', 'rebuild', 'show'))
+    args = parser.parse_args(argv)
+
+    task_manager = None
+    try:
+        task_manager = open_task_manager()
+        if args.action == 'enable':
+            enable_summary(task_manager)
+            print("Task summary enabled.")
+        elif args.action == 'disable':
+            disable_summary(task_manager)
+            print("Task summary disabled.")
+        elif args.action == 'rebuild':
+            rebuild_summary(task_manager)
+            print("Task summary rebuilt.")
+        stats = task_manager.get_stats()
+        for key in ('total', 'open', 'completed', 'overdue', 'due_this_week'):
+            print(f"{key}: {stats[key]}")
+        for group in ('by_status', 'by_priority'):
+            for code, count in stats[group].items():
+                print(f"{code}: {count}")
+    except TaskManagerError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+    finally:
+        if task_manager:
+            task_manager.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
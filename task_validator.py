@@ -1,4 +1,21 @@
-from datetime import datetime
+from datetime import date, datetime
+
+# Days per month in a common year; February is adjusted for leap years
+MONTH_DAYS = (31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
+# Fields of a task row, in the order missing ones are reported
+TASK_FIELDS = ('title', 'description', 'status', 'priority_level', 'due_date')
+
+
+def _is_leap(year):
+    return year % 4 == 0 and (year % 100 != 0 or year % 400 == 0)
+
+
+def _format_for_db(value):
+    """format_date_for_db without strftime's per-call overhead"""
+    return (f"{value.year:04d}-{value.month:02d}-{value.day:02d} "
+            f"{value.hour:02d}:{value.minute:02d}:{value.second:02d}")
+
 
 class TaskValidationError(Exception):
     """Custom exception for task validation errors"""
@@ -47,81 +64,190 @@ class TaskValidator:
             raise TaskValidationError(f"Invalid priority level code: {priority_level}")
 
     @staticmethod
-    def validate_date_parts(month, day, year):
-        """Validate individual date components"""
-        current_date = datetime.now()
-        
-        # Validate month (1-12)
+    def date_parts_error(month, day, year, today):
+        """Return why month/day/year is not a valid due date from `today`, or None"""
         if not (1 <= month <= 12):
-            raise TaskValidationError(f"Month must be between 1 and 12, got {month}")
-            
-        # Validate day (1-31)
-        # Get the actual max days for the given month
-        month_days = {
-            1: 31,  # January
-            2: 29 if year % 4 == 0 and (year % 100 != 0 or year % 400 == 0) else 28,  # February (leap year check)
-            3: 31,  # March
-            4: 30,  # April
-            5: 31,  # May
-            6: 30,  # June
-            7: 31,  # July
-            8: 31,  # August
-            9: 30,  # September
-            10: 31,  # October
-            11: 30,  # November
-            12: 31   # December
-        }
-        max_days = month_days[month]
-        
+            return f"Month must be between 1 and 12, got {month}"
+
+        max_days = 29 if month == 2 and _is_leap(year) else MONTH_DAYS[month - 1]
         if not (1 <= day <= max_days):
-            raise TaskValidationError(f"Day must be between 1 and {max_days} for month {month}, got {day}")
-            
-        # Create the date object for comparison
+            return f"Day must be between 1 and {max_days} for month {month}, got {day}"
+
         try:
-            input_date = datetime(year, month, day)
-            current_date = datetime(current_date.year, current_date.month, current_date.day)
-            
-            # Check if the date is in the past
-            if input_date < current_date:
-                raise TaskValidationError("Due date cannot be in the past")
-                
+            input_date = date(year, month, day)
         except ValueError as e:
-            raise TaskValidationError(f"Invalid date: {str(e)}")
+            return f"Invalid date: {str(e)}"
+        if input_date < today:
+            return "Due date cannot be in the past"
+        return None
 
     @staticmethod
-    def parse_due_date(due_date):
-        """Parse and validate due date in MM/DD/YYYY format"""
+    def validate_date_parts(month, day, year):
+        """Validate individual date components"""
+        error = TaskValidator.date_parts_error(month, day, year, date.today())
+        if error:
+            raise TaskValidationError(error)
+
+    @staticmethod
+    def check_due_date(due_date, today):
+        """Parse a due date against `today` without raising.
+
+        Returns (datetime, None) for a valid MM/DD/YYYY string or datetime,
+        else (None, error message).
+        """
         if isinstance(due_date, datetime):
-            # If it's already a datetime, validate it's not in the past
-            current_date = datetime.now()
-            if due_date.date() < current_date.date():
-                raise TaskValidationError("Due date cannot be in the past")
-            return due_date
-            
-        try:
-            # First check the format strictly
-            if not due_date.count('/') == 2:
-                raise TaskValidationError("Due date must be in MM/DD/YYYY format")
-            
-            # Split and convert parts
+            if due_date.date() < today:
+                return None, "Due date cannot be in the past"
+            return due_date, None
+
+        if not isinstance(due_date, str):
+            return None, "Invalid due date format. Use MM/DD/YYYY format"
+        parts = due_date.split('/')
+        if len(parts) != 3:
+            return None, "Due date must be in MM/DD/YYYY format"
+        month_str, day_str, year_str = parts
+        if month_str.isdecimal() and day_str.isdecimal() and year_str.isdecimal():
+            month, day, year = int(month_str), int(day_str), int(year_str)
+        else:
+            # Rare: signs or surrounding spaces, which int() still accepts
             try:
-                month_str, day_str, year_str = due_date.split('/')
-                month = int(month_str)
-                day = int(day_str)
-                year = int(year_str)
+                month, day, year = int(month_str), int(day_str), int(year_str)
             except ValueError:
-                raise TaskValidationError("Month, day, and year must be valid numbers")
-            
-            # Validate the individual parts
-            TaskValidator.validate_date_parts(month, day, year)
-            
-            # If all validation passes, create the datetime object
-            return datetime(year, month, day)
-            
-        except ValueError as e:
-            if "day is out of range for month" in str(e):
-                raise TaskValidationError(f"Invalid day for the given month")
-            raise TaskValidationError("Invalid due date format. Use MM/DD/YYYY format")
+                return None, "Month, day, and year must be valid numbers"
+
+        error = TaskValidator.date_parts_error(month, day, year, today)
+        if error:
+            return None, error
+        return datetime(year, month, day), None
+
+    @staticmethod
+    def parse_due_date(due_date):
+        """Parse and validate due date in MM/DD/YYYY format"""
+        parsed, error = TaskValidator.check_due_date(due_date, date.today())
+        if error:
+            raise TaskValidationError(error)
+        return parsed
+
+    @staticmethod
+    def validate_batch(rows, today=None):
+        """Validate many task rows without raising.
+
+        Checks the same rules as Task with "today" captured once for the
+        whole batch. Returns (records, errors): records is a list of
+        (index, record) for the valid rows, each record holding the stripped
+        title and description, the status and priority_level codes and the
+        due_date formatted for the database; errors is a list of
+        (index, message) with the message Task would have raised.
+        """
+        today = today or date.today()
+        statuses = set(TaskValidator.STATUS_MAP.values())
+        priorities = set(TaskValidator.PRIORITY_MAP.values())
+        due_dates = {}
+        records = []
+        errors = []
+        for index, row in enumerate(rows):
+            try:
+                values = [row[name] for name in TASK_FIELDS]
+            except KeyError as e:
+                errors.append((index, f"Missing required fields: {e.args[0]}"))
+                continue
+            except TypeError:
+                errors.append((index, "Task data must be a mapping"))
+                continue
+            title, description, status, priority_level, due_date = values
+
+            if isinstance(title, str) and isinstance(description, str):
+                title = title.strip()
+                description = description.strip()
+            else:
+                # Unusual input: report exactly what the per-row path would
+                try:
+                    TaskValidator.validate_fields(title, description, status,
+                                                  priority_level, due_date)
+                    title = title.strip()
+                    description = description.strip()
+                except TaskValidationError as e:
+                    errors.append((index, str(e)))
+                    continue
+                except Exception as e:
+                    errors.append((index, f"Error creating task: {str(e)}"))
+                    continue
+            if not (title and description and status and priority_level and due_date):
+                missing = [label for label, value in (
+                    ("title", title), ("description", description), ("status", status),
+                    ("priority level", priority_level), ("due date", due_date)) if not value]
+                errors.append((index, f"Missing required fields: {', '.join(missing)}"))
+                continue
+            # A list or dict from JSON input is invalid, not a set lookup error
+            if not isinstance(status, str) or status not in statuses:
+                errors.append((index, f"Invalid status code: {status}"))
+                continue
+            if not isinstance(priority_level, str) or priority_level not in priorities:
+                errors.append((index, f"Invalid priority level code: {priority_level}"))
+                continue
+
+            # Imports repeat the same few hundred dates, so each distinct
+            # string is parsed once per batch
+            checked = due_dates.get(due_date) if isinstance(due_date, str) else None
+            if checked is None:
+                parsed, error = TaskValidator.check_due_date(due_date, today)
+                checked = (_format_for_db(parsed) if parsed else None, error)
+                if isinstance(due_date, str):
+                    due_dates[due_date] = checked
+            if checked[1]:
+                errors.append((index, checked[1]))
+                continue
+            records.append((index, {
+                'title': title,
+                'description': description,
+                'status': status,
+                'priority_level': priority_level,
+                'due_date': checked[0],
+            }))
+        return records, errors
+
+    @staticmethod
+    def normalize_update_fields(fields):
+        """Validate a partial update and return it keyed by column value.
+
+        Only the supplied fields are checked. Returns a dict with any of
+        title, description, status, priority_level and due_date (formatted
+        for the database).
+        """
+        allowed = ('title', 'description', 'status', 'priority_level', 'due_date')
+        unknown = [name for name in fields if name not in allowed]
+        if unknown:
+            raise TaskValidationError(f"Unknown fields: {', '.join(unknown)}")
+        if not fields:
+            raise TaskValidationError("No fields to update")
+
+        normalized = {}
+        for name in ('title', 'description'):
+            if name in fields:
+                value = fields[name]
+                if value and not isinstance(value, str):
+                    raise TaskValidationError(f"Invalid {name}: must be text")
+                if not value or not value.strip():
+                    raise TaskValidationError(f"Missing required fields: {name}")
+                normalized[name] = value.strip()
+
+        if 'status' in fields:
+            if fields['status'] not in TaskValidator.STATUS_MAP.values():
+                raise TaskValidationError(f"Invalid status code: {fields['status']}")
+            normalized['status'] = fields['status']
+
+        if 'priority_level' in fields:
+            if fields['priority_level'] not in TaskValidator.PRIORITY_MAP.values():
+                raise TaskValidationError(f"Invalid priority level code: {fields['priority_level']}")
+            normalized['priority_level'] = fields['priority_level']
+
+        if 'due_date' in fields:
+            if not fields['due_date']:
+                raise TaskValidationError("Missing required fields: due date")
+            normalized['due_date'] = TaskValidator.format_date_for_db(
+                TaskValidator.parse_due_date(fields['due_date']))
+
+        return normalized
 
     @staticmethod
     def format_date_for_display(date):
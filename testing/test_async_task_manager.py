@@ -0,0 +1,89 @@
+import asyncio
+import os
+from datetime import datetime, timedelta
+import pytest
+from task_manager import TaskManagerError
+
+aiomysql = pytest.importorskip("aiomysql")
+
+from async_task_manager import AsyncMySQLBackend, create_async_pool, open_async_task_manager
+
+
+def make_task(**overrides):
+    task_data = {
+        'title': "Write report",
+        'description': "Quarterly numbers",
+        'status': "PENDING",
+        'priority_level': "MEDIUM",
+        'due_date': (datetime.now() + timedelta(days=10)).strftime("%m/%d/%Y"),
+    }
+    task_data.update(overrides)
+    return task_data
+
+
+def run_with_manager(test):
+    """Run `test(manager)` against an emptied TEST_MYSQL_DATABASE"""
+    database = os.getenv('TEST_MYSQL_DATABASE')
+    if not database:
+        pytest.skip("set TEST_MYSQL_DATABASE to run against MySQL")
+
+    async def main():
+        backend = AsyncMySQLBackend(await create_async_pool(db=database, maxsize=5))
+        try:
+            manager = await open_async_task_manager(backend=backend)
+            async with backend.pool.acquire() as connection:
+                async with connection.cursor() as cursor:
+                    await cursor.execute("DELETE FROM tasks")
+            await test(manager)
+        finally:
+            await backend.wait_closed()
+
+    asyncio.run(main())
+
+
+def test_concurrent_creates_and_reads():
+    async def check(manager):
+        created = await asyncio.gather(
+            *(manager.create_task(make_task(title=f"Task {i}")) for i in range(20)))
+        assert len({task['id'] for task in created}) == 20
+
+        fetched = await asyncio.gather(*(manager.get_task(task['id']) for task in created))
+        assert [task['title'] for task in fetched] == [task['title'] for task in created]
+        assert len(await manager.get_tasks_by_status("PENDING")) == 20
+
+    run_with_manager(check)
+
+
+def test_update_complete_and_delete():
+    async def check(manager):
+        task = await manager.create_task(make_task())
+        updated = await manager.update_task(task['id'], {'priority_level': "HIGH"}, reread=True)
+        assert updated['priority_level_code'] == "HIGH"
+
+        completed = await manager.mark_as_completed(task['id'], current=updated)
+        assert completed['status_code'] == "COMPLETED"
+        assert [t['id'] for t in await manager.get_upcoming(30)] == [task['id']]
+
+        assert await manager.delete_task(task['id'])
+        with pytest.raises(TaskManagerError):
+            await manager.update_task(task['id'], {'title': "Gone"})
+
+    run_with_manager(check)
+
+
+def test_changes_since_covers_bulk_writes():
+    async def check(manager):
+        start = await manager.latest_change_seq()
+        first, second = [(await manager.create_task(make_task()))['id'] for _ in range(2)]
+        assert await manager.update_where({'status': "PENDING"}, {'priority_level': "HIGH"}) == 2
+        assert await manager.delete_tasks([first, second + 100]) == 1
+
+        feed = await manager.changes_since(start)
+        assert [(c['task_id'], c['event_type']) for c in feed['changes']] == [
+            (first, 'create'), (second, 'create'), (first, 'update'), (second, 'update'),
+            (first, 'delete'),
+        ]
+        assert feed['changes'][1]['task']['priority_level_code'] == "HIGH"
+        assert await manager.prune_changes(feed['next_seq'] + 1) >= 5
+
+    run_with_manager(check)
@@ -1,12 +1,15 @@
-from database import Database
-import mysql.connector
-from mysql.connector import Error
+import pytest
+from database import ConnectionPool, Database
+from pymysql import Error
+from pymysql.constants import SERVER_STATUS
 
 def test_database_connection():
     """Test database connection and table creation"""
     try:
         # Create database instance
         db = Database()
+        if db.connection is None:
+            pytest.skip("MySQL server not available")
         
         # Create tables
         db.create_tables()
@@ -20,7 +23,7 @@ def test_database_connection():
 def verify_tables(connection):
     """Verify that tables exist and contain the expected data"""
     try:
-        cursor = connection.cursor(dictionary=True)
+        cursor = connection.cursor()
         
         # Check statuses table
         print("\nChecking statuses table:")
@@ -80,5 +83,63 @@ def verify_tables(connection):
     finally:
         cursor.close()
 
+class FakeConnection:
+    """Stands in for a pymysql connection, noting rollbacks and closes"""
+
+    def __init__(self, pool):
+        self.pool = pool
+        self.server_status = SERVER_STATUS.SERVER_STATUS_AUTOCOMMIT
+        self.open = True
+        self.rollbacks = 0
+        self.closed_under_lock = None
+
+    def get_autocommit(self):
+        return bool(self.server_status & SERVER_STATUS.SERVER_STATUS_AUTOCOMMIT)
+
+    def begin(self):
+        self.server_status |= SERVER_STATUS.SERVER_STATUS_IN_TRANS
+
+    def rollback(self):
+        self.rollbacks += 1
+        self.server_status &= ~SERVER_STATUS.SERVER_STATUS_IN_TRANS
+
+    def ping(self, reconnect=False):
+        pass
+
+    def close(self):
+        self.open = False
+        self.closed_under_lock = not self.pool._lock.acquire(blocking=False)
+        if not self.closed_under_lock:
+            self.pool._lock.release()
+
+
+def fake_pool(**options):
+    pool = ConnectionPool(**options)
+    pool._connect = lambda: FakeConnection(pool)
+    return pool
+
+
+def test_pool_rolls_back_only_open_transactions():
+    pool = fake_pool(max_size=1)
+    connection = pool.acquire()
+    pool.release(connection)
+    assert connection.rollbacks == 0
+
+    connection = pool.acquire()
+    connection.begin()
+    pool.release(connection)
+    assert connection.rollbacks == 1
+
+
+def test_pool_closes_evicted_connections_outside_the_lock():
+    pool = fake_pool(max_size=2, max_idle_time=0)
+    first = pool.acquire()
+    pool.release(first)
+    second = pool.acquire()
+    assert second is not first
+    assert first.closed_under_lock is False
+    assert pool.stats()['evicted_idle'] == 1
+
+
 if __name__ == "__main__":
     test_database_connection() 
\ No newline at end of file
@@ -0,0 +1,43 @@
+import logging
+from metrics import Metrics, statement_label
+
+
+def test_statement_label_is_verb_and_table():
+    assert statement_label("SELECT t.id FROM tasks t JOIN statuses s ON 1") == "SELECT tasks"
+    assert statement_label("\n  UPDATE tasks AS t SET updated_at = NOW()") == "UPDATE tasks"
+    assert statement_label("INSERT INTO tasks (title) VALUES (%s), (%s)") == "INSERT tasks"
+    assert statement_label("SELECT 1") == "SELECT"
+
+
+def test_statement_label_reads_only_the_start_of_long_statements():
+    rows = ", ".join(["(%s)"] * 5000)
+    assert statement_label(f"INSERT INTO tasks (title) VALUES {rows}") == "INSERT tasks"
+
+
+def test_histograms_and_prometheus_export():
+    metrics = Metrics(slow_query_ms=1000)
+    metrics.record_operation('get_task', 0.002, rows=1)
+    metrics.record_operation('get_task', 0.2, rows=0, failed=True)
+    metrics.record_query("DELETE FROM tasks WHERE id = %s", (1,), 0.0004, rows=1)
+    metrics.record_acquire('mysql', 0.0001)
+
+    snapshot = metrics.snapshot()
+    operation = snapshot['operations']['get_task']
+    assert (operation['count'], operation['rows'], operation['errors']) == (2, 1, 1)
+    assert operation['buckets']['0.0025'] == 1 and operation['buckets']['+Inf'] == 2
+
+    text = metrics.to_prometheus()
+    assert 'task_manager_operation_seconds_bucket{operation="get_task",le="0.25"} 2' in text
+    assert 'task_manager_query_rows_total{statement="DELETE tasks"} 1' in text
+    assert 'task_manager_connection_acquire_seconds_count{backend="mysql"} 1' in text
+
+
+def test_slow_queries_are_logged_with_parameters(caplog):
+    metrics = Metrics(slow_query_ms=10)
+    with caplog.at_level(logging.WARNING, logger='task_manager.slow_query'):
+        metrics.record_query("SELECT * FROM tasks WHERE id = %s", (42,), 0.001)
+        metrics.record_query("SELECT *\n  FROM tasks WHERE id = %s", (7,), 0.05)
+
+    assert len(caplog.records) == 1
+    assert "SELECT * FROM tasks WHERE id = %s; params: (7,)" in caplog.text
+    assert metrics.snapshot()['queries']['SELECT tasks']['slow'] == 1
@@ -0,0 +1,86 @@
+import sqlite3
+from datetime import datetime, timedelta
+import pytest
+from reminder_service import ReminderScheduler, current_stage, next_crossing
+from storage import create_backend
+from task_manager import open_task_manager
+
+
+class ListSink:
+    def __init__(self):
+        self.sent = []
+
+    def send(self, notification):
+        self.sent.append((notification['task']['id'], notification['stage']))
+
+    def close(self):
+        pass
+
+
+@pytest.fixture(params=['sqlite', 'memory'])
+def task_manager(request, tmp_path):
+    if request.param == 'memory':
+        backend = create_backend('memory', snapshot_path=None)
+    else:
+        backend = create_backend('sqlite', path=str(tmp_path / "tasks.db"))
+    manager = open_task_manager(backend=backend)
+    yield manager
+    manager.close()
+    backend.close()
+
+
+def make_task(days, title="Write report"):
+    due = datetime.now() + timedelta(days=days)
+    return {'title': title, 'description': "Quarterly numbers", 'status': "PENDING",
+            'priority_level': "MEDIUM", 'due_date': due.strftime("%m/%d/%Y")}
+
+
+def test_stage_boundaries():
+    due = datetime(2030, 1, 31)
+    assert current_stage(due, datetime(2030, 1, 1) - timedelta(seconds=1)) is None
+    assert current_stage(due, datetime(2030, 1, 1)) == 'due_soon'
+    assert current_stage(due, datetime(2030, 1, 30, 12)) == 'due_tomorrow'
+    assert current_stage(due, datetime(2030, 1, 31, 23)) == 'due_today'
+    assert current_stage(due, datetime(2030, 2, 1)) == 'overdue'
+    assert next_crossing(due, datetime(2030, 1, 5)) == (datetime(2030, 1, 30), 'due_tomorrow')
+    assert next_crossing(due, datetime(2030, 2, 1)) is None
+
+
+def test_scheduler_follows_crossings_and_changes(task_manager):
+    tomorrow = task_manager.create_task(make_task(1))
+    later = task_manager.create_task(make_task(5))
+    far = task_manager.create_task(make_task(31))
+    gone = task_manager.create_task(make_task(2))
+
+    today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    sink = ListSink()
+    scheduler = ReminderScheduler(task_manager, [sink], clock=lambda: today + timedelta(hours=9))
+    scheduler.load()
+    assert sink.sent == []
+
+    task_manager.delete_task(gone['id'])
+    task_manager.update_task(later['id'], {'due_date': make_task(1)['due_date']})
+    scheduler.run_pending(today + timedelta(hours=10))
+    assert sink.sent == [(later['id'], 'due_tomorrow')]
+
+    sink.sent.clear()
+    scheduler.run_pending(today + timedelta(days=1, hours=1))
+    assert sorted(sink.sent) == sorted([(tomorrow['id'], 'due_today'),
+                                        (later['id'], 'due_today'),
+                                        (far['id'], 'due_soon')])
+
+    sink.sent.clear()
+    task_manager.mark_as_completed(tomorrow['id'])
+    scheduler.run_pending(today + timedelta(days=2, hours=1))
+    assert sink.sent == [(later['id'], 'overdue')]
+
+
+def test_run_survives_database_errors(task_manager, monkeypatch):
+    scheduler = ReminderScheduler(task_manager, [ListSink()], poll_interval=0)
+
+    def locked(*args, **kwargs):
+        scheduler.stop()
+        raise sqlite3.OperationalError("database is locked")
+
+    monkeypatch.setattr(task_manager, 'changes_since', locked)
+    scheduler.run()
@@ -0,0 +1,59 @@
+import pytest
+from priority_level import PriorityLevel
+from status import Status
+from task import Task
+from task_validator import TaskValidator, TaskValidationError
+
+
+def test_status_and_priority_are_interned_and_immutable():
+    assert Status("PENDING") is Status(status_code="PENDING")
+    assert PriorityLevel("HIGH") is PriorityLevel(priority_level="HIGH")
+    assert Status.get_status_code("In Progress") == "IN_PROGRESS"
+    assert PriorityLevel.get_priority_level("LOW") == "Low"
+    with pytest.raises(AttributeError):
+        Status("PENDING").status_code = "COMPLETED"
+    with pytest.raises(ValueError):
+        PriorityLevel.get_priority_level_code("Urgent")
+
+
+def test_task_shares_status_instances_and_has_no_dict():
+    first = Task("A", "a", "PENDING", "HIGH", "12/31/2099")
+    second = Task("B", "b", "PENDING", "HIGH", "12/31/2099")
+    assert first.status is second.status
+    assert first.priority_level is second.priority_level
+    assert not hasattr(first, '__dict__')
+
+    second.update(status="COMPLETED")
+    assert second.status is Status("COMPLETED")
+    assert "Status: Completed" in str(second)
+
+
+def test_validate_batch_matches_per_row_validation():
+    rows = [
+        {'title': " Report ", 'description': "Numbers", 'status': "PENDING",
+         'priority_level': "HIGH", 'due_date': "12/31/2099"},
+        {'title': "", 'description': "x", 'status': "PENDING",
+         'priority_level': "HIGH", 'due_date': "12/31/2099"},
+        {'title': "A", 'description': "x", 'status': "DONE",
+         'priority_level': "HIGH", 'due_date': "12/31/2099"},
+        {'title': "A", 'description': "x", 'status': "PENDING",
+         'priority_level': "HIGH", 'due_date': "02/30/2099"},
+        {'title': "A", 'description': "x", 'status': ["PENDING"],
+         'priority_level': "HIGH", 'due_date': "12/31/2099"},
+        {'title': "A", 'description': "x", 'status': "PENDING",
+         'priority_level': {'code': "HIGH"}, 'due_date': "12/31/2099"},
+        {'title': "A", 'description': "x", 'status': "PENDING", 'priority_level': "HIGH"},
+    ]
+    records, errors = TaskValidator.validate_batch(rows)
+
+    task = Task("Report", "Numbers", "PENDING", "HIGH", "12/31/2099").to_dict()
+    assert records == [(0, {'title': "Report", 'description': "Numbers", 'status': "PENDING",
+                            'priority_level': "HIGH", 'due_date': task['due_date']})]
+    expected = {}
+    for index, row in enumerate(rows[1:6], start=1):
+        with pytest.raises(TaskValidationError) as raised:
+            Task(row['title'], row['description'], row['status'], row['priority_level'],
+                 row['due_date'])
+        expected[index] = str(raised.value)
+    expected[6] = "Missing required fields: due_date"
+    assert dict(errors) == expected
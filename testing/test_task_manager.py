@@ -0,0 +1,408 @@
+import os
+import threading
+from datetime import datetime, timedelta
+import pymysql
+import pytest
+from database import ConnectionPool, MySQLBackend
+from export import export_tasks, read_columnar
+from query_check import CHECKED_QUERIES, render_query
+import storage
+from storage import create_backend
+from task_batch import TaskBatchExecutor
+from task_cache import TaskCache
+from task_manager import TaskManager, TaskManagerError, TaskQuery, open_task_manager
+from task_summary import disable_summary, enable_summary
+from task_validator import TaskValidationError
+
+
+def future_date(days=10):
+    """Due date `days` from today in MM/DD/YYYY format"""
+    return (datetime.now() + timedelta(days=days)).strftime("%m/%d/%Y")
+
+
+def make_task(**overrides):
+    task_data = {
+        'title': "Write report",
+        'description': "Quarterly numbers",
+        'status': "PENDING",
+        'priority_level': "MEDIUM",
+        'due_date': future_date(),
+    }
+    task_data.update(overrides)
+    return task_data
+
+
+def mysql_backend():
+    """MySQL backend on a dedicated, emptied test database"""
+    database = os.getenv('TEST_MYSQL_DATABASE')
+    if not database:
+        pytest.skip("set TEST_MYSQL_DATABASE to run against MySQL")
+    backend = MySQLBackend(ConnectionPool(
+        max_size=2,
+        host=os.getenv('DB_HOST'),
+        user=os.getenv('DB_USER'),
+        password=os.getenv('DB_PASSWORD'),
+        database=database,
+        charset='utf8mb4',
+        cursorclass=pymysql.cursors.DictCursor,
+        client_flag=pymysql.constants.CLIENT.FOUND_ROWS,
+        autocommit=True
+    ))
+    manager = TaskManager(backend=backend)
+    with manager.db.connection.cursor() as cursor:
+        cursor.execute("DELETE FROM tasks")
+    manager.db.connection.commit()
+    manager.close()
+    return backend
+
+
+@pytest.fixture(params=['sqlite', 'memory', 'mysql'])
+def task_manager(request, tmp_path):
+    """Task manager on each storage backend; all must behave the same"""
+    if request.param == 'mysql':
+        backend = mysql_backend()
+    elif request.param == 'memory':
+        backend = create_backend('memory', snapshot_path=None)
+    else:
+        backend = create_backend('sqlite', path=str(tmp_path / "tasks.db"))
+    manager = open_task_manager(backend=backend)
+    yield manager
+    manager.close()
+    backend.close()
+
+
+def test_create_and_get_task(task_manager):
+    created = task_manager.create_task(make_task())
+    assert created['title'] == "Write report"
+    assert created['status_code'] == "PENDING"
+    assert created['priority_level_code'] == "MEDIUM"
+    assert isinstance(created['due_date'], datetime)
+    assert task_manager.get_task(created['id']) == created
+
+
+def test_create_task_rejects_invalid_data(task_manager):
+    with pytest.raises(TaskValidationError):
+        task_manager.create_task(make_task(status="DONE"))
+    assert task_manager.get_all_tasks() == []
+
+
+def test_get_missing_task_returns_none(task_manager):
+    assert task_manager.get_task(12345) is None
+
+
+def test_filters_by_status_and_priority(task_manager):
+    task_manager.create_task(make_task(status="PENDING", priority_level="HIGH"))
+    task_manager.create_task(make_task(status="IN_PROGRESS", priority_level="HIGH"))
+    task_manager.create_task(make_task(status="PENDING", priority_level="LOW"))
+
+    assert len(task_manager.get_all_tasks()) == 3
+    assert len(task_manager.get_tasks_by_status("PENDING")) == 2
+    assert len(task_manager.get_tasks_by_priority("HIGH")) == 2
+    both = task_manager.find_tasks(status="PENDING", priority_level="HIGH")
+    assert [task['priority_level_code'] for task in both] == ["HIGH"]
+
+
+def test_find_tasks_orders_limits_and_projects(task_manager):
+    for days in (5, 1, 3):
+        task_manager.create_task(make_task(due_date=future_date(days)))
+
+    tasks = task_manager.find_tasks(order_by='due_date', limit=2,
+                                    columns=TaskQuery.LIST_COLUMNS)
+    assert [task['due_date'] for task in tasks] == sorted(task['due_date'] for task in tasks)
+    assert len(tasks) == 2
+    assert 'description' not in tasks[0]
+
+
+def test_offset_without_limit(task_manager):
+    ids = [task_manager.create_task(make_task(title=f"Budget {i}"))['id'] for i in range(3)]
+
+    assert [t['id'] for t in task_manager.find_tasks(order_by='id', offset=1)] == ids[1:]
+    found = task_manager.search_tasks("budget", limit=None, offset=2)
+    assert len(found) == 1
+
+
+def test_date_only_bounds_include_the_whole_day(task_manager):
+    task_id = task_manager.create_task(make_task(due_date=future_date(3)))['id']
+    day = (datetime.now() + timedelta(days=3)).strftime("%Y-%m-%d")
+
+    assert [t['id'] for t in task_manager.find_tasks(due_to=day)] == [task_id]
+    assert [t['id'] for t in task_manager.find_tasks(due_from=day, due_to=day)] == [task_id]
+    assert [t['id'] for t in task_manager.get_tasks_due_between(day, day)] == [task_id]
+    with pytest.raises(TaskManagerError):
+        task_manager.find_tasks(due_to="next week")
+
+
+def test_create_tasks_reports_invalid_rows(task_manager):
+    rows = [make_task(title=f"Task {i}") for i in range(5)]
+    rows.insert(2, make_task(title=""))
+    result = task_manager.create_tasks(rows, chunk_size=2)
+
+    assert [index for index, _ in result['errors']] == [2]
+    assert len(result['ids']) == 5
+    titles = [task_manager.get_task(task_id)['title'] for task_id in result['ids']]
+    assert titles == [f"Task {i}" for i in range(5)]
+
+
+def test_update_task_writes_only_supplied_fields(task_manager):
+    created = task_manager.create_task(make_task())
+    updated = task_manager.update_task(created['id'], {'title': "Renamed"}, current=created)
+
+    assert updated['title'] == "Renamed"
+    assert updated['description'] == created['description']
+    stored = task_manager.get_task(created['id'])
+    assert stored['title'] == "Renamed"
+    assert stored['status_code'] == "PENDING"
+
+
+def test_update_missing_task_raises(task_manager):
+    with pytest.raises(TaskManagerError):
+        task_manager.update_task(12345, {'title': "Nope"})
+    with pytest.raises(TaskManagerError):
+        task_manager.mark_as_completed(12345)
+
+
+def test_update_rejects_non_text_title(task_manager):
+    task_id = task_manager.create_task(make_task())['id']
+    with pytest.raises(TaskValidationError):
+        task_manager.update_task(task_id, {'title': 5})
+    other_id = task_manager.create_task(make_task())['id']
+    with TaskBatchExecutor(task_manager, max_workers=2) as batch:
+        results = batch.update_each({task_id: {'description': ["x"]},
+                                     other_id: {'title': "Renamed"}})
+    assert isinstance(results[task_id], TaskValidationError)
+    assert results[other_id]['title'] == "Renamed"
+
+
+def test_mark_as_completed(task_manager):
+    created = task_manager.create_task(make_task())
+    task_manager.mark_as_completed(created['id'])
+    stored = task_manager.get_task(created['id'])
+    assert stored['is_completed']
+    assert stored['status_code'] == "COMPLETED"
+
+
+def test_bulk_complete_update_and_delete(task_manager):
+    ids = task_manager.create_tasks([make_task() for _ in range(5)])['ids']
+
+    assert task_manager.complete_tasks(ids[:3], chunk_size=2) == 3
+    assert len(task_manager.get_tasks_by_status("COMPLETED")) == 3
+    assert task_manager.update_tasks(ids[3:], {'priority_level': "HIGH"}) == 2
+    assert task_manager.update_where({'status': "COMPLETED"}, {'priority_level': "LOW"}) == 3
+    assert len(task_manager.get_tasks_by_priority("LOW")) == 3
+    assert task_manager.delete_tasks(ids[:4] + [12345]) == 4
+    assert [task['id'] for task in task_manager.get_all_tasks()] == ids[4:]
+
+
+def test_delete_task(task_manager):
+    created = task_manager.create_task(make_task())
+    assert task_manager.delete_task(created['id'])
+    assert not task_manager.delete_task(created['id'])
+
+
+def test_iter_task_pages_resumes_from_cursor(task_manager):
+    ids = task_manager.create_tasks([make_task() for _ in range(5)])['ids']
+
+    pages = list(task_manager.iter_task_pages(page_size=2))
+    assert [[task['id'] for task in page] for page, _ in pages] == [ids[:2], ids[2:4], ids[4:]]
+    assert pages[-1][1] is None
+
+    resumed = list(task_manager.iter_tasks(page_size=2, cursor=pages[0][1]))
+    assert [task['id'] for task in resumed] == ids[2:]
+
+
+def test_columnar_export_round_trip(task_manager, tmp_path):
+    task_manager.create_tasks([make_task(title=f"Task {i}", status="IN_PROGRESS")
+                               for i in range(3)])
+    task_manager.create_task(make_task(title="Tâche ✓", priority_level="HIGH"))
+    path = tmp_path / "tasks.bin"
+
+    with open(path, 'wb') as output:
+        assert export_tasks(task_manager, output, 'columnar', page_size=2) == 4
+    with open(path, 'rb') as source:
+        exported = list(read_columnar(source))
+    assert exported == [dict(task, is_completed=bool(task['is_completed']))
+                        for task in task_manager.get_all_tasks()]
+
+    with open(path, 'wb') as output:
+        assert export_tasks(task_manager, output, 'columnar',
+                            filters={'priority_level': "HIGH"}) == 1
+    with open(path, 'rb') as source:
+        assert [task['title'] for task in read_columnar(source)] == ["Tâche ✓"]
+
+
+def test_upcoming_and_days_left(task_manager):
+    task_manager.create_task(make_task(title="Soon", due_date=future_date(0)))
+    task_manager.create_task(make_task(title="Later", due_date=future_date(45)))
+    task_manager.create_task(make_task(title="Week", due_date=future_date(7)))
+
+    upcoming = task_manager.get_upcoming(30)
+    assert [(task['title'], task['days_left']) for task in upcoming] == [("Soon", 0), ("Week", 7)]
+
+    start = datetime.now() + timedelta(days=40)
+    between = task_manager.get_tasks_due_between(start, start + timedelta(days=10))
+    assert [task['title'] for task in between] == ["Later"]
+
+
+def test_search_tasks(task_manager):
+    review = task_manager.create_task(make_task(title="Quarterly budget review",
+                                                description="Review the budget with finance"))
+    release = task_manager.create_task(make_task(title="Deploy release",
+                                                 description="Release notes and budget sign-off"))
+    lunch = task_manager.create_task(make_task(title="Team lunch", description="Book a table",
+                                               status="IN_PROGRESS"))
+
+    assert {task['id'] for task in task_manager.search_tasks("Budget")} == {
+        review['id'], release['id']}
+    assert [task['id'] for task in task_manager.search_tasks("budget review")] == [review['id']]
+    assert task_manager.search_tasks("the of") == []
+    page = task_manager.search_tasks("budget", filters={'status': "PENDING"}, limit=1, offset=1)
+    assert len(page) == 1 and 'score' in page[0]
+
+    task_manager.update_task(lunch['id'], {'title': "Budget lunch"})
+    task_manager.delete_task(review['id'])
+    assert {task['id'] for task in task_manager.search_tasks("budget")} == {
+        release['id'], lunch['id']}
+    assert [task['id'] for task in task_manager.search_tasks(
+        "budget", filters={'status': "IN_PROGRESS"})] == [lunch['id']]
+
+
+def test_get_stats(task_manager):
+    task_manager.create_task(make_task(due_date=future_date(0)))
+    task_manager.create_task(make_task(status="IN_PROGRESS", priority_level="HIGH",
+                                       due_date=future_date(6)))
+    task_manager.create_task(make_task(due_date=future_date(7)))
+    done = task_manager.create_task(make_task(due_date=future_date(1)))
+    task_manager.mark_as_completed(done['id'])
+
+    def check(stats):
+        assert (stats['total'], stats['open'], stats['completed']) == (4, 3, 1)
+        assert (stats['overdue'], stats['due_this_week']) == (0, 2)
+        assert stats['by_status'] == {'PENDING': 2, 'IN_PROGRESS': 1, 'COMPLETED': 1}
+        assert stats['by_priority'] == {'LOW': 0, 'MEDIUM': 3, 'HIGH': 1}
+
+    check(task_manager.get_stats())
+    if task_manager.backend.name == 'memory':
+        return
+    # The trigger-maintained summary must agree with the GROUP BY query
+    enable_summary(task_manager)
+    try:
+        check(task_manager.get_stats())
+        extra = task_manager.create_task(make_task(priority_level="LOW"))
+        task_manager.update_task(extra['id'], {'status': "IN_PROGRESS"})
+        task_manager.delete_task(extra['id'])
+        check(task_manager.get_stats())
+    finally:
+        disable_summary(task_manager)
+
+
+def test_changes_since(task_manager):
+    start = task_manager.latest_change_seq()
+    ids = task_manager.create_tasks([make_task(title=f"Task {i}") for i in range(3)])['ids']
+    task_manager.update_task(ids[0], {'title': "Renamed"})
+    task_manager.complete_tasks(ids[1:] + [max(ids) + 100])
+    task_manager.update_where({'status': "COMPLETED"}, {'priority_level': "HIGH"})
+    assert task_manager.delete_tasks([ids[2], max(ids) + 100]) == 1
+
+    first = task_manager.changes_since(start, limit=4)
+    rest = task_manager.changes_since(first['next_seq'])
+    changes = first['changes'] + rest['changes']
+    assert [(c['task_id'], c['event_type']) for c in changes] == [
+        (ids[0], 'create'), (ids[1], 'create'), (ids[2], 'create'), (ids[0], 'update'),
+        (ids[1], 'complete'), (ids[2], 'complete'), (ids[1], 'update'), (ids[2], 'update'),
+        (ids[2], 'delete'),
+    ]
+    # Each change carries the task as it is now, None once deleted
+    assert changes[0]['task']['title'] == "Renamed"
+    assert changes[1]['task']['priority_level_code'] == "HIGH"
+    assert changes[-1]['task'] is None
+    assert rest['next_seq'] == task_manager.latest_change_seq()
+    assert task_manager.changes_since(rest['next_seq']) == {
+        'changes': [], 'next_seq': rest['next_seq']}
+
+
+def test_checked_queries_render_on_the_manager_backend(tmp_path):
+    backend = create_backend('sqlite', path=str(tmp_path / "tasks.db"))
+    manager = open_task_manager(backend=backend)
+    try:
+        with manager.db.connection.cursor() as cursor:
+            for name, query, params, _ in CHECKED_QUERIES:
+                sql, params = render_query(manager, query, params)
+                cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+                assert cursor.fetchall(), name
+    finally:
+        manager.close()
+        backend.close()
+
+
+def test_cache_drops_fill_read_before_invalidation():
+    cache = TaskCache()
+    generation = cache.generation
+    cache.invalidate_tasks([1])
+    cache.put(TaskCache.task_key(1), {'id': 1}, generation)
+    assert cache.get(TaskCache.task_key(1)) == (False, None)
+    cache.put(TaskCache.task_key(1), {'id': 1}, cache.generation)
+    assert cache.get(TaskCache.task_key(1)) == (True, {'id': 1})
+
+
+def test_memory_snapshot_round_trip(tmp_path):
+    path = str(tmp_path / "tasks.json")
+    backend = create_backend('memory', snapshot_path=path)
+    manager = open_task_manager(backend=backend)
+    ids = manager.create_tasks([make_task(title=f"Task {i}") for i in range(3)])['ids']
+    manager.delete_task(ids[0])
+    backend.close()
+
+    reloaded = open_task_manager(backend=create_backend('memory', snapshot_path=path))
+    assert [task['id'] for task in reloaded.get_all_tasks()] == ids[1:]
+    assert reloaded.create_task(make_task())['id'] == ids[-1] + 1
+
+
+def test_memory_snapshot_written_when_manager_closes(tmp_path, monkeypatch):
+    path = str(tmp_path / "tasks.json")
+    monkeypatch.setenv('DB_BACKEND', 'memory')
+    monkeypatch.setenv('MEMORY_SNAPSHOT_PATH', path)
+    monkeypatch.setattr(storage, '_backend', None)
+    manager = open_task_manager()
+    ids = manager.create_tasks([make_task(title=f"Task {i}") for i in range(2)])['ids']
+    manager.close()
+
+    reloaded = open_task_manager(backend=create_backend('memory', snapshot_path=path))
+    assert [task['id'] for task in reloaded.get_all_tasks()] == ids
+
+
+def test_threads_racing_on_a_fresh_database_migrate_once(tmp_path):
+    backend = create_backend('sqlite', path=str(tmp_path / "tasks.db"))
+    start = threading.Barrier(4)
+    errors = []
+
+    def open_and_create():
+        start.wait()
+        try:
+            manager = open_task_manager(backend=backend)
+            manager.create_task(make_task())
+            manager.close()
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=open_and_create) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    backend.close()
+    assert errors == []
+
+
+def test_shared_manager_across_threads(task_manager):
+    ids = task_manager.create_tasks([make_task(title=f"Task {i}") for i in range(40)])['ids']
+
+    with TaskBatchExecutor(task_manager, max_workers=4) as batch:
+        tasks = batch.get_tasks(ids + [max(ids) + 1])
+        assert [tasks[task_id]['title'] for task_id in ids] == [f"Task {i}" for i in range(40)]
+        assert tasks[max(ids) + 1] is None
+
+        results = batch.update_each({ids[0]: {'title': "Renamed"}, max(ids) + 1: {'title': "x"}})
+        assert results[ids[0]]['title'] == "Renamed"
+        assert isinstance(results[max(ids) + 1], TaskManagerError)
+
+    assert task_manager.get_task(ids[0])['title'] == "Renamed"